@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""Compares the ways of building model instances from stored records.
+
+Usage: ./benchmarks/bench_construct.py [number_of_records]
+
+The records of a dataset of Places are turned back into instances with
+cls(**record), which makes an id and two dates before replacing them,
+and with cls.from_dict(record), which reload() uses. Both are timed
+for every class variant FileStorage can build.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.engine.file_storage import columnar_classes  # noqa: E402
+from models.engine.file_storage import slotted_classes  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def records(count):
+    """Return the to_dict() records of count Places."""
+    recs = []
+    with storage.batch():
+        for i in range(count):
+            place = Place()
+            place.name = "Place {}".format(i)
+            place.city_id = "c{}".format(i % 100)
+            place.price_by_night = 40 + i % 300
+            recs.append(place.to_dict())
+            storage.delete(place)
+    return recs
+
+
+def timed(build, recs):
+    """Return the seconds build takes to run on every record."""
+    start = time.perf_counter()
+    objects = [build(rec) for rec in recs]
+    elapsed = time.perf_counter() - start
+    del objects
+    return elapsed
+
+
+def main():
+    """Run the benchmark and print one line per class variant."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    recs = records(count)
+    print("{:<9} {:>13} {:>16} {:>9}".format(
+        "variant", "cls(**r) (s)", "from_dict (s)", "speedup"))
+    for name, cls in (("plain", Place), ("slotted", slotted_classes["Place"]),
+                      ("columnar", columnar_classes["Place"])):
+        kwargs_time = timed(lambda rec: cls(**rec), recs)
+        from_dict_time = timed(cls.from_dict, recs)
+        print("{:<9} {:>13.3f} {:>16.3f} {:>8.1f}x".format(
+            name, kwargs_time, from_dict_time, kwargs_time / from_dict_time))
+
+
+if __name__ == "__main__":
+    main()
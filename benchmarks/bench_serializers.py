@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""Compares the save and reload throughput of the snapshot formats.
+
+Usage: ./benchmarks/bench_serializers.py [number_of_objects]
+
+The same dataset of Places, Users and Reviews is saved and reloaded
+with every serializer of models.engine.serializers, in a temporary
+directory.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.engine.serializers import serializers  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def populate(count):
+    """Create count objects, mostly Places, in the storage."""
+    storage.all().clear()
+    with storage.batch():
+        for i in range(count):
+            if i % 3 == 0:
+                obj = User()
+                obj.email = "user{}@hbnb.io".format(i)
+            elif i % 3 == 1:
+                obj = Place()
+                obj.name = "Place {}".format(i)
+                obj.description = "A quiet place to stay " * 4
+                obj.number_rooms = i % 7
+                obj.price_by_night = 40 + i % 300
+                obj.latitude = 37.0 + (i % 1000) / 1000
+                obj.longitude = -122.0 - (i % 1000) / 1000
+                obj.amenity_ids = ["a{}".format(j) for j in range(i % 4)]
+            else:
+                obj = Review()
+                obj.text = "Lovely stay, would come back. " * 3
+
+
+def bench(name, count):
+    """Return the save and reload times in seconds of one format."""
+    storage.configure(format=name, fsync=False)
+    start = time.perf_counter()
+    storage.save()
+    save_time = time.perf_counter() - start
+    storage.all().clear()
+    start = time.perf_counter()
+    storage.reload()
+    reload_time = time.perf_counter() - start
+    if len(storage.all()) != count:
+        raise RuntimeError("{} reloaded {} of {} objects".format(
+            name, len(storage.all()), count))
+    return save_time, reload_time
+
+
+def main():
+    """Run the benchmark and print one line per format."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "file.json")
+        storage.configure(file_path=path)
+        populate(count)
+        print("{:<8} {:>10} {:>12} {:>12} {:>14}".format(
+            "format", "size (kB)", "save (s)", "reload (s)", "reload obj/s"))
+        for name in serializers:
+            save_time, reload_time = bench(name, count)
+            print("{:<8} {:>10} {:>12.3f} {:>12.3f} {:>14.0f}".format(
+                name, os.path.getsize(path) // 1024, save_time,
+                reload_time, count / reload_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,13 @@ The models include storage,
 BaseModel, User, State, City, Place, Amenity, and Review.
 """
 import cmd
-from models.base_model import BaseModel
+import csv
+import json
+import sys
+from itertools import islice
+from models.base_model import TIMESTAMPS
+from models.engine.file_storage import classes
+from models.slotted import declared
 from models.user import User
 from models import storage
 
@@ -16,6 +22,9 @@ class HBNBCommand(cmd.Cmd):
     """The Command interpreter class"""
 
     prompt = "(hbnb) "
+    page_size = 100
+    buffer_size = 1 << 16
+    formats = ("list", "ndjson")
 
     def do_quit(self, line):
         """Quit command to exit the program"""
@@ -34,13 +43,10 @@ class HBNBCommand(cmd.Cmd):
         """Create a new instance of a BaseModel"""
         if not line:
             print("** class name missing **")
-        elif line != "BaseModel" and line != "User":
+        elif line not in classes:
             print("** class doesn't exist **")
         else:
-            if line == "BaseModel":
-                new_obj = BaseModel()
-            else:
-                new_obj = User()
+            new_obj = classes[line]()
             new_obj.save()
             print(new_obj.id)
 
@@ -49,15 +55,14 @@ class HBNBCommand(cmd.Cmd):
         args = line.split()
         if not line:
             print("** class name missing **")
-        elif args[0] != "BaseModel" and args[0] != "User":
+        elif args[0] not in classes:
             print("** class doesn't exist **")
         elif len(args) == 1:
             print("** instance id missing **")
         else:
-            key = f"{args[0]}.{args[1]}"
-            objects = storage.all()
-            if key in objects:
-                print(objects[key])
+            obj = storage.get(args[0], args[1])
+            if obj is not None:
+                print(obj)
             else:
                 print("** no instance found **")
 
@@ -66,40 +71,79 @@ class HBNBCommand(cmd.Cmd):
         args = line.split()
         if not line:
             print("** class name missing **")
-        elif args[0] != "BaseModel" and args[0] != "User":
+        elif args[0] not in classes:
             print("** class doesn't exist **")
         elif len(args) == 1:
             print("** instance id missing **")
         else:
-            key = f"{args[0]}.{args[1]}"
-            objects = storage.all()
-            if key in objects:
-                objects.pop(key)
+            obj = storage.get(args[0], args[1])
+            if obj is not None:
+                storage.delete(obj)
                 storage.save()
             else:
                 print("** no instance found **")
 
     def do_all(self, line):
-        """Print all string representation of all instances"""
-        args = line.split()
-        if not line:
-            objects = storage.all()
-            obj_list = [str(obj) for obj in objects.values()]
-            print(obj_list)
-        elif args[0] != "BaseModel" and args[0] != "User":
+        """Print all string representation of all instances:
+        all [<class>] [--offset N] [--limit N] [--format list|ndjson]
+        Instances are written as they are read, so listing a large
+        store keeps a constant amount of text in memory."""
+        args, flags = self.parse_flags(line.split())
+        if flags is None:
+            return
+        if args and args[0] not in classes:
             print("** class doesn't exist **")
+            return
+        if args:
+            objects = storage.all_of(args[0]).values()
         else:
-            objects = storage.all()
-            obj_list = [str(obj) for obj in objects.values()
-                        if type(obj).__name__ == args[0]]
-            print(obj_list)
+            objects = storage.all().values()
+        offset = flags.get("offset", 0)
+        limit = flags.get("limit")
+        stop = None if limit is None else offset + limit
+        self.print_list(islice(objects, offset, stop),
+                        flags.get("format", "list"))
+
+    def parse_flags(self, args):
+        """Split --offset, --limit and --format options from arguments.
+
+        Returns:
+            tuple: The other arguments and a dict of the options, or
+                None instead of the dict after printing an error.
+        """
+        rest = []
+        flags = {}
+        args = iter(args)
+        for arg in args:
+            if not arg.startswith("--"):
+                rest.append(arg)
+                continue
+            name = arg[2:]
+            value = next(args, None)
+            if name not in ("offset", "limit", "format"):
+                print("** unknown option **")
+                return rest, None
+            if value is None:
+                print("** option value missing **")
+                return rest, None
+            if name == "format":
+                if value not in self.formats:
+                    print("** unknown format **")
+                    return rest, None
+                flags[name] = value
+            elif not value.isdigit():
+                print("** {} must be a number **".format(name))
+                return rest, None
+            else:
+                flags[name] = int(value)
+        return rest, flags
 
     def do_update(self, line):
         """Update an instance"""
         args = line.split()
         if not line:
             print("** class name missing **")
-        elif args[0] != "BaseModel" and args[0] != "User":
+        elif args[0] not in classes:
             print("** class doesn't exist **")
         elif len(args) == 1:
             print("** instance id missing **")
@@ -108,10 +152,8 @@ class HBNBCommand(cmd.Cmd):
         elif len(args) == 3:
             print("** value missing **")
         else:
-            key = f"{args[0]}.{args[1]}"
-            objects = storage.all()
-            if key in objects:
-                obj = objects[key]
+            obj = storage.get(args[0], args[1])
+            if obj is not None:
                 attr_name = args[2]
                 value = args[3]
                 setattr(obj, attr_name, value)
@@ -148,29 +190,171 @@ class HBNBCommand(cmd.Cmd):
         args = line.split()
         if not line:
             print("** class name missing **")
-        elif args[0] != "BaseModel" and args[0] != "User":
+        elif args[0] not in classes:
             print("** class doesn't exist **")
         else:
-            objects = storage.all()
-            count = sum(1 for obj in objects.values()
-                        if type(obj).__name__ == args[0])
-            print(count)
+            print(storage.count(args[0]))
 
     def do_search(self, line):
-        """Search for instances based on attribute values"""
+        """Search for instances based on attribute values:
+        search <class> <attribute> <value>
+        search text <words>"""
         args = line.split()
         if not line:
             print("** class name missing **")
-        elif args[0] != "BaseModel" and args[0] != "User":
+        elif args[0] == "text":
+            if len(args) < 2:
+                print("** search words missing **")
+            else:
+                self.print_list(storage.search(" ".join(args[1:])))
+        elif args[0] not in classes:
             print("** class doesn't exist **")
         elif len(args) < 3:
             print("** attribute name and value missing **")
         else:
-            objects = storage.all()
-            obj_list = [str(obj) for obj in objects.values()
-                        if type(obj).__name__ == args[0]
-                        and getattr(obj, args[1], None) == args[2]]
-            print(obj_list)
+            self.print_list(storage.query(args[0]).where(
+                **{args[1]: args[2]}))
+
+    def do_geo(self, line):
+        """Search places by location:
+        geo near <lat> <lon> <km>
+        geo box <south> <west> <north> <east>
+        geo nearest <lat> <lon> [k]"""
+        args = line.split()
+        counts = {"near": (3,), "box": (4,), "nearest": (2, 3)}
+        if not line:
+            print("** search mode missing **")
+        elif args[0] not in counts:
+            print("** unknown search mode **")
+        elif len(args) - 1 not in counts[args[0]]:
+            print("** wrong number of arguments **")
+        else:
+            try:
+                values = [float(v) for v in args[1:]]
+            except ValueError:
+                print("** arguments must be numbers **")
+                return
+            if args[0] == "near":
+                self.print_list(storage.near("Place", *values))
+            elif args[0] == "box":
+                self.print_list(storage.in_box("Place", *values))
+            else:
+                k = int(values[2]) if len(values) == 3 else 1
+                self.print_list(storage.nearest("Place", values[0],
+                                                values[1], k))
+
+    def do_import(self, line):
+        """Load instances of a class from an NDJSON or a .csv file:
+        import <class> <file>
+        Records are read one at a time and saved once at the end."""
+        args = self.file_args(line)
+        if args is None:
+            return
+        cls_name, path = args
+        try:
+            f = open(path, newline="")
+        except OSError:
+            print("** file doesn't exist **")
+            return
+        with f:
+            if path.endswith(".csv"):
+                rows = csv_records(classes[cls_name], f)
+            else:
+                rows = ndjson_records(f)
+            where = {"line": 0}
+
+            def records():
+                for n, rec in rows:
+                    where["line"] = n
+                    if rec is None:
+                        raise ValueError("invalid record")
+                    yield rec
+            try:
+                print(storage.import_records(cls_name, records()))
+            except (TypeError, ValueError):
+                print("** invalid record on line {} **".format(
+                    where["line"]))
+
+    def do_export(self, line):
+        """Write the instances of a class to an NDJSON or a .csv file:
+        export <class> <file>
+        Records are written as the storage reads them, without building
+        the instances."""
+        args = self.file_args(line)
+        if args is None:
+            return
+        cls_name, path = args
+        try:
+            f = open(path, "w", newline="")
+        except OSError:
+            print("** file can't be written **")
+            return
+        with f:
+            if path.endswith(".csv"):
+                count = write_csv(lambda: storage.records(cls_name), f)
+            else:
+                count = 0
+                for rec in storage.records(cls_name):
+                    f.write(json.dumps(rec) + "\n")
+                    count += 1
+        print(count)
+
+    def file_args(self, line):
+        """Return the class name and file name of import and export.
+
+        Returns:
+            tuple: The (class name, file name), or None after printing
+                an error.
+        """
+        args = line.split()
+        if not args:
+            print("** class name missing **")
+        elif args[0] not in classes:
+            print("** class doesn't exist **")
+        elif len(args) == 1:
+            print("** file name missing **")
+        else:
+            return args[0], args[1]
+        return None
+
+    def print_list(self, objects, fmt="list"):
+        """Print objects as they are read, through a buffered writer.
+
+        The list format prints the list of their strings, the ndjson
+        format one to_dict() JSON document per line.
+        """
+        if fmt == "ndjson":
+            chunks = (json.dumps(obj.to_dict()) + "\n" for obj in objects)
+        else:
+            chunks = self.list_chunks(objects)
+        self.write_buffered(chunks)
+
+    def list_chunks(self, objects):
+        """Yield the text of a list of the strings of objects, by page"""
+        objects = iter(objects)
+        sep = "["
+        while True:
+            page = list(islice(objects, self.page_size))
+            if not page:
+                break
+            yield sep + ", ".join(repr(str(obj)) for obj in page)
+            sep = ", "
+        yield "]\n" if sep == ", " else "[]\n"
+
+    def write_buffered(self, chunks):
+        """Write text chunks to stdout in writes of about buffer_size"""
+        out = sys.stdout
+        buf = []
+        size = 0
+        for chunk in chunks:
+            buf.append(chunk)
+            size += len(chunk)
+            if size >= self.buffer_size:
+                out.write("".join(buf))
+                buf = []
+                size = 0
+        out.write("".join(buf))
+        out.flush()
 
     def do_exit(self, line):
         """Exit the program"""
@@ -180,6 +364,133 @@ class HBNBCommand(cmd.Cmd):
         """Display help information for commands"""
         cmd.Cmd.do_help(self, line)
 
+    def run_batch(self, lines, progress=None, every=1000):
+        """Run console commands in one storage batch().
+
+        Every save() the commands make is deferred to a single write
+        when the last command has run, or when one fails. Blank lines
+        and lines starting with # are skipped.
+
+        Args:
+            lines (iterable): The command lines, such as an open file.
+            progress (file): If set, where to report the number of
+                commands run, every `every` commands and at the end.
+            every (int): The number of commands between two reports.
+
+        Returns:
+            int: The number of commands run.
+        """
+        count = 0
+        with storage.batch():
+            for line in lines:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                stop = self.onecmd(self.precmd(line))
+                count += 1
+                if progress is not None and count % every == 0:
+                    progress.write("** {} commands run **\n".format(count))
+                    progress.flush()
+                if stop:
+                    break
+        if progress is not None:
+            progress.write("** {} commands run, saved **\n".format(count))
+            progress.flush()
+        return count
+
+
+def ndjson_records(f):
+    """Yield the (line number, JSON object) of each non-blank line.
+
+    The object is None for a line that does not hold a JSON object.
+    """
+    for n, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                rec = None
+            yield n, rec if type(rec) is dict else None
+
+
+def csv_records(cls, f):
+    """Yield the (line number, attribute dict) of each row of a CSV file.
+
+    The file starts with a header. Empty cells are left out. The cells
+    of attributes the class declares with a number, list or dict
+    default are converted back to its type, lists and dicts being
+    written as JSON; the dict is None for a row where that fails.
+    """
+    types = {k: type(v) for k, v in declared(cls).items()}
+    for n, row in enumerate(csv.DictReader(f), 2):
+        rec = {}
+        for k, v in row.items():
+            if not v or k is None or k == "__class__":
+                continue
+            kind = types.get(k)
+            try:
+                if kind in (int, float):
+                    v = kind(v)
+                elif kind in (list, dict):
+                    v = json.loads(v)
+            except ValueError:
+                rec = None
+                break
+            rec[k] = v
+        yield n, rec
+
+
+def write_csv(records, f):
+    """Write records as CSV rows with a header and return their number.
+
+    The records are read twice, once for the union of their attribute
+    names and once for the rows, so no row is held in memory.
+
+    Args:
+        records (callable): Returns a new iterator of to_dict() records.
+        f (file): The file to write.
+    """
+    names = set()
+    for rec in records():
+        names.update(rec)
+    names.discard("__class__")
+    fields = ["id", *TIMESTAMPS]
+    fields += sorted(names - set(fields))
+    writer = csv.DictWriter(f, fields)
+    writer.writeheader()
+    count = 0
+    for row in records():
+        row = dict(row)
+        del row["__class__"]
+        for k, v in row.items():
+            if isinstance(v, (list, dict)):
+                row[k] = json.dumps(v)
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def main(argv):
+    """Start the interpreter, or run a command file given as:
+    console.py --batch <file|-> [--progress N]"""
+    if not argv:
+        HBNBCommand().cmdloop()
+        return 0
+    if argv[0] != "--batch" or len(argv) not in (2, 4) or (
+            len(argv) == 4 and (argv[2] != "--progress" or
+                                not argv[3].isdigit() or argv[3] == "0")):
+        print("Usage: {} [--batch <file|-> [--progress N]]".format(
+            sys.argv[0]), file=sys.stderr)
+        return 2
+    every = int(argv[3]) if len(argv) == 4 else 1000
+    console = HBNBCommand()
+    if argv[1] == "-":
+        console.run_batch(sys.stdin, sys.stderr, every)
+    else:
+        with open(argv[1]) as f:
+            console.run_batch(f, sys.stderr, every)
+    return 0
+
 
 if __name__ == '__main__':
-    HBNBCommand().cmdloop()
+    sys.exit(main(sys.argv[1:]))
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """it __init__ magic method for models directory"""
-from models.engine.file_storage import FileStorage
+from models.engine.registry import create_storage
 
 
-storage = FileStorage()
+storage = create_storage()
 storage.reload()
@@ -2,37 +2,151 @@
 """it Defines the BaseModel class."""
 import uuid
 from uuid import uuid4
-from datetime import datetime
+from datetime import datetime, timedelta
 import models
 
 
+TIMESTAMPS = ("created_at", "updated_at")
+UNIX_EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def to_datetime(value):
+    """Return the datetime of a stored timestamp.
+
+    Args:
+        value (datetime|str|int): A datetime, an ISO 8601 string as
+            written by isoformat(), or a count of microseconds since
+            1970-01-01 as written by to_epoch().
+    """
+    if type(value) is datetime:
+        return value
+    if type(value) is int:
+        return UNIX_EPOCH + timedelta(0, value // 1000000, value % 1000000)
+    return datetime.fromisoformat(value)
+
+
+def to_epoch(value):
+    """Return a timestamp as a count of microseconds since 1970-01-01."""
+    if type(value) is int:
+        return value
+    return (to_datetime(value) - UNIX_EPOCH) // MICROSECOND
+
+
+class Timestamp:
+    """Represents a datetime attribute that may be stored as an epoch int.
+
+    Loaded epoch ints are kept as they are until the attribute is first
+    read, then replaced by their datetime.
+    """
+
+    def __set_name__(self, owner, name):
+        """Remember the attribute name."""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """Return the datetime of the attribute, converting it once."""
+        if obj is None:
+            return self
+        try:
+            value = obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        if type(value) is not datetime:
+            value = obj.__dict__[self.name] = to_datetime(value)
+        return value
+
+    def __set__(self, obj, value):
+        """Set the attribute."""
+        obj.__dict__[self.name] = value
+
+    def __delete__(self, obj):
+        """Delete the attribute."""
+        try:
+            del obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+
 class BaseModel:
     """Represents a BaseModel of the HBnB project."""
 
+    created_at = Timestamp()
+    updated_at = Timestamp()
+
     def __init__(self, *args, **kwargs):
         """Initialize a new BaseModel.
 
+        Dates given as ISO 8601 strings are parsed with fromisoformat(),
+        while epoch ints are kept until first read.
+
         Args:
             *args (any): Unused.
             **kwargs (dict): Key/value pairs of attributes.
         """
-        tform = "%Y-%m-%dT%H:%M:%S.%f"
         self.id = str(uuid4())
         self.created_at = datetime.today()
         self.updated_at = datetime.today()
         if len(kwargs) != 0:
             for k, v in kwargs.items():
                 if k == "created_at" or k == "updated_at":
-                    self.__dict__[k] = datetime.strptime(v, tform)
-                else:
-                    self.__dict__[k] = v
+                    if type(v) is not int:
+                        v = to_datetime(v)
+                self._restore(k, v)
         else:
             models.storage.new(self)
 
+    @classmethod
+    def from_dict(cls, odict):
+        """Return the instance described by a to_dict() dictionary.
+
+        Unlike cls(**odict), no id or dates are made only to be
+        replaced, the storage is not told of each attribute, and the
+        instance is not added to the storage.
+
+        Args:
+            odict (dict): Key/value pairs of attributes; __class__ is
+                skipped.
+        """
+        obj = cls.__new__(cls)
+        restore = obj._restore
+        for k, v in odict.items():
+            if k == "created_at" or k == "updated_at":
+                if type(v) is not int:
+                    v = to_datetime(v)
+            elif k == "__class__":
+                continue
+            restore(k, v)
+        if "id" not in odict:
+            restore("id", str(uuid4()))
+        for name in TIMESTAMPS:
+            if name not in odict:
+                restore(name, datetime.today())
+        return obj
+
+    def __setattr__(self, name, value):
+        """Set an attribute and tell the storage the instance changed."""
+        super().__setattr__(name, value)
+        models.storage.touch(self, name)
+
+    def _restore(self, name, value):
+        """Set an attribute without telling the storage, when loading."""
+        self.__dict__[name] = value
+
+    def _attributes(self):
+        """Return the dictionary of the instance attributes."""
+        attrs = self.__dict__
+        for name in TIMESTAMPS:
+            value = attrs.get(name)
+            if value is not None and type(value) is not datetime:
+                attrs[name] = to_datetime(value)
+        return attrs
+
     def save(self):
         """it Update updated_at with the current datetime."""
         current_time = datetime.today()
         self.updated_at = current_time
+        models.storage.new(self)
         models.storage.save()
 
     def to_dict(self):
@@ -41,7 +155,7 @@ class BaseModel:
         Includes a key/value pair __class__ representing
         the class name of a object.
         """
-        rdict = self.__dict__.copy()
+        rdict = self._attributes().copy()
         rdict["created_at"] = self.created_at.isoformat()
         rdict["updated_at"] = self.updated_at.isoformat()
         class_name = self.__class__.__name__
@@ -51,4 +165,5 @@ class BaseModel:
     def __str__(self):
         """Return a print/str representation of the BaseModel instance."""
         class_name = self.__class__.__name__
-        return "[{}] ({}) {}".format(class_name, self.id, self.__dict__)
+        return "[{}] ({}) {}".format(class_name, self.id,
+                                     self._attributes())
@@ -9,6 +9,7 @@ Attributes:
     name (str): The name of the city.
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -23,3 +24,8 @@ class City(BaseModel):
 
     state_id = ""
     name = ""
+
+    @property
+    def places(self):
+        """Return the stored places of the city."""
+        return models.storage.find("Place", "city_id", self.id)
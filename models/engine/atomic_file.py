@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""Defines crash-safe file replacement for the storage engines.
+
+A file is written under a temporary name in the target directory, synced
+to disk and renamed over the target, so readers and a crash mid-write
+only ever see the old or the new content in full.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+def rotate(path, generations):
+    """Keep the current content of path as its newest previous generation.
+
+    Generations are named path.1 (newest) to path.<generations> (oldest);
+    the oldest one is dropped. The current file is hard linked, not
+    moved, so path stays readable until it is replaced.
+
+    Args:
+        path (str): The file about to be replaced.
+        generations (int): The number of previous generations to keep.
+    """
+    if generations <= 0 or not os.path.exists(path):
+        return
+    for i in range(generations - 1, 0, -1):
+        older = "{}.{}".format(path, i)
+        if os.path.exists(older):
+            os.replace(older, "{}.{}".format(path, i + 1))
+    newest = "{}.1".format(path)
+    if os.path.exists(newest):
+        os.remove(newest)
+    try:
+        os.link(path, newest)
+    except OSError:
+        shutil.copy2(path, newest)
+
+
+def sync_dir(path):
+    """Flush the directory entry of path, where the platform allows it."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(path, mode="w", fsync=True, generations=0):
+    """Open a temporary file that replaces path when the block succeeds.
+
+    If the block raises, the temporary file is removed and path is left
+    untouched.
+
+    Args:
+        path (str): The file to replace.
+        mode (str): "w" for text or "wb" for binary content.
+        fsync (bool): Whether to sync the data and the rename to disk.
+        generations (int): The number of previous versions to keep.
+
+    Yields:
+        file: The temporary file to write the new content to.
+    """
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".{}.".format(os.path.basename(path)),
+                               suffix=".tmp", dir=dirname)
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)
+        else:
+            os.chmod(tmp, 0o644)
+        rotate(path, generations)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if fsync:
+        sync_dir(path)
+
+
+def file_stamp(path):
+    """Return the [inode, size, mtime] of a file, which a rewrite changes.
+
+    As atomic_write() renames a new file over the old one, a rewrite
+    changes the inode number as well as the modification time.
+    """
+    st = os.stat(path)
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
@@ -0,0 +1,342 @@
+#!/usr/bin/python3
+"""Defines a columnar store for the numeric attributes of the models.
+
+The int and float attributes a model class declares (for Place:
+number_rooms, number_bathrooms, max_guest, price_by_night, latitude and
+longitude) are kept in one contiguous column per attribute instead of
+one Python object per instance. Instances are row proxies: slotted
+variants of the model class whose numeric attributes read and write
+their row of the columns.
+
+Range filters over the columns are evaluated as NumPy masks when NumPy
+is installed, and with the array module otherwise.
+"""
+import weakref
+from array import array
+from models.slotted import BASE_FIELDS, SlottedModel, declared
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+CODES = {int: "q", float: "d"}
+
+
+def numeric_fields(cls):
+    """Return the names and defaults of the int and float attributes of cls.
+
+    Args:
+        cls (type): A BaseModel subclass.
+    """
+    return {k: v for k, v in vars(cls).items()
+            if not k.startswith("_") and type(v) in CODES}
+
+
+def span(bound):
+    """Return the (low, high) pair of a filter bound.
+
+    A bound is a value to match, or a (low, high) pair where None leaves
+    that end open.
+    """
+    if isinstance(bound, (tuple, list)):
+        low, high = bound
+        return low, high
+    return bound, bound
+
+
+def numeric_bound(bound):
+    """Tell if both ends of a filter bound are numbers or left open."""
+    return all(v is None or type(v) in CODES for v in span(bound))
+
+
+def within(value, bound):
+    """Tell if a value matches a filter bound, see span().
+
+    Values that cannot be compared with the bound do not match.
+    """
+    low, high = span(bound)
+    try:
+        return ((low is None or value >= low) and
+                (high is None or value <= high))
+    except TypeError:
+        return False
+
+
+def to_int(value):
+    """Convert a value set on an int column, such as the string "4"."""
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError("{!r} is not an integer".format(value))
+    return int(value)
+
+
+class ColumnStore:
+    """Represents the numeric columns of the instances of one class.
+
+    Attributes:
+        kinds (dict): the Python type of each column.
+        defaults (dict): the class default of each column.
+        columns (dict): the arrays holding the values, one per column.
+        present (array): the bit mask of the columns set on each row.
+        live (array): 1 for the rows in use, 0 for the free ones.
+        refs (list): a weak reference to the instance of each row.
+        size (int): the number of rows ever allocated.
+        free (list): the rows released and ready to be reused.
+    """
+
+    def __init__(self, defaults):
+        """Initialize a new ColumnStore.
+
+        Args:
+            defaults (dict): The column names mapped to their default.
+        """
+        self.defaults = dict(defaults)
+        self.kinds = {k: type(v) for k, v in self.defaults.items()}
+        self.bits = {k: 1 << i for i, k in enumerate(self.defaults)}
+        self.columns = {k: self.__alloc(CODES[t], 0)
+                        for k, t in self.kinds.items()}
+        self.present = self.__alloc("q", 0)
+        self.live = self.__alloc("b", 0)
+        self.refs = []
+        self.size = 0
+        self.free = []
+
+    def __alloc(self, code, n):
+        """Return a zeroed column of n cells."""
+        if numpy is not None:
+            return numpy.zeros(n, dtype=code)
+        return array(code, bytes(array(code).itemsize * n))
+
+    def __grow(self):
+        """Add room for at least one more row."""
+        if numpy is None:
+            for k, col in self.columns.items():
+                col.append(self.kinds[k]())
+            self.present.append(0)
+            self.live.append(0)
+            return
+        capacity = max(16, 2 * len(self.live))
+
+        def grown(col):
+            new = numpy.zeros(capacity, dtype=col.dtype)
+            new[:len(col)] = col
+            return new
+        self.columns = {k: grown(col) for k, col in self.columns.items()}
+        self.present = grown(self.present)
+        self.live = grown(self.live)
+
+    def allocate(self, obj):
+        """Return a new row for obj, holding the default values."""
+        if self.free:
+            row = self.free.pop()
+            self.refs[row] = weakref.ref(obj)
+        else:
+            if self.size == len(self.live):
+                self.__grow()
+            row = self.size
+            self.size += 1
+            self.refs.append(weakref.ref(obj))
+        for k, col in self.columns.items():
+            col[row] = self.defaults[k]
+        self.present[row] = 0
+        self.live[row] = 1
+        return row
+
+    def release(self, row):
+        """Free a row once its instance is gone."""
+        self.live[row] = 0
+        self.refs[row] = None
+        self.free.append(row)
+
+    def get(self, row, name):
+        """Return the value of one cell as a Python int or float."""
+        return self.kinds[name](self.columns[name][row])
+
+    def set(self, row, name, value):
+        """Set the value of one cell, converting it to the column type.
+
+        Raises:
+            ValueError: If value is not a number of the column type.
+        """
+        kind = self.kinds[name]
+        value = to_int(value) if kind is int else float(value)
+        self.columns[name][row] = value
+        self.present[row] |= self.bits[name]
+
+    def unset(self, row, name):
+        """Reset one cell to the class default."""
+        self.columns[name][row] = self.defaults[name]
+        self.present[row] &= ~self.bits[name]
+
+    def is_set(self, row, name):
+        """Return whether a value was set on one cell."""
+        return bool(self.present[row] & self.bits[name])
+
+    def rows(self, **bounds):
+        """Return the rows in use whose values are within bounds.
+
+        Args:
+            **bounds (dict): Column names mapped to a value or a
+                (low, high) pair, see span().
+
+        Raises:
+            KeyError: If a name is not a column of this store.
+        """
+        n = self.size
+        if numpy is not None:
+            mask = self.live[:n] == 1
+            for name, bound in bounds.items():
+                col = self.columns[name][:n]
+                low, high = span(bound)
+                if low is not None:
+                    mask &= col >= low
+                if high is not None:
+                    mask &= col <= high
+            return numpy.flatnonzero(mask).tolist()
+        live = self.live
+        found = [i for i in range(n) if live[i]]
+        for name, bound in bounds.items():
+            col = self.columns[name]
+            low, high = span(bound)
+            if low is not None:
+                found = [i for i in found if col[i] >= low]
+            if high is not None:
+                found = [i for i in found if col[i] <= high]
+        return found
+
+    def select(self, **bounds):
+        """Return the instances whose values are within bounds."""
+        objects = []
+        for row in self.rows(**bounds):
+            obj = self.refs[row]()
+            if obj is not None:
+                objects.append(obj)
+        return objects
+
+
+class Column:
+    """Represents a numeric attribute kept in a ColumnStore.
+
+    Attributes:
+        name (str): the attribute name.
+        default (int or float): the class default of the attribute.
+    """
+
+    def __init__(self, name, default):
+        """Initialize a new Column.
+
+        Args:
+            name (str): The attribute name.
+            default (int or float): The class default of the attribute.
+        """
+        self.name = name
+        self.default = default
+
+    def __get__(self, obj, cls=None):
+        """Return the value of the row of obj, or the class default."""
+        if obj is None:
+            return self.default
+        row = obj._row
+        if row is None or not obj._columns.is_set(row, self.name):
+            extra = obj._extra
+            if extra is not None and self.name in extra:
+                return extra[self.name]
+            return self.default
+        return obj._columns.get(row, self.name)
+
+    def __set__(self, obj, value):
+        """Set the value of the row of obj, allocating the row if needed.
+
+        A value that is not a number of the column type, such as the
+        string "cheap", goes to the overflow dict and leaves the cell
+        unset, as it would be kept on a plain instance.
+        """
+        row = obj._row
+        if row is None:
+            row = obj._columns.allocate(obj)
+            object.__setattr__(obj, "_row", row)
+        extra = obj._extra
+        try:
+            obj._columns.set(row, self.name, value)
+        except (TypeError, ValueError):
+            obj._columns.unset(row, self.name)
+            if extra is None:
+                extra = {}
+                object.__setattr__(obj, "_extra", extra)
+            extra[self.name] = value
+            return
+        if extra is not None:
+            extra.pop(self.name, None)
+
+    def __delete__(self, obj):
+        """Reset the value of the row of obj to the class default."""
+        row = obj._row
+        extra = obj._extra
+        if extra is not None and self.name in extra:
+            del extra[self.name]
+        elif row is None or not obj._columns.is_set(row, self.name):
+            raise AttributeError(self.name)
+        else:
+            obj._columns.unset(row, self.name)
+
+
+class ColumnarModel(SlottedModel):
+    """Represents the behaviour shared by the row proxy classes.
+
+    Attributes:
+        _columns (ColumnStore): the columns of the class.
+    """
+    __slots__ = ()
+    _columns = None
+
+    def __getattr__(self, name):
+        """Return None for an unallocated row, see SlottedModel."""
+        if name == "_row":
+            return None
+        return super().__getattr__(name)
+
+    def _attributes(self):
+        """Return a dictionary of the set slots, cells and overflow.
+
+        The overflow holds the values a cell could not take.
+        """
+        attrs = super()._attributes()
+        row = self._row
+        if row is not None:
+            store = self._columns
+            for name in store.kinds:
+                if store.is_set(row, name):
+                    attrs[name] = store.get(row, name)
+        return attrs
+
+    def __del__(self):
+        """Free the row of the instance."""
+        row = self._row
+        if row is not None:
+            self._columns.release(row)
+
+
+def columnar(cls):
+    """Return the row proxy class of a model class.
+
+    The proxy class subclasses cls and keeps its name, like the slotted
+    variants of models.slotted; its numeric attributes live in the
+    ColumnStore held by the _columns class attribute.
+
+    Args:
+        cls (type): A BaseModel subclass declaring numeric attributes.
+    """
+    defaults = declared(cls)
+    numeric = numeric_fields(cls)
+    fields = BASE_FIELDS + tuple(k for k in defaults
+                                 if k not in BASE_FIELDS and k not in numeric)
+    namespace = {
+        "__slots__": fields + ("_extra", "_row"),
+        "__module__": cls.__module__,
+        "__doc__": cls.__doc__,
+        "_fields": frozenset(fields + tuple(numeric)),
+        "_defaults": {k: v for k, v in defaults.items() if k not in numeric},
+        "_columns": ColumnStore(numeric)
+    }
+    namespace.update((k, Column(k, v)) for k, v in numeric.items())
+    return type(cls.__name__, (ColumnarModel, cls), namespace)
@@ -0,0 +1,530 @@
+#!/usr/bin/python3
+"""Defines the DBStorage class."""
+import json
+import sqlite3
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+from models.engine.columns import span, within
+from models.engine.file_storage import classes
+from models.engine.geo import KM_PER_DEGREE, scan_nearest, scan_radius
+from models.engine.query import Query
+from models.engine.text_index import TEXT_FIELDS, TextIndex
+from models.engine.serializers import json_default
+from models.slotted import declared
+
+
+SCALARS = (str, int, float)
+
+
+def schema(cls):
+    """Return the names of the attributes a model class declares."""
+    return list(declared(cls))
+
+
+class DBStorage:
+    """DBStorage class for storing instances in a SQLite database.
+
+    Every model class has its own table, with one column per declared
+    attribute and an extra JSON column for ad-hoc attributes. Rows are
+    only read when they are asked for, and save() upserts only the rows
+    of objects changed since the last save.
+
+    Attributes:
+        __connection (Connection): the open database connection.
+        __objects (WeakValueDictionary): the instances read or created,
+            so one row maps to one instance while it is in use.
+        __pending (dict): the changed objects, and None for the deleted
+            ones, keyed by <class name>.id.
+        __options (dict): the tuning knobs of the storage engine.
+        __batch_depth (int): the number of open batch() blocks.
+        __deferred (bool): whether a save() was deferred by batch().
+        __text (TextIndex): the full-text index of the TEXT_FIELDS, or
+            None until the first search().
+    """
+    __connection = None
+    __objects = weakref.WeakValueDictionary()
+    __pending = {}
+    __options = {
+        "db_path": "hbnb.db",
+        "flush_every": 10000,
+        "indexes": {
+            "City": ("state_id",),
+            "Place": ("city_id", "user_id", "latitude"),
+            "Review": ("place_id", "user_id"),
+            "User": ("email",)
+        }
+    }
+    __batch_depth = 0
+    __deferred = False
+    __text = None
+
+    def options(self):
+        """Return a copy of the tuning knobs of the storage engine."""
+        return dict(DBStorage.__options)
+
+    def configure(self, **options):
+        """
+        Sets the tuning knobs of the storage engine.
+
+        Args:
+            **options (dict): Option names and their new values.
+        """
+        for k, v in options.items():
+            if k not in DBStorage.__options:
+                raise TypeError("unknown storage option: {}".format(k))
+            DBStorage.__options[k] = v
+        if "db_path" in options and DBStorage.__connection is not None:
+            self.close()
+
+    def reload(self):
+        """Open the database and create the missing tables and indexes."""
+        if DBStorage.__connection is None:
+            DBStorage.__connection = sqlite3.connect(
+                DBStorage.__options["db_path"])
+        db = DBStorage.__connection
+        for cls_name, cls in classes.items():
+            columns = ", ".join('"{}"'.format(c) for c in schema(cls))
+            if columns:
+                columns += ", "
+            db.execute('CREATE TABLE IF NOT EXISTS "{}" (id TEXT PRIMARY KEY,'
+                       ' created_at TEXT, updated_at TEXT, {}extra TEXT)'
+                       .format(cls_name, columns))
+            for attr in DBStorage.__options["indexes"].get(cls_name, ()):
+                db.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" ON "{0}" '
+                           '("{1}")'.format(cls_name, attr))
+        db.commit()
+
+    def close(self):
+        """Save the pending changes and close the database."""
+        if DBStorage.__connection is None:
+            return
+        self.save()
+        DBStorage.__connection.close()
+        DBStorage.__connection = None
+        DBStorage.__objects = weakref.WeakValueDictionary()
+        DBStorage.__text = None
+
+    def all(self):
+        """Return every stored object, keyed by <class name>.id."""
+        objects = {}
+        for cls_name in classes:
+            objects.update(self.all_of(cls_name))
+        return objects
+
+    def all_of(self, cls_name):
+        """
+        Returns the objects of one class.
+
+        Args:
+            cls_name (str): The class name to look up.
+
+        Returns:
+            dict: The <class name>.id keys mapped to their objects.
+        """
+        if cls_name not in classes:
+            return {}
+        rows = self.__query('SELECT * FROM "{}"'.format(cls_name))
+        return {"{}.{}".format(cls_name, obj.id): obj
+                for obj in self.__build(cls_name, rows)}
+
+    def count(self, cls_name):
+        """
+        Returns the number of objects of one class.
+
+        Args:
+            cls_name (str): The class name to count.
+        """
+        if cls_name not in classes:
+            return 0
+        rows = self.__query('SELECT COUNT(*) FROM "{}"'.format(cls_name))
+        return rows.fetchone()[0]
+
+    def records(self, cls_name):
+        """
+        Yields the to_dict() records of the objects of one class.
+
+        The records are made from the rows as they are read, without
+        building the instances.
+
+        Args:
+            cls_name (str): The class name to read.
+        """
+        if cls_name not in classes:
+            return
+        rows = self.__query('SELECT * FROM "{}"'.format(cls_name))
+        names = [d[0] for d in rows.description]
+        for row in rows:
+            rec = self.__record(names, row)
+            rec["__class__"] = cls_name
+            yield rec
+
+    def get(self, cls_name, obj_id):
+        """
+        Returns one object, reading only its own row.
+
+        Args:
+            cls_name (str): The class name of the object.
+            obj_id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if there is no such object.
+        """
+        key = "{}.{}".format(cls_name, obj_id)
+        obj = DBStorage.__objects.get(key)
+        if obj is not None or cls_name not in classes:
+            return obj
+        rows = self.__query('SELECT * FROM "{}" WHERE id = ?'.format(
+            cls_name), (obj_id,))
+        found = self.__build(cls_name, rows)
+        return found[0] if found else None
+
+    def find(self, cls_name, attr, value):
+        """
+        Returns the objects of one class whose attribute equals a value.
+
+        Declared attributes are matched in SQL, using the column index
+        when there is one; other attributes are compared in Python.
+
+        Args:
+            cls_name (str): The class name to search.
+            attr (str): The attribute name to compare.
+            value (any): The value to match.
+
+        Returns:
+            list: The matching objects.
+        """
+        if cls_name not in classes:
+            return []
+        if attr in schema(classes[cls_name]) and isinstance(value, SCALARS):
+            rows = self.__query('SELECT * FROM "{}" WHERE "{}" = ?'.format(
+                cls_name, attr), (value,))
+            return self.__build(cls_name, rows)
+        return [obj for obj in self.all_of(cls_name).values()
+                if getattr(obj, attr, None) == value]
+
+    def filter(self, cls_name, **bounds):
+        """
+        Returns the objects of one class whose attributes are in bounds.
+
+        Bounds on declared attributes are matched in SQL; other
+        attributes are compared in Python.
+
+        Args:
+            cls_name (str): The class name to search.
+            **bounds (dict): Attribute names mapped to a value to match
+                or a (low, high) pair, where None leaves that end open.
+
+        Returns:
+            list: The matching objects.
+        """
+        if cls_name not in classes:
+            return []
+        columns = schema(classes[cls_name])
+        clauses = []
+        params = []
+        rest = {}
+        for attr, bound in bounds.items():
+            low, high = span(bound)
+            if attr not in columns or not all(
+                    v is None or isinstance(v, SCALARS) for v in (low, high)):
+                rest[attr] = bound
+                continue
+            for op, v in ((">=", low), ("<=", high)):
+                if v is not None:
+                    clauses.append('"{}" {} ?'.format(attr, op))
+                    params.append(v)
+        sql = 'SELECT * FROM "{}"'.format(cls_name)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        rows = self.__query(sql, params)
+        return [obj for obj in self.__build(cls_name, rows)
+                if all(within(getattr(obj, k, None), bound)
+                       for k, bound in rest.items())]
+
+    def near(self, cls_name, lat, lon, km):
+        """
+        Returns the objects of one class within a distance of a point.
+
+        The latitude band of the circle is selected in SQL, using the
+        latitude column index, and the distances are checked in Python.
+
+        Args:
+            cls_name (str): The class name to search.
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            km (float): The search radius in kilometres.
+
+        Returns:
+            list: The matching objects, nearest first.
+        """
+        dlat = km / KM_PER_DEGREE
+        band = self.filter(cls_name, latitude=(lat - dlat, lat + dlat))
+        return scan_radius(band, lat, lon, km)
+
+    def in_box(self, cls_name, south, west, north, east):
+        """
+        Returns the objects of one class inside a latitude/longitude box.
+
+        Args:
+            cls_name (str): The class name to search.
+            south (float): The lowest latitude.
+            west (float): The westmost longitude, greater than east for
+                a box crossing the 180th meridian.
+            north (float): The highest latitude.
+            east (float): The eastmost longitude.
+
+        Returns:
+            list: The matching objects.
+        """
+        if west <= east:
+            return self.filter(cls_name, latitude=(south, north),
+                               longitude=(west, east))
+        return (self.filter(cls_name, latitude=(south, north),
+                            longitude=(west, None)) +
+                self.filter(cls_name, latitude=(south, north),
+                            longitude=(None, east)))
+
+    def nearest(self, cls_name, lat, lon, k=1):
+        """
+        Returns the k objects of one class nearest to a point.
+
+        Args:
+            cls_name (str): The class name to search.
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            k (int): The number of objects to return.
+
+        Returns:
+            list: The objects, nearest first.
+        """
+        return scan_nearest(self.all_of(cls_name).values(), lat, lon, k)
+
+    def search(self, text, cls_name=None, limit=None, prefix=True):
+        """
+        Returns the objects whose text fields match every word of text.
+
+        The full-text index is built from the rows on the first call,
+        then kept up to date as objects are added, changed and deleted
+        until the database is closed.
+
+        Args:
+            text (str): The words to look for.
+            cls_name (str): If set, only objects of this class match.
+            limit (int): If set, the maximum number of objects.
+            prefix (bool): Whether words also match longer words they
+                start, at a lower rank.
+
+        Returns:
+            list: The matching objects, best match first.
+        """
+        if DBStorage.__text is None:
+            DBStorage.__text = TextIndex()
+            for name in TEXT_FIELDS:
+                for key, obj in self.all_of(name).items():
+                    self.__add_text(key, obj)
+        accept = None
+        if cls_name is not None:
+            head = cls_name + "."
+
+            def accept(key):
+                return key.startswith(head)
+        hits = DBStorage.__text.search(text, prefix, accept)
+        objects = []
+        for score, key in hits[:limit]:
+            obj = self.get(*key.split(".", 1))
+            if obj is not None:
+                objects.append(obj)
+        return objects
+
+    def query(self, cls_name):
+        """
+        Returns a lazy query over the objects of one class.
+
+        Args:
+            cls_name (str): The class name to query.
+
+        Returns:
+            Query: The query, see models.engine.query.
+        """
+        return Query(self, cls_name)
+
+    def new(self, obj):
+        """
+        Adds a new object to the storage.
+
+        Args:
+            obj (BaseModel): The object to add.
+        """
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        DBStorage.__objects[key] = obj
+        DBStorage.__pending[key] = obj
+        self.__add_text(key, obj)
+
+    def import_records(self, cls_name, records):
+        """
+        Adds the objects of a stream of records of one class.
+
+        The rows are written into the open transaction every
+        flush_every records, so the objects waiting to be written stay
+        few, and committed once at the end, also if a record fails.
+
+        Args:
+            cls_name (str): The class name of the records.
+            records (iterable): The attribute dicts, as made by to_dict().
+
+        Returns:
+            int: The number of objects added.
+        """
+        cls = classes[cls_name]
+        count = 0
+        with self.batch():
+            try:
+                for rec in records:
+                    self.new(cls.from_dict(rec))
+                    count += 1
+                    if count % DBStorage.__options["flush_every"] == 0:
+                        self.__flush()
+            finally:
+                self.save()
+        return count
+
+    def delete(self, obj=None):
+        """
+        Removes an object from the storage, if it is there.
+
+        Args:
+            obj (BaseModel): The object to remove.
+        """
+        if obj is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        DBStorage.__objects.pop(key, None)
+        DBStorage.__pending[key] = None
+        if DBStorage.__text is not None:
+            DBStorage.__text.remove(key)
+
+    def touch(self, obj, attr=None):
+        """
+        Marks an object as changed since the last save.
+
+        Args:
+            obj (BaseModel): The changed object.
+            attr (str): The name of the attribute that was set.
+        """
+        key = "{}.{}".format(obj.__class__.__name__,
+                             getattr(obj, "id", None))
+        if DBStorage.__objects.get(key) is obj:
+            DBStorage.__pending[key] = obj
+            if attr in TEXT_FIELDS.get(obj.__class__.__name__, ()):
+                self.__add_text(key, obj)
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers every save() made in the block to one commit at its end.
+
+        Yields:
+            DBStorage: This storage engine.
+        """
+        DBStorage.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            DBStorage.__batch_depth -= 1
+            if DBStorage.__batch_depth == 0 and DBStorage.__deferred:
+                DBStorage.__deferred = False
+                self.save()
+
+    def save(self):
+        """Upsert the changed objects, delete the removed ones, commit."""
+        if DBStorage.__batch_depth:
+            DBStorage.__deferred = True
+            return
+        self.__flush()
+        DBStorage.__connection.commit()
+
+    def __query(self, sql, params=()):
+        """Run a query after writing the pending changes it may need."""
+        self.__flush()
+        return DBStorage.__connection.execute(sql, params)
+
+    def __flush(self):
+        """Write the pending changes into the open transaction."""
+        if DBStorage.__connection is None:
+            self.reload()
+        pending = DBStorage.__pending
+        if not pending:
+            return
+        db = DBStorage.__connection
+        for key, obj in pending.items():
+            cls_name, obj_id = key.split(".", 1)
+            if obj is None:
+                db.execute('DELETE FROM "{}" WHERE id = ?'.format(cls_name),
+                           (obj_id,))
+            else:
+                columns, values = self.__row(obj)
+                db.execute(self.__upsert(cls_name, columns), values)
+        pending.clear()
+
+    def __row(self, obj):
+        """Return the column names and values of an object's row."""
+        attrs = obj._attributes().copy()
+        columns = ["id", "created_at", "updated_at"]
+        values = []
+        for c in columns:
+            v = attrs.pop(c, None)
+            values.append(v.isoformat() if isinstance(v, datetime) else v)
+        for c in schema(type(obj)):
+            columns.append(c)
+            v = attrs.get(c)
+            if type(v) in SCALARS:
+                values.append(attrs.pop(c))
+            else:
+                values.append(None)
+        columns.append("extra")
+        values.append(json.dumps(attrs, default=json_default)
+                      if attrs else None)
+        return columns, values
+
+    def __upsert(self, cls_name, columns):
+        """Return the INSERT ... ON CONFLICT statement of a table."""
+        names = ", ".join('"{}"'.format(c) for c in columns)
+        updates = ", ".join('"{0}" = excluded."{0}"'.format(c)
+                            for c in columns[1:])
+        return ('INSERT INTO "{}" ({}) VALUES ({}) ON CONFLICT(id) DO '
+                'UPDATE SET {}'.format(cls_name, names,
+                                       ", ".join("?" * len(columns)),
+                                       updates))
+
+    def __build(self, cls_name, rows):
+        """Return the instances of the given rows of one table.
+
+        Rows of objects already in use map to the same instances.
+        """
+        names = [d[0] for d in rows.description]
+        objects = []
+        for row in rows:
+            key = "{}.{}".format(cls_name, row[0])
+            obj = DBStorage.__objects.get(key)
+            if obj is None:
+                obj = classes[cls_name].from_dict(self.__record(names, row))
+                DBStorage.__objects[key] = obj
+            objects.append(obj)
+        return objects
+
+    def __record(self, names, row):
+        """Return the attribute dict of a row, with its extra attributes."""
+        rec = {k: v for k, v in zip(names, row)
+               if v is not None and k != "extra"}
+        extra = row[names.index("extra")]
+        if extra is not None:
+            rec.update(json.loads(extra))
+        return rec
+
+    def __add_text(self, key, obj):
+        """Index the TEXT_FIELDS of an object, once the index is built."""
+        fields = TEXT_FIELDS.get(obj.__class__.__name__)
+        if DBStorage.__text is not None and fields:
+            DBStorage.__text.add(key, [getattr(obj, f, None)
+                                       for f in fields])
@@ -1,13 +1,50 @@
 #!/usr/bin/python3
 """Defines the FileStorage class."""
+import atexit
+import io
 import json
-from models.base_model import BaseModel
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from itertools import chain
+from models.engine.atomic_file import atomic_write, file_stamp
+from models.engine.columns import columnar, numeric_bound, numeric_fields, \
+    within
+from models.engine.geo import GridIndex
+from models.engine.keys import ObjectMap, shared_id, split_key
+from models.engine.query import Query
+from models.engine.serializers import detect, serializers
+from models.engine.shards import group, list_shards, read_shard, \
+    read_shards, shard_dir, shard_name, shard_path
+from models.engine.text_index import TEXT_FIELDS, TextIndex
+from models.base_model import BaseModel, TIMESTAMPS, to_datetime, \
+    to_epoch
 from models.user import User
 from models.state import State
 from models.city import City
 from models.place import Place
 from models.amenity import Amenity
 from models.review import Review
+from models.slotted import slotted
+
+
+classes = {
+    "BaseModel": BaseModel,
+    "User": User,
+    "State": State,
+    "City": City,
+    "Place": Place,
+    "Amenity": Amenity,
+    "Review": Review
+}
+slotted_classes = {name: slotted(cls) for name, cls in classes.items()}
+columnar_classes = {name: columnar(cls) for name, cls in classes.items()
+                    if numeric_fields(cls)}
+geo_classes = tuple(name for name, cls in classes.items()
+                    if hasattr(cls, "latitude") and hasattr(cls, "longitude"))
+GEO_ATTRS = ("latitude", "longitude")
 
 
 class FileStorage:
@@ -17,59 +54,1144 @@ class FileStorage:
     Attributes:
         __file_path (str): a name of the file to save objects to.
         __objects (dict): the dictionary of instantiated objects.
+        __options (dict): the tuning knobs of the storage engine.
+        __pending (dict): the keys changed since the last save, mapped
+            to "set" or "del".
+        __journal_size (int): the number of records in the journal.
+        __by_class (dict): the objects of __objects grouped by class name.
+        __attr_index (dict): the objects grouped by the value of each
+            indexed attribute, keyed by (class name, attribute).
+        __indexed_values (dict): the indexed attribute values of each key.
+        __indexed_for (dict): the object dictionary the indexes describe.
+        __geo (dict): the GridIndex over the coordinates of the objects
+            of each class with latitude and longitude attributes.
+        __text (TextIndex): the full-text index of the text_fields, or
+            None until the first search().
+        __text_saved (tuple): the TextIndex last written, with its
+            version then and the path it was written to.
+        __compact_keys (bool): whether __objects is an ObjectMap, in which
+            case it also groups the objects by class, and the indexes
+            are keyed by the id strings the objects hold.
+        __raw (dict): the loaded records not turned into instances yet,
+            grouped by class name (lazy mode).
+        __unread (dict): the shard file of each class whose records are
+            not read yet (lazy mode with one shard per class).
+        __dirty (set): the id() of every object changed since the last
+            snapshot.
+        __dirty_classes (set): the class names of those objects.
+        __cache (dict): the serialized snapshot text of each key, with
+            the object or record it was made from.
+        __cache_for (dict): the object dictionary the cache was made
+            from, and the snapshot files were last read or written for.
+        __batch_depth (int): the number of open batch() blocks.
+        __deferred (bool): whether a save() was deferred by batch().
+        __lock (RLock): guards the object maps against the writer thread.
+        __write_lock (RLock): lets one thread at a time write the files.
+        __wakeup (Condition): wakes the writer thread when a save() is
+            owed.
+        __flush_owed (bool): whether an asynchronous save() is owed.
+        __writer (Thread): the background writer thread, once started.
+        __write_error (Exception): the last error of the writer thread.
     """
     __file_path = "file.json"
     __objects = {}
+    __options = {
+        "persist": True,
+        "journal": False,
+        "journal_path": "file.json.log",
+        "compact_every": 1000,
+        "lazy": False,
+        "stream": False,
+        "format": "json",
+        "fsync": True,
+        "generations": 0,
+        "async_flush": False,
+        "flush_delay": 0.5,
+        "slots": False,
+        "columnar": False,
+        "geo_cell": 0.01,
+        "epoch_times": False,
+        "compact_keys": False,
+        "shards": "",
+        "reload_workers": 0,
+        "text_index_path": "",
+        "text_fields": TEXT_FIELDS,
+        "indexes": {
+            "City": ("state_id",),
+            "Review": ("place_id", "user_id"),
+            "Place": ("city_id", "user_id"),
+            "User": ("email",)
+        }
+    }
+    __pending = {}
+    __journal_size = 0
+    __by_class = {}
+    __attr_index = {}
+    __indexed_values = {}
+    __indexed_for = None
+    __geo = {}
+    __text = None
+    __text_saved = None
+    __compact_keys = False
+    __raw = {}
+    __unread = {}
+    __dirty = set()
+    __dirty_classes = set()
+    __cache = {}
+    __cache_for = None
+    __batch_depth = 0
+    __deferred = False
+    __lock = threading.RLock()
+    __write_lock = threading.RLock()
+    __wakeup = threading.Condition()
+    __flush_owed = False
+    __writer = None
+    __write_error = None
 
     def all(self):
         """Return the dictionary __objects."""
+        for cls_name in list(chain(FileStorage.__unread, FileStorage.__raw)):
+            self.__hydrate_class(cls_name)
         return FileStorage.__objects
 
+    def get(self, cls_name, obj_id):
+        """
+        Returns one object, building only that instance in lazy mode.
+
+        Args:
+            cls_name (str): The class name of the object.
+            obj_id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if there is no such object.
+        """
+        key = "{}.{}".format(cls_name, obj_id)
+        self.__read_class(cls_name)
+        if key in FileStorage.__raw.get(cls_name, {}):
+            self.__hydrate(key)
+        return FileStorage.__objects.get(key)
+
+    def all_of(self, cls_name):
+        """
+        Returns the objects of one class.
+
+        Args:
+            cls_name (str): The class name to look up.
+
+        Returns:
+            dict: The <class name>.id keys mapped to their objects.
+        """
+        self.__hydrate_class(cls_name)
+        return self.__built(cls_name)
+
+    def __built(self, cls_name):
+        """Return the built objects of one class, keyed by key."""
+        self.__sync_indexes()
+        if FileStorage.__compact_keys:
+            return FileStorage.__objects.of_class(cls_name)
+        return FileStorage.__by_class.get(cls_name, {})
+
+    def count(self, cls_name):
+        """
+        Returns the number of objects of one class.
+
+        Args:
+            cls_name (str): The class name to count.
+        """
+        self.__read_class(cls_name)
+        return (len(self.__built(cls_name)) +
+                len(FileStorage.__raw.get(cls_name, {})))
+
+    def records(self, cls_name):
+        """
+        Yields the to_dict() records of the objects of one class.
+
+        In lazy mode the records not built yet are yielded as they were
+        loaded, with their dates in ISO 8601, without building their
+        instances.
+
+        Args:
+            cls_name (str): The class name to read.
+        """
+        self.__read_class(cls_name)
+        for obj in list(self.__built(cls_name).values()):
+            yield obj.to_dict()
+        for rec in list(FileStorage.__raw.get(cls_name, {}).values()):
+            rec = dict(rec)
+            for name in TIMESTAMPS:
+                if name in rec:
+                    rec[name] = to_datetime(rec[name]).isoformat()
+            yield rec
+
+    def find(self, cls_name, attr, value):
+        """
+        Returns the objects of one class whose attribute equals a value.
+
+        The attribute index is used when there is one for cls_name and
+        attr, otherwise the objects of the class are scanned. In lazy
+        mode the records of the class are built first, so the index
+        covers all of them.
+
+        Args:
+            cls_name (str): The class name to search.
+            attr (str): The attribute name to compare.
+            value (any): The value to match.
+
+        Returns:
+            list: The matching objects.
+        """
+        self.__hydrate_class(cls_name)
+        self.__sync_indexes()
+        index = FileStorage.__attr_index.get((cls_name, attr))
+        if index is not None:
+            try:
+                return list(index.get(value, {}).values())
+            except TypeError:
+                pass
+        return [obj for obj in self.all_of(cls_name).values()
+                if getattr(obj, attr, None) == value]
+
+    def filter(self, cls_name, **bounds):
+        """
+        Returns the objects of one class whose attributes are in bounds.
+
+        With the columnar option, bounds on numeric attributes run as
+        vectorized masks over the column store of the class; otherwise,
+        and for the objects not built from a snapshot or holding a value
+        a column could not take, the objects of the class are scanned.
+
+        Args:
+            cls_name (str): The class name to search.
+            **bounds (dict): Attribute names mapped to a value to match
+                or a (low, high) pair, where None leaves that end open.
+
+        Returns:
+            list: The matching objects.
+        """
+        objects = self.all_of(cls_name)
+
+        def matches(obj):
+            return all(within(getattr(obj, k, None), bound)
+                       for k, bound in bounds.items())
+        proxy = columnar_classes.get(cls_name)
+        if (not FileStorage.__options["columnar"] or proxy is None or
+                not set(bounds) <= set(proxy._columns.kinds) or
+                not all(map(numeric_bound, bounds.values()))):
+            return [obj for obj in objects.values() if matches(obj)]
+
+        def scanned(obj):
+            return (type(obj) is not proxy or
+                    not bounds.keys().isdisjoint(obj._extra or ()))
+        found = [obj for obj in proxy._columns.select(**bounds)
+                 if objects.get("{}.{}".format(cls_name, obj.id)) is obj and
+                 not scanned(obj)]
+        found.extend(obj for obj in objects.values()
+                     if scanned(obj) and matches(obj))
+        return found
+
+    def near(self, cls_name, lat, lon, km):
+        """
+        Returns the objects of one class within a distance of a point.
+
+        Args:
+            cls_name (str): The class name to search.
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            km (float): The search radius in kilometres.
+
+        Returns:
+            list: The matching objects, nearest first.
+        """
+        geo = self.__geo_index(cls_name)
+        return geo.radius(lat, lon, km) if geo else []
+
+    def in_box(self, cls_name, south, west, north, east):
+        """
+        Returns the objects of one class inside a latitude/longitude box.
+
+        Args:
+            cls_name (str): The class name to search.
+            south (float): The lowest latitude.
+            west (float): The westmost longitude, greater than east for
+                a box crossing the 180th meridian.
+            north (float): The highest latitude.
+            east (float): The eastmost longitude.
+
+        Returns:
+            list: The matching objects.
+        """
+        geo = self.__geo_index(cls_name)
+        return geo.bbox(south, west, north, east) if geo else []
+
+    def nearest(self, cls_name, lat, lon, k=1):
+        """
+        Returns the k objects of one class nearest to a point.
+
+        Args:
+            cls_name (str): The class name to search.
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            k (int): The number of objects to return.
+
+        Returns:
+            list: The objects, nearest first.
+        """
+        geo = self.__geo_index(cls_name)
+        return geo.nearest(lat, lon, k) if geo else []
+
+    def __geo_index(self, cls_name):
+        """Return the up to date GridIndex of a class, or None."""
+        self.all_of(cls_name)
+        return FileStorage.__geo.get(cls_name)
+
+    def search(self, text, cls_name=None, limit=None, prefix=True):
+        """
+        Returns the objects whose text_fields match every word of text.
+
+        The full-text index is built on the first call, then kept up to
+        date as objects are added, changed and deleted, and written next
+        to the snapshot so a later reload can read it back.
+
+        Args:
+            text (str): The words to look for.
+            cls_name (str): If set, only objects of this class match.
+            limit (int): If set, the maximum number of objects.
+            prefix (bool): Whether words also match longer words they
+                start, at a lower rank.
+
+        Returns:
+            list: The matching objects, best match first.
+        """
+        with FileStorage.__lock:
+            self.__sync_indexes()
+            if FileStorage.__text is None:
+                self.__build_text()
+            accept = None
+            if cls_name is not None:
+                head = cls_name + "."
+
+                def accept(key):
+                    return key.startswith(head)
+            hits = FileStorage.__text.search(text, prefix, accept)
+        objects = []
+        for score, key in hits[:limit]:
+            obj = self.get(*key.split(".", 1))
+            if obj is not None:
+                objects.append(obj)
+        return objects
+
+    def __build_text(self):
+        """Index the text_fields of every object and stashed record."""
+        for cls_name in list(FileStorage.__unread):
+            self.__read_class(cls_name)
+        FileStorage.__text = TextIndex()
+        for key, src in chain(
+                FileStorage.__objects.items(),
+                *(r.items() for r in FileStorage.__raw.values())):
+            self.__add_text(key, src)
+
+    def __add_text(self, key, src):
+        """Index the text_fields of an object or of a loaded record."""
+        text = FileStorage.__text
+        if text is None:
+            return
+        fields = FileStorage.__options["text_fields"].get(
+            key.split(".", 1)[0])
+        if not fields:
+            return
+        if type(src) is dict:
+            text.add(key, [src.get(f) for f in fields])
+        else:
+            text.add(key, [getattr(src, f, None) for f in fields])
+
+    def query(self, cls_name):
+        """
+        Returns a lazy query over the objects of one class.
+
+        Args:
+            cls_name (str): The class name to query.
+
+        Returns:
+            Query: The query, see models.engine.query.
+        """
+        return Query(self, cls_name)
+
     def new(self, obj):
         """
         Adds a new object to the storage.
 
+        Calling it again for a stored object refreshes its index entries
+        after attribute updates.
+
         Args:
             obj (BaseModel): The object to add.
         """
         ocname = obj.__class__.__name__
-        FileStorage.__objects["{}.{}".format(ocname, obj.id)] = obj
+        key = "{}.{}".format(ocname, obj.id)
+        FileStorage.__raw.get(ocname, {}).pop(key, None)
+        self.__put(key, obj)
+        with FileStorage.__lock:
+            self.__add_text(key, obj)
+        FileStorage.__pending[key] = "set"
 
-    def save(self):
-        """Serializes the objects to a JSON file."""
+    def import_records(self, cls_name, records):
+        """
+        Adds the objects of a stream of records of one class.
+
+        Each record is built like a reloaded one, by from_dict() on the
+        class variant the options pick, without storage.new() for every
+        attribute, and the objects are saved once at the end, also if a
+        record fails.
+
+        Args:
+            cls_name (str): The class name of the records.
+            records (iterable): The attribute dicts, as made by to_dict().
+
+        Returns:
+            int: The number of objects added.
+        """
+        count = 0
+        with self.batch():
+            try:
+                for rec in records:
+                    rec["__class__"] = cls_name
+                    obj = self.__build(rec)
+                    key = "{}.{}".format(cls_name, obj.id)
+                    FileStorage.__raw.get(cls_name, {}).pop(key, None)
+                    self.__put(key, obj)
+                    with FileStorage.__lock:
+                        self.__add_text(key, obj)
+                    FileStorage.__pending[key] = "set"
+                    count += 1
+            finally:
+                self.save()
+        return count
+
+    def delete(self, obj=None):
+        """
+        Removes an object from the storage, if it is there.
+
+        Args:
+            obj (BaseModel): The object to remove.
+        """
+        if obj is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        if self.__discard(key):
+            FileStorage.__pending[key] = "del"
+
+    def touch(self, obj, attr=None):
+        """
+        Marks an object as changed since the last snapshot.
+
+        BaseModel calls it whenever one of its attributes is set, which
+        also keeps the attribute indexes up to date. A stored object is
+        marked as set in __pending, so the journal records the change.
+
+        Args:
+            obj (BaseModel): The changed object.
+            attr (str): The name of the attribute that was set.
+        """
+        cls_name = obj.__class__.__name__
+        key = "{}.{}".format(cls_name, getattr(obj, "id", None))
+        with FileStorage.__lock:
+            FileStorage.__dirty.add(id(obj))
+            FileStorage.__dirty_classes.add(cls_name)
+            if FileStorage.__objects.get(key) is not obj:
+                return
+            FileStorage.__pending[key] = "set"
+            if (attr in FileStorage.__options["indexes"].get(cls_name, ()) or
+                    attr in GEO_ATTRS and cls_name in geo_classes):
+                self.__sync_indexes()
+                self.__index(key, obj)
+            if (FileStorage.__text is not None and attr in
+                    FileStorage.__options["text_fields"].get(cls_name, ())):
+                self.__add_text(key, obj)
+
+    def __put(self, key, obj):
+        """Store and index an object without marking it as changed."""
+        with FileStorage.__lock:
+            self.__sync_indexes()
+            FileStorage.__objects[key] = obj
+            self.__index(key, obj)
+
+    def __discard(self, key):
+        """Drop a key from __objects and __raw, and tell if it was there."""
+        with FileStorage.__lock:
+            self.__sync_indexes()
+            found = FileStorage.__objects.pop(key, None) is not None
+            if found:
+                self.__unindex(key)
+            if FileStorage.__text is not None:
+                FileStorage.__text.remove(key)
+            raw = FileStorage.__raw.get(key.split(".", 1)[0], {})
+            return raw.pop(key, None) is not None or found
+
+    def __stash(self, key, rec):
+        """Keep a loaded record unbuilt until it is first used."""
+        self.__discard(key)
+        FileStorage.__raw.setdefault(rec["__class__"], {})[key] = rec
+        self.__add_text(key, rec)
+
+    def __hydrate(self, key):
+        """Build the instance of one stashed record."""
+        rec = FileStorage.__raw[key.split(".", 1)[0]].pop(key)
+        self.__put(key, self.__build(rec))
+
+    def __hydrate_class(self, cls_name):
+        """Build the instances of every stashed record of one class."""
+        self.__read_class(cls_name)
+        for key in list(FileStorage.__raw.get(cls_name, ())):
+            self.__hydrate(key)
+        FileStorage.__raw.pop(cls_name, None)
+
+    def __read_class(self, cls_name):
+        """Stash the records of a class whose shard is not read yet.
+
+        The keys changed since the reload are newer in memory, so their
+        records are skipped.
+        """
+        path = FileStorage.__unread.pop(cls_name, None)
+        if path is None:
+            return
+        for key, rec in read_shard(path, FileStorage.__options["stream"]):
+            if key not in FileStorage.__pending:
+                self.__stash(key, rec)
+
+    def __index(self, key, obj):
+        """Add or refresh the index entries of one stored object."""
+        cls_name, oid = split_key(key)
+        self.__unindex(key)
+        if FileStorage.__compact_keys:
+            ref = shared_id(oid, obj)
+        else:
+            ref = key
+            FileStorage.__by_class.setdefault(cls_name, {})[key] = obj
+        values = {}
+        for attr in FileStorage.__options["indexes"].get(cls_name, ()):
+            value = getattr(obj, attr, None)
+            index = FileStorage.__attr_index.setdefault((cls_name, attr), {})
+            try:
+                index.setdefault(value, {})[ref] = obj
+            except TypeError:
+                continue
+            values[attr] = value
+        if FileStorage.__compact_keys:
+            FileStorage.__indexed_values.put(cls_name, ref, values)
+        else:
+            FileStorage.__indexed_values[key] = values
+        if cls_name in geo_classes:
+            if cls_name not in FileStorage.__geo:
+                FileStorage.__geo[cls_name] = GridIndex(
+                    FileStorage.__options["geo_cell"])
+            FileStorage.__geo[cls_name].add(ref, obj)
+
+    def __unindex(self, key):
+        """Drop the index entries of one key, if it has any."""
+        values = FileStorage.__indexed_values.pop(key, None)
+        if values is None:
+            return
+        cls_name, oid = split_key(key)
+        if FileStorage.__compact_keys:
+            ref = oid
+        else:
+            ref = key
+            FileStorage.__by_class[cls_name].pop(key, None)
+        if cls_name in FileStorage.__geo:
+            FileStorage.__geo[cls_name].remove(ref)
+        for attr, value in values.items():
+            index = FileStorage.__attr_index[(cls_name, attr)]
+            index[value].pop(ref, None)
+            if not index[value]:
+                del index[value]
+
+    def __sync_indexes(self):
+        """Rebuild the indexes if __objects was replaced or edited directly.
+
+        Only the identity and the size of __objects are checked, so the
+        check is O(1) on every call.
+        """
         odict = FileStorage.__objects
-        objdict = {obj: odict[obj].to_dict() for obj in odict.keys()}
-        with open(FileStorage.__file_path, "w") as f:
-            json.dump(objdict, f)
+        if (FileStorage.__indexed_for is odict and
+                len(FileStorage.__indexed_values) == len(odict)):
+            return
+        FileStorage.__compact_keys = type(odict) is ObjectMap
+        FileStorage.__by_class = {}
+        FileStorage.__attr_index = {}
+        FileStorage.__indexed_values = {}
+        if FileStorage.__compact_keys:
+            FileStorage.__indexed_values = ObjectMap()
+        FileStorage.__geo = {}
+        FileStorage.__text = None
+        FileStorage.__indexed_for = odict
+        for key, obj in odict.items():
+            self.__index(key, obj)
 
-    def reload(self):
-        """Deserialize the JSON file __file_path to __objects, if it exists."""
+    def options(self):
+        """Return a copy of the tuning knobs of the storage engine."""
+        options = dict(FileStorage.__options)
+        options["file_path"] = FileStorage.__file_path
+        return options
+
+    def configure(self, **options):
+        """
+        Sets the tuning knobs of the storage engine.
+
+        The file_path option sets __file_path, and format picks one of
+        the snapshot formats of models.engine.serializers. The shards
+        option is "" for a single snapshot file, "class" for one shard
+        file per class, or a number of hash buckets.
+
+        Args:
+            **options (dict): Option names and their new values.
+        """
+        for k, v in options.items():
+            if k == "file_path":
+                FileStorage.__file_path = v
+                continue
+            if k not in FileStorage.__options:
+                raise TypeError("unknown storage option: {}".format(k))
+            if k == "format" and v not in serializers:
+                raise TypeError("unknown storage format: {}".format(v))
+            if k == "shards" and v and v != "class" and not (
+                    str(v).isdigit() and int(v) > 0):
+                raise TypeError("unknown shard layout: {}".format(v))
+            FileStorage.__options[k] = v
+        if "indexes" in options or "geo_cell" in options:
+            FileStorage.__indexed_for = None
+        if "text_fields" in options:
+            FileStorage.__text = None
+        if ("format" in options or "epoch_times" in options or
+                "shards" in options):
+            FileStorage.__cache = {}
+            FileStorage.__cache_for = None
+        if "compact_keys" in options:
+            self.__use_key_map()
+
+    def __use_key_map(self):
+        """Turn __objects into the mapping the compact_keys option asks for.
+
+        The indexes follow on the next __sync_indexes(), as __objects is
+        then a new mapping.
+        """
+        kind = ObjectMap if FileStorage.__options["compact_keys"] else dict
+        with FileStorage.__lock:
+            if type(FileStorage.__objects) is not kind:
+                FileStorage.__objects = kind(FileStorage.__objects)
+                FileStorage.__cache = {}
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers every save() made in the block to one write at its end.
+
+        Blocks can be nested; the write happens when the outermost one
+        exits, also when it exits with an exception, since the changed
+        objects are already in __objects.
+
+        Yields:
+            FileStorage: This storage engine.
+        """
+        FileStorage.__batch_depth += 1
         try:
-            with open(FileStorage.__file_path) as f:
-                objdict = json.load(f)
-                for o in objdict.values():
-                    cls_name = o["__class__"]
-                    del o["__class__"]
-                    self.new(eval(cls_name)(**o))
-        except FileNotFoundError:
+            yield self
+        finally:
+            FileStorage.__batch_depth -= 1
+            if FileStorage.__batch_depth == 0 and FileStorage.__deferred:
+                FileStorage.__deferred = False
+                self.save()
+
+    def save(self):
+        """Serializes the objects to a JSON file.
+
+        In journal mode only the objects changed since the last save are
+        appended to the journal, and the journal is folded into the
+        snapshot once it holds compact_every records, or as many records
+        as the snapshot holds objects if that is more, so the rewrites
+        cost a flat amount per appended record. Inside a batch()
+        block nothing is written until the block ends. In async_flush
+        mode the write is left to the background writer thread, which
+        folds the saves of the next flush_delay seconds into one write.
+        With persist off (the memory engine) nothing is written.
+        """
+        if FileStorage.__batch_depth:
+            FileStorage.__deferred = True
+            return
+        if not FileStorage.__options["persist"]:
+            with FileStorage.__lock:
+                FileStorage.__pending = {}
+                FileStorage.__dirty = set()
+                FileStorage.__dirty_classes = set()
             return
+        if FileStorage.__options["async_flush"]:
+            self.__request_flush()
+            return
+        with FileStorage.__write_lock:
+            self.__write()
+
+    def flush(self):
+        """Writes any save() still owed to the writer thread.
+
+        It returns once the objects saved before the call are on disk,
+        and raises the error of a failed background write, if any.
+        """
+        with FileStorage.__write_lock:
+            with FileStorage.__wakeup:
+                owed = FileStorage.__flush_owed
+                FileStorage.__flush_owed = False
+            if owed:
+                self.__write()
+        error = FileStorage.__write_error
+        FileStorage.__write_error = None
+        if error is not None:
+            raise error
+
+    def __request_flush(self):
+        """Mark a save() as owed and wake the writer thread."""
+        with FileStorage.__wakeup:
+            FileStorage.__flush_owed = True
+            writer = FileStorage.__writer
+            if writer is None or not writer.is_alive():
+                writer = threading.Thread(target=self.__writer_loop,
+                                          name="FileStorage-writer",
+                                          daemon=True)
+                FileStorage.__writer = writer
+                atexit.register(self.flush)
+                writer.start()
+            FileStorage.__wakeup.notify()
+
+    def __writer_loop(self):
+        """Write owed saves, waiting flush_delay to gather a burst."""
+        while True:
+            with FileStorage.__wakeup:
+                while not FileStorage.__flush_owed:
+                    FileStorage.__wakeup.wait()
+            time.sleep(FileStorage.__options["flush_delay"])
+            try:
+                with FileStorage.__write_lock:
+                    with FileStorage.__wakeup:
+                        owed = FileStorage.__flush_owed
+                        FileStorage.__flush_owed = False
+                    if owed:
+                        self.__write()
+            except Exception as error:
+                FileStorage.__write_error = error
+
+    def __write(self):
+        """Write the owed changes; the caller holds __write_lock."""
+        if FileStorage.__options["journal"]:
+            self.__append_journal()
+        else:
+            self.__write_snapshot()
+
+    def __append_journal(self):
+        """Append one record per changed key to the journal."""
+        with FileStorage.__lock:
+            pending = FileStorage.__pending
+            FileStorage.__pending = {}
+            odict = FileStorage.__objects
+            changes = [(key, odict.get(key) if op == "set" else None)
+                       for key, op in pending.items()]
+        try:
+            with open(FileStorage.__options["journal_path"], "a") as f:
+                for key, obj in changes:
+                    if obj is not None:
+                        rec = {"op": "set", "key": key,
+                               "obj": self.__record(obj.to_dict())}
+                    else:
+                        rec = {"op": "del", "key": key}
+                    f.write(json.dumps(rec) + "\n")
+                if FileStorage.__options["fsync"]:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except BaseException:
+            self.__restore(set(), pending)
+            raise
+        FileStorage.__journal_size += len(changes)
+        size = len(FileStorage.__objects) + sum(
+            len(records) for records in FileStorage.__raw.values())
+        if FileStorage.__journal_size >= max(
+                FileStorage.__options["compact_every"], size):
+            self.__compact()
+
+    def compact(self):
+        """Fold the journal into the snapshot and truncate the journal."""
+        with FileStorage.__write_lock:
+            self.__compact()
+
+    def __compact(self):
+        """Fold the journal; the caller holds __write_lock."""
+        self.__write_snapshot()
+        if os.path.exists(FileStorage.__options["journal_path"]):
+            os.remove(FileStorage.__options["journal_path"])
+        FileStorage.__journal_size = 0
+
+    def __write_snapshot(self):
+        """Write every object to the snapshot file __file_path.
+
+        The serialized text of each record is cached, so only the objects
+        changed since the last snapshot go through to_dict() and the JSON
+        encoder again. The file is replaced atomically, keeping the
+        number of previous versions set by the generations option. The
+        object maps are only locked while the records to write are
+        collected, not while they are encoded and written. With the
+        shards option the snapshot is written as shard files instead,
+        see models.engine.shards, and only the shards whose objects
+        changed are written again. With one shard per class, the
+        objects of the classes without changes are not even looked at.
+        The shard of a class not read yet is read first if one of its
+        keys changed, and left as it is otherwise. The files of the
+        other layout are removed once the new snapshot is written.
+        """
+        with FileStorage.__lock:
+            for key in list(FileStorage.__pending):
+                self.__read_class(key.split(".", 1)[0])
+            unread = list(FileStorage.__unread.values())
+            dirty = FileStorage.__dirty
+            pending = FileStorage.__pending
+            dirty_classes = FileStorage.__dirty_classes
+            synced = self.__synced()
+            clean = self.__clean_classes(synced, pending, dirty_classes)
+            sources = list(self.__sources(clean))
+            objects = FileStorage.__objects
+            FileStorage.__dirty = set()
+            FileStorage.__pending = {}
+            FileStorage.__dirty_classes = set()
+            text = FileStorage.__text
+            docs = None
+            if text is not None:
+                path = self.__text_path()
+                saved = (text, text.version, path)
+                if (FileStorage.__text_saved != saved or
+                        not os.path.exists(path)):
+                    docs = text.records()
+            compact = type(objects) is ObjectMap
+        cache = FileStorage.__cache
+        options = FileStorage.__options
+        if compact or options["shards"] == "class":
+            fresh = ObjectMap()
+        else:
+            fresh = {}
+        for cls_name in clean:
+            fresh.put_class(cls_name, cache.classes[cls_name])
+        serializer = serializers[options["format"]]
+        mode = "wb" if serializer.binary else "w"
+        changed = set(pending) if synced else None
+        try:
+            for key, src in sources:
+                entry = cache.get(key)
+                if entry is None or entry[0] is not src or id(src) in dirty:
+                    if type(src) is dict:
+                        rec = src
+                    else:
+                        rec = self.__record(serializer.record(src))
+                    entry = (src, serializer.encode(key, rec))
+                    if changed is not None and id(src) in dirty:
+                        changed.add(key)
+                if type(fresh) is ObjectMap:
+                    cls_name, oid = split_key(key)
+                    fresh.put(cls_name, shared_id(oid, src), entry)
+                else:
+                    fresh[key] = entry
+            if options["shards"]:
+                self.__write_shards(fresh, changed, unread, serializer, mode)
+            else:
+                with atomic_write(FileStorage.__file_path, mode,
+                                  options["fsync"],
+                                  options["generations"]) as f:
+                    serializer.write(f, (entry[1]
+                                         for entry in fresh.values()))
+                if os.path.isdir(shard_dir(FileStorage.__file_path)):
+                    shutil.rmtree(shard_dir(FileStorage.__file_path))
+        except BaseException:
+            self.__restore(dirty, pending, dirty_classes)
+            raise
+        FileStorage.__cache = fresh
+        FileStorage.__cache_for = objects
+        if text is not None:
+            self.__write_text(docs, saved)
+
+    def __write_text(self, docs, saved):
+        """Write the full-text index if it changed, and its stamp file.
+
+        The index is only written again when documents were added or
+        removed since it was last written. The stamp file, written with
+        every snapshot, ties the index file to the current snapshot.
+
+        Args:
+            docs (dict): The records() of the index, or None if the
+                index file is current.
+            saved (tuple): The TextIndex, its version and the path.
+        """
+        path = saved[2]
+        fsync = FileStorage.__options["fsync"]
+        if docs is not None:
+            with atomic_write(path, "w", fsync) as f:
+                json.dump(docs, f)
+            FileStorage.__text_saved = saved
+        with atomic_write(path + ".stamp", "w", fsync) as f:
+            json.dump({"stamp": self.__stamp(), "index": file_stamp(path)},
+                      f)
+
+    def __text_path(self):
+        """Return the text_index_path, or __file_path with .idx added."""
+        return (FileStorage.__options["text_index_path"] or
+                FileStorage.__file_path + ".idx")
+
+    def __synced(self):
+        """Tell if the files match __objects but for the keys changed.
+
+        That holds once __objects is read or written, until it is
+        replaced, except for the changes replayed from the journal.
+        """
+        return (FileStorage.__cache_for is FileStorage.__objects and
+                not FileStorage.__options["journal"])
+
+    def __clean_classes(self, synced, pending, dirty_classes):
+        """Return the classes whose cached snapshot entries are current.
+
+        Only with one shard per class: a class is clean when none of
+        its objects was changed, added or removed since the last
+        snapshot.
+        """
+        cache = FileStorage.__cache
+        if (not synced or FileStorage.__options["shards"] != "class" or
+                type(cache) is not ObjectMap):
+            return set()
+        changed = {key.split(".", 1)[0] for key in pending}
+        changed.update(dirty_classes)
+        return set(cache.classes) - changed
+
+    def __sources(self, clean=()):
+        """Return the (key, object or record) pairs to snapshot.
+
+        Args:
+            clean (set): The class names to leave out.
+        """
+        raw = FileStorage.__raw
+        if not clean:
+            return chain(FileStorage.__objects.items(),
+                         *(records.items() for records in raw.values()))
+        self.__sync_indexes()
+        if FileStorage.__compact_keys:
+            objects = FileStorage.__objects.classes
+        else:
+            objects = FileStorage.__by_class
+        parts = []
+        for cls_name in set(chain(objects, raw)) - clean:
+            if FileStorage.__compact_keys:
+                parts.append(FileStorage.__objects.of_class(cls_name).items())
+            else:
+                parts.append(objects.get(cls_name, {}).items())
+            parts.append(raw.get(cls_name, {}).items())
+        return chain(*parts)
+
+    def __write_shards(self, fresh, changed, unread, serializer, mode):
+        """Write the shard files of the changed keys and the missing ones.
+
+        The files of the shards left without objects are removed, and
+        so is a single snapshot file written before the shards option
+        was set.
+
+        Args:
+            fresh (dict): The snapshot entries, keyed by key.
+            changed (set): The keys added, changed or removed since the
+                files were read or written, or None to write every
+                shard.
+            unread (list): The shard files of the classes not read yet.
+            serializer (Serializer): The format to write.
+            mode (str): The mode to open the shard files with.
+        """
+        options = FileStorage.__options
+        layout = options["shards"]
+        if layout == "class":
+            groups = fresh.classes
+        else:
+            groups = group(fresh.items(), layout)
+        if changed is not None:
+            changed = set(group(dict.fromkeys(changed).items(), layout))
+        os.makedirs(shard_dir(FileStorage.__file_path), exist_ok=True)
+        keep = set(unread)
+        for shard, entries in groups.items():
+            if not entries:
+                continue
+            path = shard_path(FileStorage.__file_path, shard)
+            keep.add(path)
+            if changed is None or shard in changed or not os.path.exists(
+                    path):
+                with atomic_write(path, mode, options["fsync"],
+                                  options["generations"]) as f:
+                    serializer.write(f, (entry[1]
+                                         for entry in entries.values()))
+        for path in list_shards(FileStorage.__file_path):
+            if path not in keep:
+                os.remove(path)
+        if os.path.exists(FileStorage.__file_path):
+            os.remove(FileStorage.__file_path)
+
+    def __record(self, rec):
+        """Return a record with epoch int timestamps if epoch_times is on.
+
+        Epoch ints are smaller than ISO 8601 strings and are only turned
+        into datetimes when an attribute is first read after a reload.
+        """
+        if FileStorage.__options["epoch_times"]:
+            for name in TIMESTAMPS:
+                if name in rec:
+                    rec[name] = to_epoch(rec[name])
+        return rec
+
+    def __stamp(self):
+        """Return what identifies the current snapshot file.
+
+        That is the file_stamp() of the snapshot file, or of each of
+        the shard files of a sharded snapshot.
+        """
+        shards = self.__shards()
+        if shards is None:
+            return file_stamp(FileStorage.__file_path)
+        return [[os.path.basename(path), *file_stamp(path)]
+                for path in shards]
+
+    def __shards(self):
+        """Return the shard files to read, or None for the single file.
+
+        Without the shards option, or before the first sharded save,
+        the snapshot is the single file __file_path.
+        """
+        if not FileStorage.__options["shards"]:
+            return None
+        return list_shards(FileStorage.__file_path)
+
+    def __defer(self, shards):
+        """Tell if shards can be left unread until their class is used."""
+        options = FileStorage.__options
+        return (options["lazy"] and not options["journal"] and
+                all(shard_name(path) in classes for path in shards))
+
+    def __read_text(self):
+        """Return the saved full-text index if it matches the snapshot."""
+        path = self.__text_path()
+        try:
+            with open(path + ".stamp") as f:
+                stamp = json.load(f)
+            if (stamp.get("stamp") == self.__stamp() and
+                    stamp.get("index") == file_stamp(path)):
+                with open(path) as f:
+                    return json.load(f)
+        except (OSError, ValueError, AttributeError):
+            pass
+        return None
+
+    def __restore(self, dirty, pending, dirty_classes=()):
+        """Put back the changes taken by a write that failed."""
+        with FileStorage.__lock:
+            FileStorage.__dirty |= dirty
+            FileStorage.__dirty_classes.update(dirty_classes)
+            for key, op in pending.items():
+                FileStorage.__pending.setdefault(key, op)
 
     def reload(self):
+        """Deserialize the JSON file __file_path to __objects, if it exists.
+
+        In journal mode the journal records are replayed on top of the
+        snapshot. In lazy mode the records are only parsed, and each
+        instance is built the first time all(), all_of() or get()
+        reaches it. In stream mode the file is parsed one record at a
+        time, so the whole parsed document is never held in memory. The
+        snapshot format is detected from the file, whatever the format
+        option says. A sharded snapshot is read with one worker process
+        per shard, up to reload_workers (0 for one per CPU), which parse
+        the shards and their dates, while this process builds the
+        instances. In lazy mode with one shard per class, and no
+        journal, a shard is only read when its class is first used. A
+        full-text index saved with the snapshot is read back instead of
+        being rebuilt. With persist off (the memory engine) there is
+        nothing to read.
+        """
+        if not FileStorage.__options["persist"]:
+            return
+        self.__use_key_map()
+        FileStorage.__unread = {}
+        FileStorage.__cache = {}
+        saved_text = None
+        if not FileStorage.__objects and not any(FileStorage.__raw.values()):
+            saved_text = self.__read_text()
+            if saved_text is not None:
+                FileStorage.__text = None
+        shards = self.__shards()
+        if shards is not None and self.__defer(shards):
+            FileStorage.__unread = {shard_name(path): path
+                                    for path in shards}
+        elif shards is not None:
+            for key, o in read_shards(shards,
+                                      FileStorage.__options["reload_workers"],
+                                      FileStorage.__options["stream"]):
+                self.__load(key, o)
+        else:
+            try:
+                with open(FileStorage.__file_path, "rb") as f:
+                    serializer = detect(f)
+                    if not serializer.binary:
+                        f = io.TextIOWrapper(f, encoding="utf-8")
+                    items = serializer.load(f,
+                                            FileStorage.__options["stream"])
+                    for key, o in items:
+                        self.__load(key, o)
+            except FileNotFoundError:
+                pass
+        if saved_text is not None:
+            self.__sync_indexes()
+            FileStorage.__text = TextIndex.from_records(saved_text)
+            FileStorage.__text_saved = (FileStorage.__text,
+                                        FileStorage.__text.version,
+                                        self.__text_path())
+        if FileStorage.__options["journal"]:
+            self.__replay()
+        FileStorage.__pending.clear()
+        FileStorage.__cache_for = FileStorage.__objects
+
+    def __replay(self):
+        """Apply the journal records on top of the loaded snapshot.
+
+        A torn record left by an interrupted append ends the replay, and
+        the journal is then compacted so later appends start clean.
+        """
+        FileStorage.__journal_size = 0
+        torn = False
         try:
-            with open(FileStorage.__file_path) as f:
-                objdict = json.load(f)
-                for o in objdict.values():
-                    cls_name = o["__class__"]
-                    del o["__class__"]
-                    if cls_name == "Place":
-                        self.new(Place(**o))
-                    elif cls_name == "State":
-                        self.new(State(**o))
-                    elif cls_name == "City":
-                        self.new(City(**o))
-                    elif cls_name == "Amenity":
-                        self.new(Amenity(**o))
-                    elif cls_name == "Review":
-                        self.new(Review(**o))
+            with open(FileStorage.__options["journal_path"]) as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        torn = True
+                        break
+                    if rec["op"] == "set":
+                        self.__load(rec["key"], rec["obj"])
+                    else:
+                        self.__discard(rec["key"])
+                    FileStorage.__journal_size += 1
         except FileNotFoundError:
             return
+        if torn:
+            self.compact()
+
+    def __load(self, key, rec):
+        """Store one loaded record, as an instance unless in lazy mode."""
+        if FileStorage.__options["lazy"]:
+            self.__stash(key, rec)
+        else:
+            FileStorage.__raw.get(rec["__class__"], {}).pop(key, None)
+            self.__put(key, self.__build(rec))
+            self.__add_text(key, rec)
+
+    def __build(self, odict):
+        """Return the model instance described by a serialized dict."""
+        cls_name = odict["__class__"]
+        if (FileStorage.__options["columnar"] and
+                cls_name in columnar_classes):
+            return columnar_classes[cls_name].from_dict(odict)
+        if FileStorage.__options["slots"]:
+            return slotted_classes[cls_name].from_dict(odict)
+        return classes[cls_name].from_dict(odict)
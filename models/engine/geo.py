@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+"""Defines a spatial index over the latitude and longitude of objects.
+
+The index is a uniform grid of cell x cell degree squares, keyed by
+cell, that only holds the cells in use. A query only reads the cells
+its area overlaps, so its cost grows with the number of objects near
+the query point rather than with the number of objects stored.
+Distances are great-circle distances in kilometres.
+"""
+import heapq
+import math
+
+
+EARTH_RADIUS = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return the great-circle distance in km between two points."""
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) *
+         math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def wrap(lon):
+    """Return a longitude brought into [-180, 180)."""
+    return (lon + 180) % 360 - 180
+
+
+def coordinates(obj):
+    """Return the (latitude, longitude) of an object as floats.
+
+    Returns:
+        tuple: The coordinates, or None if they are not valid numbers.
+    """
+    try:
+        lat = float(getattr(obj, "latitude", None))
+        lon = float(getattr(obj, "longitude", None))
+    except (TypeError, ValueError):
+        return None
+    if not -90 <= lat <= 90 or math.isnan(lon) or math.isinf(lon):
+        return None
+    return lat, wrap(lon)
+
+
+class GridIndex:
+    """Represents a grid index over the coordinates of objects.
+
+    Attributes:
+        cell (float): the size of a grid cell in degrees.
+        rows (int): the number of cells from pole to pole.
+        cols (int): the number of cells around the equator.
+        cells (dict): the (row, col) of each cell in use mapped to its
+            entries, keyed by object key, as (lat, lon, object).
+        where (dict): the cell of each object key.
+    """
+
+    def __init__(self, cell=0.01):
+        """Initialize a new GridIndex.
+
+        Args:
+            cell (float): The size of a grid cell in degrees.
+        """
+        self.cell = float(cell)
+        self.rows = int(math.ceil(180 / self.cell))
+        self.cols = int(math.ceil(360 / self.cell))
+        self.cells = {}
+        self.where = {}
+
+    def __len__(self):
+        """Return the number of indexed objects."""
+        return len(self.where)
+
+    def __row(self, lat):
+        """Return the grid row of a latitude."""
+        return min(self.rows - 1, max(0, int((lat + 90) // self.cell)))
+
+    def __col(self, lon):
+        """Return the grid column of a longitude in [-180, 180)."""
+        return int((lon + 180) // self.cell) % self.cols
+
+    def add(self, key, obj):
+        """Index an object at its coordinates, replacing its old entry.
+
+        Objects without valid coordinates are only removed.
+        """
+        self.remove(key)
+        point = coordinates(obj)
+        if point is None:
+            return
+        lat, lon = point
+        cell = (self.__row(lat), self.__col(lon))
+        self.cells.setdefault(cell, {})[key] = (lat, lon, obj)
+        self.where[key] = cell
+
+    def remove(self, key):
+        """Drop the entry of an object key, if it has one."""
+        cell = self.where.pop(key, None)
+        if cell is None:
+            return
+        entries = self.cells[cell]
+        del entries[key]
+        if not entries:
+            del self.cells[cell]
+
+    def __cols_between(self, west, east):
+        """Return the grid columns from west to east, across 180 if needed."""
+        first = self.__col(west)
+        last = self.__col(east)
+        if west > east and first == last:
+            return range(self.cols)
+        return [(first + i) % self.cols
+                for i in range((last - first) % self.cols + 1)]
+
+    def __entries(self, south, north, cols):
+        """Yield the entries of the cells of cols from south to north."""
+        rows = range(self.__row(south), self.__row(north) + 1)
+        if len(rows) * len(cols) > len(self.cells):
+            wanted = set(cols)
+            for (row, col), entries in self.cells.items():
+                if row in rows and col in wanted:
+                    yield from entries.values()
+            return
+        for row in rows:
+            for col in cols:
+                entries = self.cells.get((row, col))
+                if entries:
+                    yield from entries.values()
+
+    def bbox(self, south, west, north, east):
+        """Return the objects inside a box.
+
+        A box with west > east crosses the 180th meridian.
+
+        Args:
+            south (float): The lowest latitude.
+            west (float): The westmost longitude.
+            north (float): The highest latitude.
+            east (float): The eastmost longitude.
+        """
+        if east - west >= 360:
+            return [obj for lat, lon, obj in self.__entries(
+                south, north, range(self.cols)) if south <= lat <= north]
+        west = wrap(west)
+        east = wrap(east)
+        found = []
+        for lat, lon, obj in self.__entries(
+                south, north, self.__cols_between(west, east)):
+            if south <= lat <= north and (
+                    west <= lon <= east if west <= east
+                    else lon >= west or lon <= east):
+                found.append(obj)
+        return found
+
+    def radius(self, lat, lon, km):
+        """Return the objects within km of a point, nearest first.
+
+        Args:
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            km (float): The search radius in kilometres.
+        """
+        dlat = km / KM_PER_DEGREE
+        south = max(-90.0, lat - dlat)
+        north = min(90.0, lat + dlat)
+        cols = range(self.cols)
+        if -90 < south and north < 90:
+            dlon = dlat / math.cos(math.radians(max(-south, north)))
+            if dlon < 180:
+                cols = self.__cols_between(wrap(lon - dlon), wrap(lon + dlon))
+        found = []
+        for plat, plon, obj in self.__entries(south, north, cols):
+            d = haversine(lat, lon, plat, plon)
+            if d <= km:
+                found.append((d, len(found), obj))
+        found.sort()
+        return [obj for d, i, obj in found]
+
+    def nearest(self, lat, lon, k=1):
+        """Return the k objects nearest to a point, nearest first.
+
+        The cells are read in growing square rings around the cell of
+        the point, until no cell left can hold a nearer object, or all
+        the cells in use are read at once when a ring would have more
+        cells than that.
+
+        Args:
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            k (int): The number of objects to return.
+        """
+        if k <= 0 or not self.where:
+            return []
+        lon = wrap(lon)
+        row0 = self.__row(lat)
+        col0 = self.__col(lon)
+        best = []
+        seen = 0
+        visited = set()
+        r = 0
+        while seen < len(self.where):
+            everything = 8 * r > len(self.cells)
+            ring = self.cells if everything else self.__ring(row0, col0, r)
+            for cell in ring:
+                entries = self.cells.get(cell)
+                if not entries or cell in visited:
+                    continue
+                visited.add(cell)
+                for plat, plon, obj in entries.values():
+                    seen += 1
+                    item = (-haversine(lat, lon, plat, plon), seen, obj)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+            if everything or (len(best) == k and
+                              -best[0][0] <= self.__bound(lat, r)):
+                break
+            r += 1
+        return [obj for d, i, obj in sorted(best, reverse=True)]
+
+    def __ring(self, row0, col0, r):
+        """Return the cells at Chebyshev distance r from a cell."""
+        if r == 0:
+            return [(row0, col0)]
+        cells = set()
+        for row in range(row0 - r, row0 + r + 1):
+            if 0 <= row < self.rows:
+                cells.add((row, (col0 - r) % self.cols))
+                cells.add((row, (col0 + r) % self.cols))
+        for col in range(col0 - r, col0 + r + 1):
+            for row in (row0 - r, row0 + r):
+                if 0 <= row < self.rows:
+                    cells.add((row, col % self.cols))
+        return cells
+
+    def __bound(self, lat, r):
+        """Return a lower bound of the distance to the cells past ring r.
+
+        Such a point is more than r cells away in latitude, or in
+        longitude at a latitude at most r + 1 cells away.
+        """
+        gap = r * self.cell
+        top = min(90.0, abs(lat) + gap + self.cell)
+        return 2 / math.pi * gap * KM_PER_DEGREE * math.cos(
+            math.radians(top))
+
+
+def scan_radius(objects, lat, lon, km):
+    """Return the objects within km of a point, nearest first, by scan."""
+    found = []
+    for obj in objects:
+        point = coordinates(obj)
+        if point is not None:
+            d = haversine(lat, lon, point[0], point[1])
+            if d <= km:
+                found.append((d, len(found), obj))
+    found.sort()
+    return [obj for d, i, obj in found]
+
+
+def scan_nearest(objects, lat, lon, k=1):
+    """Return the k objects nearest to a point, nearest first, by scan."""
+    found = []
+    for obj in objects:
+        point = coordinates(obj)
+        if point is not None:
+            found.append((haversine(lat, lon, point[0], point[1]),
+                          len(found), obj))
+    return [obj for d, i, obj in heapq.nsmallest(k, found)]
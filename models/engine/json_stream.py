@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""Defines an incremental reader for large JSON object files.
+
+The reader walks the top-level object of a file one key/value pair at a
+time, so only the record being decoded and one read chunk are held in
+memory instead of the whole parsed document.
+"""
+import json
+
+
+WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """Represents a sliding window over a text file being decoded.
+
+    Attributes:
+        f (file): the text file to read from.
+        chunk_size (int): the number of characters read at a time.
+        buf (str): the characters read but not consumed yet.
+        pos (int): the position of the next unconsumed character.
+    """
+
+    def __init__(self, f, chunk_size):
+        """Initialize a new _Buffer.
+
+        Args:
+            f (file): The text file to read from.
+            chunk_size (int): The number of characters read at a time.
+        """
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        """Read the next chunk, dropping the consumed characters.
+
+        The read size grows with the pending text, so a record larger
+        than chunk_size is still decoded in a few passes.
+
+        Returns:
+            bool: False if the end of the file was reached.
+        """
+        size = max(self.chunk_size, len(self.buf) - self.pos)
+        chunk = self.f.read(size)
+        if chunk == "":
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character, or '' at EOF."""
+        while True:
+            buf = self.buf
+            while self.pos < len(buf) and buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(buf):
+                return buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def take(self, chars):
+        """Consume the next character, which must be one of chars."""
+        c = self.peek()
+        if c == "" or c not in chars:
+            raise ValueError("expected one of {!r}, got {!r}".format(
+                chars, c or "end of file"))
+        self.pos += 1
+        return c
+
+    def decode(self):
+        """Decode and consume the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_items(f, chunk_size=1 << 16):
+    """Yield the key/value pairs of the top-level JSON object in a file.
+
+    Args:
+        f (file): A text file open for reading.
+        chunk_size (int): The number of characters read at a time.
+
+    Raises:
+        ValueError: If the file does not hold one JSON object.
+    """
+    buf = _Buffer(f, chunk_size)
+    buf.take("{")
+    if buf.peek() == "}":
+        buf.take("}")
+        return
+    while True:
+        key = buf.decode()
+        if type(key) is not str:
+            raise ValueError("object keys must be strings")
+        buf.take(":")
+        yield key, buf.decode()
+        if buf.take(",}") == "}":
+            return
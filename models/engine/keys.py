@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+"""Defines a compact map of <class name>.<id> keys to stored objects.
+
+A plain dict keeps one "<class name>.<id>" string per object, next to
+the id string the object already holds. An ObjectMap keeps one dict
+per class instead, keyed by the id string of each object, so a stored
+object costs no key string of its own and each class name is kept
+once. The "<class name>.<id>" keys are only made when they are asked
+for, so the map still reads and writes like the dict it replaces.
+"""
+import sys
+from collections.abc import ItemsView, Mapping, MutableMapping, \
+    ValuesView
+
+
+def split_key(key):
+    """Return the (class name, id) of a <class name>.<id> key."""
+    cls_name, sep, oid = key.partition(".")
+    return cls_name, oid
+
+
+def shared_id(oid, src):
+    """Return the id string held by an object or record, if it is oid.
+
+    Args:
+        oid (str): The id part of a key.
+        src (any): The object, or the record, stored under that key.
+    """
+    held = src.get("id") if type(src) is dict else getattr(src, "id", None)
+    return held if held == oid else oid
+
+
+class ObjectMap(MutableMapping):
+    """Represents a mapping of <class name>.<id> keys, stored per class.
+
+    Attributes:
+        classes (dict): each class name mapped to the dict of its values,
+            keyed by id.
+        size (int): the number of keys.
+    """
+
+    def __init__(self, items=()):
+        """Initialize a new ObjectMap.
+
+        Args:
+            items (dict|iterable): The key/value pairs to store first.
+        """
+        self.classes = {}
+        self.size = 0
+        self.update(items)
+
+    def put(self, cls_name, oid, value):
+        """Store a value under a class name and an id string."""
+        values = self.classes.get(cls_name)
+        if values is None:
+            values = self.classes[sys.intern(cls_name)] = {}
+        if oid not in values:
+            self.size += 1
+        values[oid] = value
+
+    def put_class(self, cls_name, values):
+        """Store the dict of values of one class, keyed by id, as it is."""
+        self.size += len(values) - len(self.classes.get(cls_name, ()))
+        self.classes[sys.intern(cls_name)] = values
+
+    def __getitem__(self, key):
+        """Return the value of a key."""
+        cls_name, oid = split_key(key)
+        try:
+            return self.classes[cls_name][oid]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        """Store a value, keyed by the id string it holds if it has one."""
+        cls_name, oid = split_key(key)
+        self.put(cls_name, shared_id(oid, value), value)
+
+    def __delitem__(self, key):
+        """Remove a key."""
+        cls_name, oid = split_key(key)
+        values = self.classes.get(cls_name)
+        if values is None or oid not in values:
+            raise KeyError(key)
+        del values[oid]
+        self.size -= 1
+
+    def __contains__(self, key):
+        """Tell if a key is in the map."""
+        if type(key) is not str:
+            return False
+        cls_name, oid = split_key(key)
+        return oid in self.classes.get(cls_name, ())
+
+    def __iter__(self):
+        """Yield the <class name>.<id> keys."""
+        for cls_name, values in list(self.classes.items()):
+            for oid in values:
+                yield "{}.{}".format(cls_name, oid)
+
+    def __len__(self):
+        """Return the number of keys."""
+        return self.size
+
+    def __repr__(self):
+        """Return the repr of the equivalent dict."""
+        return repr(dict(self.items()))
+
+    def get(self, key, default=None):
+        """Return the value of a key, or default."""
+        cls_name, oid = split_key(key)
+        return self.classes.get(cls_name, {}).get(oid, default)
+
+    def pop(self, key, *default):
+        """Remove a key and return its value, or default if it is missing."""
+        cls_name, oid = split_key(key)
+        values = self.classes.get(cls_name)
+        if values is None or oid not in values:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        self.size -= 1
+        return values.pop(oid)
+
+    def clear(self):
+        """Remove every key."""
+        self.classes = {}
+        self.size = 0
+
+    def values(self):
+        """Return a view of the values, read class by class."""
+        return MapValues(self)
+
+    def items(self):
+        """Return a view of the (key, value) pairs, read class by class."""
+        return MapItems(self)
+
+    def of_class(self, cls_name):
+        """Return a mapping of the keys of one class.
+
+        It follows later changes once the class has had an object.
+        """
+        return ClassView(cls_name, self.classes.get(cls_name, {}))
+
+
+class MapValues(ValuesView):
+    """Represents the values of an ObjectMap."""
+
+    def __iter__(self):
+        """Yield the values without making the keys."""
+        for values in list(self._mapping.classes.values()):
+            yield from values.values()
+
+
+class MapItems(ItemsView):
+    """Represents the (key, value) pairs of an ObjectMap."""
+
+    def __iter__(self):
+        """Yield the pairs without looking each key up again."""
+        for cls_name, values in list(self._mapping.classes.items()):
+            for oid, value in values.items():
+                yield "{}.{}".format(cls_name, oid), value
+
+
+class ClassView(Mapping):
+    """Represents the <class name>.<id> keys of one class of an ObjectMap.
+
+    It reads straight from the dict of the class, and is read-only, as
+    the storage engine keeps the ObjectMap itself up to date.
+    """
+
+    def __init__(self, cls_name, values):
+        """Initialize a view over the values of one class."""
+        self.cls_name = cls_name
+        self.objects = values
+
+    def __getitem__(self, key):
+        """Return the value of a key of the class."""
+        cls_name, oid = split_key(key)
+        if cls_name != self.cls_name:
+            raise KeyError(key)
+        return self.objects[oid]
+
+    def __iter__(self):
+        """Yield the <class name>.<id> keys of the class."""
+        for oid in list(self.objects):
+            yield "{}.{}".format(self.cls_name, oid)
+
+    def __len__(self):
+        """Return the number of objects of the class."""
+        return len(self.objects)
+
+    def values(self):
+        """Return a view of the values of the class."""
+        return self.objects.values()
@@ -0,0 +1,205 @@
+#!/usr/bin/python3
+"""Defines chained queries over the objects of a storage engine.
+
+    storage.query("Place").where(city_id="c1", max_guest=(4, None))
+                          .order_by("-price_by_night").limit(10)
+
+A condition is a value to match, a (low, high) range where None leaves
+that end open, or a set of accepted values. A query is only run when it
+is iterated, and it yields the objects themselves, so a listing can be
+formatted one page at a time.
+"""
+import heapq
+from itertools import chain, islice
+from models.engine.columns import within
+
+
+def matcher(bound):
+    """Return a function telling if a value meets a condition.
+
+    Values that cannot be compared with the bound do not meet it.
+    """
+    if isinstance(bound, (set, frozenset)):
+        def accepts(value):
+            try:
+                return value in bound
+            except TypeError:
+                return False
+        return accepts
+    if not isinstance(bound, tuple):
+        return lambda value: value == bound
+    return lambda value: within(value, bound)
+
+
+def sort_key(attr, descending=False):
+    """Return a sort key on attr that puts missing values last.
+
+    Values of different types are grouped by type name, numbers
+    together, so a mix of types sorts instead of raising TypeError.
+    """
+    def key(obj):
+        value = getattr(obj, attr, None)
+        if isinstance(value, (int, float)):
+            kind = ""
+        else:
+            kind = type(value).__name__
+        return ((value is None) != descending, kind, value)
+    return key
+
+
+class Query:
+    """Represents a lazy query over the objects of one class.
+
+    Every method returns a new Query, so a query can be reused and
+    refined.
+
+    Attributes:
+        storage (object): the storage engine to query.
+        cls_name (str): the class name of the objects.
+        conditions (tuple): the (attribute, condition) pairs to meet.
+        ordering (tuple): the attribute names to sort by, with a
+            leading "-" for a descending order.
+        start (int): the number of results to skip.
+        stop (int): the index after the last result, or None.
+    """
+
+    def __init__(self, storage, cls_name):
+        """Initialize a new Query.
+
+        Args:
+            storage (object): The storage engine to query.
+            cls_name (str): The class name of the objects.
+        """
+        self.storage = storage
+        self.cls_name = cls_name
+        self.conditions = ()
+        self.ordering = ()
+        self.start = 0
+        self.stop = None
+
+    def __refine(self, **changes):
+        """Return a copy of this query with some attributes changed."""
+        query = Query(self.storage, self.cls_name)
+        query.__dict__.update(self.__dict__)
+        query.__dict__.update(changes)
+        return query
+
+    def where(self, **conditions):
+        """Return a query also requiring the given conditions.
+
+        Args:
+            **conditions (dict): Attribute names mapped to a value, a
+                (low, high) range or a set of values.
+        """
+        return self.__refine(
+            conditions=self.conditions + tuple(conditions.items()))
+
+    def order_by(self, *attrs):
+        """Return a query sorting its results by the given attributes.
+
+        Args:
+            *attrs (str): Attribute names, "-name" for descending order.
+        """
+        return self.__refine(ordering=attrs)
+
+    def offset(self, n):
+        """Return a query skipping its first n results."""
+        start = self.start + n
+        stop = self.stop
+        if stop is not None:
+            stop = max(start, stop)
+        return self.__refine(start=start, stop=stop)
+
+    def limit(self, n):
+        """Return a query yielding at most n results."""
+        stop = self.start + n
+        if self.stop is not None:
+            stop = min(stop, self.stop)
+        return self.__refine(stop=stop)
+
+    def __iter__(self):
+        """Run the query and iterate over its results."""
+        objects, conditions = self.__candidates()
+        if conditions:
+            tests = [(attr, matcher(bound)) for attr, bound in conditions]
+            objects = (obj for obj in objects
+                       if all(test(getattr(obj, attr, None))
+                              for attr, test in tests))
+        if self.ordering:
+            objects = self.__sorted(objects)
+        return islice(objects, self.start, self.stop)
+
+    def all(self):
+        """Return the results as a list."""
+        return list(self)
+
+    def first(self):
+        """Return the first result, or None if there is none."""
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        """Return the number of results."""
+        return sum(1 for obj in self)
+
+    def pages(self, size):
+        """Yield the results as lists of at most size objects.
+
+        Args:
+            size (int): The number of objects of a page.
+        """
+        results = iter(self)
+        while True:
+            page = list(islice(results, size))
+            if not page:
+                return
+            yield page
+
+    def __candidates(self):
+        """Return the objects to test and the conditions left to test.
+
+        An equality or set condition on an indexed attribute is answered
+        from the index; otherwise range and equality conditions go to
+        the filter() of the storage, which uses the columns of the
+        columnar option, and other queries scan the class.
+        """
+        storage = self.storage
+        indexed = storage.options().get("indexes", {}).get(self.cls_name, ())
+        conditions = list(self.conditions)
+        for i, (attr, bound) in enumerate(conditions):
+            if attr in indexed and not isinstance(bound, tuple):
+                del conditions[i]
+                values = bound if isinstance(bound, (set, frozenset)) \
+                    else (bound,)
+                return chain.from_iterable(
+                    storage.find(self.cls_name, attr, v)
+                    for v in values), conditions
+        bounds = {}
+        rest = []
+        for attr, bound in conditions:
+            if attr not in bounds and (isinstance(bound, tuple) or
+                                       type(bound) in (int, float)):
+                bounds[attr] = bound
+            else:
+                rest.append((attr, bound))
+        if bounds:
+            return storage.filter(self.cls_name, **bounds), rest
+        return list(storage.all_of(self.cls_name).values()), rest
+
+    def __sorted(self, objects):
+        """Return the objects in the order of the ordering attributes.
+
+        With a single ordering attribute and a limit, only the first
+        results are kept while scanning.
+        """
+        if len(self.ordering) == 1 and self.stop is not None:
+            attr = self.ordering[0]
+            descending = attr.startswith("-")
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            return iter(pick(self.stop, objects,
+                             key=sort_key(attr.lstrip("-"), descending)))
+        objects = list(objects)
+        for attr in reversed(self.ordering):
+            descending = attr.startswith("-")
+            objects.sort(key=sort_key(attr.lstrip("-"), descending),
+                         reverse=descending)
+        return iter(objects)
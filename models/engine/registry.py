@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+"""Defines the registry of storage engines.
+
+The engine that models.storage uses is picked when the models package is
+imported, from these sources (the later ones win):
+
+    HBNB_STORAGE_CONFIG  the path of a JSON file holding an object with
+                         an "engine" name and engine options.
+    HBNB_STORAGE         the engine name: file, journal, sqlite or memory.
+    HBNB_STORAGE_<NAME>  one engine option, such as HBNB_STORAGE_LAZY=1,
+                         HBNB_STORAGE_FORMAT=msgpack or
+                         HBNB_STORAGE_DB_PATH=/data/hbnb.db.
+"""
+import json
+import os
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+
+
+engines = {
+    "file": (FileStorage, {}),
+    "journal": (FileStorage, {"journal": True}),
+    "sqlite": (DBStorage, {}),
+    "memory": (FileStorage, {"persist": False})
+}
+PREFIX = "HBNB_STORAGE_"
+TRUE = ("1", "true", "yes", "on")
+FALSE = ("0", "false", "no", "off")
+
+
+def parse(text, default):
+    """Convert the text of an environment variable to an option value.
+
+    Args:
+        text (str): The text to convert.
+        default (any): The default value of the option, whose type the
+            result takes.
+
+    Raises:
+        ValueError: If the text does not fit the type of the option.
+    """
+    if type(default) is bool:
+        if text.lower() in TRUE:
+            return True
+        if text.lower() in FALSE:
+            return False
+        raise ValueError("expected a boolean, got {!r}".format(text))
+    if type(default) in (int, float):
+        return type(default)(text)
+    if type(default) in (dict, list, tuple):
+        return json.loads(text)
+    return text
+
+
+def settings(environ=None):
+    """Return the engine name and options set by a config file and env.
+
+    Args:
+        environ (dict): The environment to read, os.environ by default.
+
+    Returns:
+        tuple: The engine name and a dict of option names and texts or
+            values.
+    """
+    if environ is None:
+        environ = os.environ
+    options = {}
+    name = "file"
+    config = environ.get("HBNB_STORAGE_CONFIG")
+    if config:
+        with open(config) as f:
+            options = json.load(f)
+        name = options.pop("engine", name)
+    name = environ.get("HBNB_STORAGE", name)
+    for k, v in environ.items():
+        if k.startswith(PREFIX) and k != "HBNB_STORAGE_CONFIG":
+            options[k[len(PREFIX):].lower()] = v
+    return name, options
+
+
+def create_storage(environ=None):
+    """Return the configured storage engine, not reloaded yet.
+
+    Args:
+        environ (dict): The environment to read, os.environ by default.
+
+    Raises:
+        ValueError: If the engine name is unknown.
+        TypeError: If an option is unknown to the engine.
+    """
+    name, options = settings(environ)
+    if name not in engines:
+        raise ValueError("unknown storage engine: {}".format(name))
+    cls, preset = engines[name]
+    storage = cls()
+    defaults = storage.options()
+    values = dict(preset)
+    for k, v in options.items():
+        if isinstance(v, str) and k in defaults:
+            v = parse(v, defaults[k])
+        values[k] = v
+    storage.configure(**values)
+    return storage
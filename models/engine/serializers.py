@@ -0,0 +1,363 @@
+#!/usr/bin/python3
+"""Defines the snapshot formats FileStorage can write.
+
+A serializer turns a model instance into a record, encodes one
+(key, record) pair into a fragment of the snapshot file and reads the
+pairs back. FileStorage caches the fragment of every unchanged object,
+so only changed objects are encoded again.
+
+    json     the file.json text format, with ISO 8601 date strings.
+    msgpack  MessagePack frames with datetimes stored as an extension
+             type, so no isoformat()/strptime round trip is needed.
+    pickle   pickle protocol 5 frames, also keeping native datetimes.
+"""
+import json
+import pickle
+import struct
+from datetime import datetime, timedelta
+from models.engine.json_stream import iter_items
+
+
+EPOCH = datetime.min
+DATETIME_EXT = 1
+FRAME = struct.Struct(">I")
+
+
+def native_record(obj):
+    """Return the attributes of a model instance with its class name."""
+    rec = obj._attributes().copy()
+    rec["__class__"] = obj.__class__.__name__
+    return rec
+
+
+def json_default(o):
+    """Encode the datetimes of native records as ISO 8601 strings."""
+    if isinstance(o, datetime):
+        return o.isoformat()
+    raise TypeError("Object of type {} is not JSON serializable".format(
+        type(o).__name__))
+
+
+class JSONSerializer:
+    """Represents the JSON text format of file.json.
+
+    Attributes:
+        name (str): the name of the format.
+        binary (bool): whether the file is opened in binary mode.
+        magic (bytes): the bytes a file of this format starts with.
+    """
+    name = "json"
+    binary = False
+    magic = b""
+
+    def record(self, obj):
+        """Return the record of a model instance."""
+        return obj.to_dict()
+
+    def encode(self, key, rec):
+        """Return the snapshot fragment of one record."""
+        return "{}: {}".format(json.dumps(key),
+                               json.dumps(rec, default=json_default))
+
+    def write(self, f, fragments):
+        """Write a snapshot made of the given fragments to f."""
+        f.write("{")
+        for i, fragment in enumerate(fragments):
+            if i:
+                f.write(", ")
+            f.write(fragment)
+        f.write("}")
+
+    def load(self, f, stream=False):
+        """Return an iterator over the (key, record) pairs of a snapshot.
+
+        Args:
+            f (file): The snapshot, open in text mode.
+            stream (bool): Whether to parse one record at a time.
+        """
+        if stream:
+            return iter_items(f)
+        return iter(json.load(f).items())
+
+
+class FramedSerializer:
+    """Represents a binary format made of length-prefixed frames.
+
+    Each frame holds one [key, record] pair, and the file starts with
+    the magic bytes of the format.
+    """
+    binary = True
+
+    def record(self, obj):
+        """Return the record of a model instance, with native datetimes."""
+        return native_record(obj)
+
+    def encode(self, key, rec):
+        """Return the frame of one record."""
+        payload = self.pack([key, rec])
+        return FRAME.pack(len(payload)) + payload
+
+    def write(self, f, fragments):
+        """Write a snapshot made of the given frames to f."""
+        f.write(self.magic)
+        for fragment in fragments:
+            f.write(fragment)
+
+    def load(self, f, stream=False):
+        """Yield the (key, record) pairs of a snapshot, one frame at a time.
+
+        Args:
+            f (file): The snapshot, open in binary mode.
+            stream (bool): Unused, frames are always read one by one.
+
+        Raises:
+            ValueError: If the file is not in this format or is truncated.
+        """
+        if f.read(len(self.magic)) != self.magic:
+            raise ValueError("not a {} snapshot".format(self.name))
+        while True:
+            head = f.read(FRAME.size)
+            if not head:
+                return
+            if len(head) != FRAME.size:
+                raise ValueError("truncated frame header")
+            size = FRAME.unpack(head)[0]
+            payload = f.read(size)
+            if len(payload) != size:
+                raise ValueError("truncated frame")
+            key, rec = self.unpack(payload)
+            yield key, rec
+
+
+class MsgpackSerializer(FramedSerializer):
+    """Represents the MessagePack binary format."""
+    name = "msgpack"
+    magic = b"HBNB\x00M"
+
+    def pack(self, value):
+        """Return the MessagePack encoding of a value."""
+        return packb(value)
+
+    def unpack(self, data):
+        """Return the value of a MessagePack encoding."""
+        return unpackb(data)
+
+
+class PickleSerializer(FramedSerializer):
+    """Represents the pickle protocol 5 binary format.
+
+    Only load snapshots from trusted sources: unpickling can run code.
+    """
+    name = "pickle"
+    magic = b"HBNB\x00P"
+
+    def pack(self, value):
+        """Return the pickle of a value."""
+        return pickle.dumps(value, protocol=5)
+
+    def unpack(self, data):
+        """Return the value of a pickle."""
+        return pickle.loads(data)
+
+
+def _pack(o, out):
+    """Append the MessagePack encoding of o to the list out."""
+    if o is None:
+        out.append(b"\xc0")
+    elif o is True:
+        out.append(b"\xc3")
+    elif o is False:
+        out.append(b"\xc2")
+    elif type(o) is int:
+        if 0 <= o < 0x80:
+            out.append(struct.pack("B", o))
+        elif -0x20 <= o < 0:
+            out.append(struct.pack("b", o))
+        elif 0 <= o <= 0xffff:
+            out.append(b"\xcd" + struct.pack(">H", o))
+        elif 0 <= o <= 0xffffffff:
+            out.append(b"\xce" + struct.pack(">I", o))
+        elif 0 <= o <= 0xffffffffffffffff:
+            out.append(b"\xcf" + struct.pack(">Q", o))
+        elif -0x8000 <= o < 0:
+            out.append(b"\xd1" + struct.pack(">h", o))
+        elif -0x80000000 <= o < 0:
+            out.append(b"\xd2" + struct.pack(">i", o))
+        elif -0x8000000000000000 <= o < 0:
+            out.append(b"\xd3" + struct.pack(">q", o))
+        else:
+            raise OverflowError("int too large for MessagePack")
+    elif type(o) is float:
+        out.append(b"\xcb" + struct.pack(">d", o))
+    elif isinstance(o, str):
+        data = o.encode("utf-8")
+        n = len(data)
+        if n < 0x20:
+            out.append(struct.pack("B", 0xa0 | n))
+        elif n <= 0xff:
+            out.append(b"\xd9" + struct.pack("B", n))
+        elif n <= 0xffff:
+            out.append(b"\xda" + struct.pack(">H", n))
+        else:
+            out.append(b"\xdb" + struct.pack(">I", n))
+        out.append(data)
+    elif isinstance(o, (list, tuple)):
+        n = len(o)
+        if n < 0x10:
+            out.append(struct.pack("B", 0x90 | n))
+        elif n <= 0xffff:
+            out.append(b"\xdc" + struct.pack(">H", n))
+        else:
+            out.append(b"\xdd" + struct.pack(">I", n))
+        for item in o:
+            _pack(item, out)
+    elif isinstance(o, dict):
+        n = len(o)
+        if n < 0x10:
+            out.append(struct.pack("B", 0x80 | n))
+        elif n <= 0xffff:
+            out.append(b"\xde" + struct.pack(">H", n))
+        else:
+            out.append(b"\xdf" + struct.pack(">I", n))
+        for k, v in o.items():
+            _pack(k, out)
+            _pack(v, out)
+    elif isinstance(o, datetime) and o.tzinfo is None:
+        micros = (o - EPOCH) // timedelta(microseconds=1)
+        out.append(b"\xd7" + struct.pack(">bq", DATETIME_EXT, micros))
+    elif isinstance(o, (bytes, bytearray)):
+        n = len(o)
+        if n <= 0xff:
+            out.append(b"\xc4" + struct.pack("B", n))
+        elif n <= 0xffff:
+            out.append(b"\xc5" + struct.pack(">H", n))
+        else:
+            out.append(b"\xc6" + struct.pack(">I", n))
+        out.append(bytes(o))
+    else:
+        raise TypeError("cannot encode {} in MessagePack".format(
+            type(o).__name__))
+
+
+def packb(o):
+    """Return the MessagePack encoding of o.
+
+    Naive datetimes are stored as extension type 1, holding the signed
+    64-bit count of microseconds since datetime.min.
+    """
+    out = []
+    _pack(o, out)
+    return b"".join(out)
+
+
+_FIXED = {
+    0xcc: struct.Struct("B"), 0xcd: struct.Struct(">H"),
+    0xce: struct.Struct(">I"), 0xcf: struct.Struct(">Q"),
+    0xd0: struct.Struct("b"), 0xd1: struct.Struct(">h"),
+    0xd2: struct.Struct(">i"), 0xd3: struct.Struct(">q"),
+    0xca: struct.Struct(">f"), 0xcb: struct.Struct(">d")
+}
+_SIZES = {
+    0xd9: struct.Struct("B"), 0xda: struct.Struct(">H"),
+    0xdb: struct.Struct(">I"), 0xc4: struct.Struct("B"),
+    0xc5: struct.Struct(">H"), 0xc6: struct.Struct(">I"),
+    0xdc: struct.Struct(">H"), 0xdd: struct.Struct(">I"),
+    0xde: struct.Struct(">H"), 0xdf: struct.Struct(">I")
+}
+_EXT = struct.Struct(">bq")
+
+
+def _unpack(data, pos):
+    """Decode the value at data[pos] and return it with the next position."""
+    b = data[pos]
+    pos += 1
+    if b < 0x80:
+        return b, pos
+    if b >= 0xe0:
+        return b - 0x100, pos
+    if 0xa0 <= b <= 0xbf:
+        end = pos + (b & 0x1f)
+        return data[pos:end].decode("utf-8"), end
+    if 0x90 <= b <= 0x9f:
+        return _unpack_array(data, pos, b & 0x0f)
+    if 0x80 <= b <= 0x8f:
+        return _unpack_map(data, pos, b & 0x0f)
+    if b == 0xc0:
+        return None, pos
+    if b == 0xc2:
+        return False, pos
+    if b == 0xc3:
+        return True, pos
+    if b in _FIXED:
+        fmt = _FIXED[b]
+        return fmt.unpack_from(data, pos)[0], pos + fmt.size
+    if b in _SIZES:
+        fmt = _SIZES[b]
+        n = fmt.unpack_from(data, pos)[0]
+        pos += fmt.size
+        if b in (0xd9, 0xda, 0xdb):
+            return data[pos:pos + n].decode("utf-8"), pos + n
+        if b in (0xc4, 0xc5, 0xc6):
+            return bytes(data[pos:pos + n]), pos + n
+        if b in (0xdc, 0xdd):
+            return _unpack_array(data, pos, n)
+        return _unpack_map(data, pos, n)
+    if b == 0xd7:
+        ext, micros = _EXT.unpack_from(data, pos)
+        if ext == DATETIME_EXT:
+            return EPOCH + timedelta(microseconds=micros), pos + _EXT.size
+        raise ValueError("unknown MessagePack extension {}".format(ext))
+    raise ValueError("unsupported MessagePack byte 0x{:02x}".format(b))
+
+
+def _unpack_array(data, pos, n):
+    """Decode n array items starting at data[pos]."""
+    items = []
+    for i in range(n):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data, pos, n):
+    """Decode n map entries starting at data[pos]."""
+    result = {}
+    for i in range(n):
+        k, pos = _unpack(data, pos)
+        result[k], pos = _unpack(data, pos)
+    return result, pos
+
+
+def unpackb(data):
+    """Return the value of a MessagePack encoding.
+
+    Raises:
+        ValueError: If data is not exactly one MessagePack value.
+    """
+    try:
+        value, pos = _unpack(data, 0)
+    except (IndexError, struct.error) as error:
+        raise ValueError("truncated MessagePack data") from error
+    if pos != len(data):
+        raise ValueError("extra data after MessagePack value")
+    return value
+
+
+serializers = {
+    "json": JSONSerializer(),
+    "msgpack": MsgpackSerializer(),
+    "pickle": PickleSerializer()
+}
+
+
+def detect(f):
+    """Return the serializer of a snapshot file open in binary mode.
+
+    The file position is left at the start of the file.
+    """
+    head = f.read(max(len(s.magic) for s in serializers.values()))
+    f.seek(0)
+    for serializer in serializers.values():
+        if serializer.magic and head.startswith(serializer.magic):
+            return serializer
+    return serializers["json"]
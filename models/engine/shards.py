@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+"""Defines the sharded snapshot layout of FileStorage.
+
+With the shards option set, the snapshot is split into shard files in
+the <file_path>.d directory, one per class ("class") or one per bucket
+of a hash of the keys (a number of buckets). Each shard is a complete
+snapshot in one of the formats of models.engine.serializers, so shards
+can be parsed independently, in parallel worker processes, and only the
+shards holding changed objects need to be written again. A bucket
+shard is named after its number and the number of buckets, so the
+shards of another bucket count are never mistaken for current ones.
+"""
+import io
+import multiprocessing
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from models.base_model import TIMESTAMPS, to_datetime
+from models.engine.serializers import detect
+
+
+SUFFIX = ".shard"
+
+
+def shard_dir(file_path):
+    """Return the directory holding the shards of a snapshot."""
+    return file_path + ".d"
+
+
+def shard_of(key, layout):
+    """Return the name of the shard a key belongs to.
+
+    Args:
+        key (str): A <class name>.<id> key.
+        layout (str|int): "class", or the number of hash buckets.
+    """
+    if layout == "class":
+        return key.split(".", 1)[0]
+    return "{}-of-{}".format(zlib.crc32(key.encode()) % int(layout),
+                             int(layout))
+
+
+def group(items, layout):
+    """Return the (key, value) pairs of items as a dict per shard name.
+
+    Args:
+        items (iterable): The (key, value) pairs.
+        layout (str|int): "class", or the number of hash buckets.
+    """
+    groups = {}
+    if layout == "class":
+        for key, value in items:
+            groups.setdefault(key.split(".", 1)[0], {})[key] = value
+        return groups
+    n = int(layout)
+    crc32 = zlib.crc32
+    for key, value in items:
+        groups.setdefault(crc32(key.encode()) % n, {})[key] = value
+    return {"{}-of-{}".format(bucket, n): values
+            for bucket, values in groups.items()}
+
+
+def shard_path(file_path, shard):
+    """Return the file of one shard of a snapshot."""
+    return os.path.join(shard_dir(file_path), shard + SUFFIX)
+
+
+def shard_name(path):
+    """Return the name of the shard of a shard file."""
+    return os.path.basename(path)[:-len(SUFFIX)]
+
+
+def list_shards(file_path):
+    """Return the shard files of a snapshot, or None if it has none."""
+    try:
+        names = os.listdir(shard_dir(file_path))
+    except FileNotFoundError:
+        return None
+    return [os.path.join(shard_dir(file_path), name)
+            for name in sorted(names) if name.endswith(SUFFIX)]
+
+
+def read_shard(path, stream=False):
+    """Return the (key, record) pairs of a shard, with parsed dates.
+
+    ISO 8601 dates are parsed here, so the work is done in the worker
+    process when shards are read in parallel. Epoch ints are kept as
+    they are, to be converted when first read.
+
+    Args:
+        path (str): The shard file.
+        stream (bool): Whether to parse one record at a time.
+    """
+    with open(path, "rb") as f:
+        serializer = detect(f)
+        if not serializer.binary:
+            f = io.TextIOWrapper(f, encoding="utf-8")
+        pairs = []
+        for key, rec in serializer.load(f, stream):
+            for name in TIMESTAMPS:
+                value = rec.get(name)
+                if type(value) is str:
+                    rec[name] = to_datetime(value)
+            pairs.append((key, rec))
+    return pairs
+
+
+def importing():
+    """Tell if the models package is still being imported.
+
+    A process pool could not be used then: its feeder thread pickles
+    read_shard() by reference, which waits for the import of models
+    held by the thread waiting for the results.
+    """
+    spec = getattr(sys.modules.get("models"), "__spec__", None)
+    return getattr(spec, "_initializing", False)
+
+
+def send_shards(conn, paths, stream=False):
+    """Send the read_shard() pairs of each shard file on a connection.
+
+    It runs in a forked worker process; an error is sent in place of
+    the pairs of the shard that raised it.
+    """
+    try:
+        for path in paths:
+            conn.send(read_shard(path, stream))
+    except Exception as error:
+        conn.send(error)
+    finally:
+        conn.close()
+
+
+def read_forked(paths, workers, stream=False):
+    """Yield the pairs of shard files read by forked worker processes.
+
+    Worker i reads the shards i, i + workers and so on, and the results
+    are received in the order of paths. The workers are started with
+    send_shards() as their target, which a fork does not pickle, so it
+    also runs while models is being imported.
+    """
+    context = multiprocessing.get_context("fork")
+    conns = []
+    procs = []
+    try:
+        for i in range(workers):
+            recv, send = context.Pipe(duplex=False)
+            proc = context.Process(target=send_shards, daemon=True,
+                                   args=(send, paths[i::workers], stream))
+            proc.start()
+            send.close()
+            conns.append(recv)
+            procs.append(proc)
+        for i in range(len(paths)):
+            pairs = conns[i % workers].recv()
+            if isinstance(pairs, Exception):
+                raise pairs
+            yield from pairs
+    finally:
+        for conn in conns:
+            conn.close()
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+            proc.join()
+
+
+def read_shards(paths, workers=0, stream=False):
+    """Yield the (key, record) pairs of shard files, shard by shard.
+
+    The shards are read by forked worker processes where fork is
+    available, see read_forked(), and by a process pool otherwise,
+    except while models is being imported.
+
+    Args:
+        paths (list): The shard files.
+        workers (int): The number of worker processes; 0 for one per
+            CPU. With one worker, or one shard, the shards are read in
+            this process.
+        stream (bool): Whether to parse one record at a time, when read
+            in this process.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        yield from read_forked(paths, workers, stream)
+    elif workers > 1 and not importing():
+        with ProcessPoolExecutor(workers) as pool:
+            for pairs in pool.map(read_shard, paths):
+                yield from pairs
+    else:
+        for path in paths:
+            yield from read_shard(path, stream)
@@ -0,0 +1,179 @@
+#!/usr/bin/python3
+"""Defines an in-memory inverted index for full-text search.
+
+Texts are split into lowercase words with accents removed. Each word
+maps to the documents holding it and how often, so a query only reads
+the postings of its own words. Results are ranked with BM25, and query
+words also match the longer words they are a prefix of, found by
+bisecting the sorted vocabulary.
+"""
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+
+
+WORD = re.compile(r"\w+")
+K1 = 1.2
+B = 0.75
+PREFIX_WEIGHT = 0.5
+TEXT_FIELDS = {
+    "Place": ("name", "description"),
+    "Review": ("text",),
+    "City": ("name",),
+    "State": ("name",),
+    "Amenity": ("name",)
+}
+
+
+def tokenize(text):
+    """Return the lowercase, accent-free words of a text."""
+    if not isinstance(text, str):
+        return []
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text)
+                       if not unicodedata.combining(c))
+    return WORD.findall(text.lower())
+
+
+class TextIndex:
+    """Represents an inverted index over documents made of texts.
+
+    Attributes:
+        postings (dict): each word mapped to the documents holding it,
+            keyed by document key, with the number of occurrences.
+        docs (dict): the (word, count) pairs of each document key.
+        lengths (dict): the number of words of each document key.
+        total (int): the number of words of all the documents.
+        version (int): the number of changes made to the index, to tell
+            if it changed since it was saved.
+    """
+
+    def __init__(self):
+        """Initialize a new, empty TextIndex."""
+        self.postings = {}
+        self.docs = {}
+        self.lengths = {}
+        self.total = 0
+        self.version = 0
+        self.__vocabulary = None
+
+    def __len__(self):
+        """Return the number of indexed documents."""
+        return len(self.docs)
+
+    def add(self, key, texts):
+        """Index a document, replacing its previous version.
+
+        Args:
+            key (str): The document key.
+            texts (iterable): The texts of the document.
+        """
+        self.remove(key)
+        counts = {}
+        length = 0
+        for text in texts:
+            for word in tokenize(text):
+                counts[word] = counts.get(word, 0) + 1
+                length += 1
+        if length:
+            self.__insert(key, tuple(counts.items()), length)
+
+    def __insert(self, key, pairs, length):
+        """Add the postings of one document."""
+        postings = self.postings
+        for word, count in pairs:
+            docs = postings.get(word)
+            if docs is None:
+                docs = postings[word] = {}
+                self.__vocabulary = None
+            docs[key] = count
+        self.docs[key] = pairs
+        self.lengths[key] = length
+        self.total += length
+        self.version += 1
+
+    def remove(self, key):
+        """Drop a document from the index, if it is there."""
+        pairs = self.docs.pop(key, None)
+        if pairs is None:
+            return
+        self.total -= self.lengths.pop(key)
+        self.version += 1
+        for word, count in pairs:
+            docs = self.postings[word]
+            del docs[key]
+            if not docs:
+                del self.postings[word]
+                self.__vocabulary = None
+
+    def expand(self, word):
+        """Return the indexed words starting with word."""
+        if self.__vocabulary is None:
+            self.__vocabulary = sorted(self.postings)
+        vocabulary = self.__vocabulary
+        found = []
+        i = bisect_left(vocabulary, word)
+        while i < len(vocabulary) and vocabulary[i].startswith(word):
+            found.append(vocabulary[i])
+            i += 1
+        return found
+
+    def search(self, query, prefix=True, accept=None):
+        """Return the documents matching every query word, ranked.
+
+        Args:
+            query (str): The words to look for.
+            prefix (bool): Whether a query word also matches the words
+                it is a prefix of, at a lower weight.
+            accept (callable): If set, only the keys it returns True
+                for are kept.
+
+        Returns:
+            list: The (score, key) pairs of the matches, best first.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words or not self.docs:
+            return []
+        n = len(self.docs)
+        avgdl = self.total / n
+        scores = None
+        for word in words:
+            matched = {}
+            variants = self.expand(word) if prefix else [word]
+            for variant in variants:
+                docs = self.postings.get(variant)
+                if not docs:
+                    continue
+                weight = 1.0 if variant == word else PREFIX_WEIGHT
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                for key, count in docs.items():
+                    if scores is not None and key not in scores:
+                        continue
+                    norm = K1 * (1 - B + B * self.lengths[key] / avgdl)
+                    score = weight * idf * count * (K1 + 1) / (count + norm)
+                    if score > matched.get(key, 0):
+                        matched[key] = score
+            if scores is None:
+                scores = matched
+            else:
+                scores = {key: scores[key] + s for key, s in matched.items()}
+            if not scores:
+                return []
+        if accept is not None:
+            scores = {k: s for k, s in scores.items() if accept(k)}
+        return sorted(((s, k) for k, s in scores.items()),
+                      key=lambda pair: (-pair[0], pair[1]))
+
+    def records(self):
+        """Return the documents of the index as JSON-ready data."""
+        return {key: [pairs, self.lengths[key]]
+                for key, pairs in self.docs.items()}
+
+    @classmethod
+    def from_records(cls, records):
+        """Return the index of the data returned by records()."""
+        index = cls()
+        for key, (pairs, length) in records.items():
+            index.__insert(key, tuple(map(tuple, pairs)), length)
+        return index
@@ -1,6 +0,0 @@
-#!/usr/bin/python3
-"""Defines the BaseModel class."""
-
-from .storage import Storage
-
-storage = Storage()
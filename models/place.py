@@ -18,6 +18,7 @@ Attributes:
     amenity_ids (list): A list of IDs of amenities available in the place.
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -50,3 +51,30 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+
+    @property
+    def reviews(self):
+        """Return the stored reviews of the place."""
+        return models.storage.find("Review", "place_id", self.id)
+
+    @property
+    def amenities(self):
+        """Return the stored amenities listed in amenity_ids."""
+        found = (models.storage.get("Amenity", amenity_id)
+                 for amenity_id in self.amenity_ids)
+        return [amenity for amenity in found if amenity is not None]
+
+    @classmethod
+    def near(cls, lat, lon, km):
+        """Return the stored places within km of a point, nearest first."""
+        return models.storage.near(cls.__name__, lat, lon, km)
+
+    @classmethod
+    def in_box(cls, south, west, north, east):
+        """Return the stored places inside a latitude/longitude box."""
+        return models.storage.in_box(cls.__name__, south, west, north, east)
+
+    @classmethod
+    def nearest(cls, lat, lon, k=1):
+        """Return the k stored places nearest to a point."""
+        return models.storage.nearest(cls.__name__, lat, lon, k)
@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+"""Defines the compact __slots__ variants of the model classes.
+
+A slotted variant of a model class keeps the attributes the class
+declares, with id, created_at and updated_at, in fixed slots instead of
+a per-instance __dict__; ad-hoc attributes, such as the ones set by the
+console update command, go to an overflow dict made on first use.
+Foreign key ids are interned, so the objects pointing at the same
+parent share one string.
+"""
+import sys
+import models
+from models.base_model import TIMESTAMPS, to_datetime
+
+
+BASE_FIELDS = ("id", "created_at", "updated_at")
+
+
+def declared(cls):
+    """Return the attributes a model class and its bases declare.
+
+    Methods, class methods, properties and other data descriptors, and
+    private names are left out.
+
+    Returns:
+        dict: The attribute names mapped to their class level values.
+    """
+    defaults = {}
+    for klass in reversed(cls.__mro__):
+        defaults.update((k, v) for k, v in vars(klass).items()
+                        if not k.startswith("_") and not callable(v) and
+                        not hasattr(v, "__set__") and
+                        not isinstance(v, (classmethod, staticmethod)))
+    return defaults
+
+
+class SlottedModel:
+    """Represents the behaviour shared by the slotted model variants.
+
+    Attributes:
+        _fields (frozenset): the attribute names that have a slot.
+        _defaults (dict): the class level values of the declared
+            attributes, returned while their slot is empty.
+    """
+    __slots__ = ()
+    _fields = frozenset()
+    _defaults = {}
+
+    def __getattr__(self, name):
+        """Return the class default or the overflow value of name."""
+        if name in self._defaults:
+            return self._defaults[name]
+        if name == "_extra":
+            return None
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        """Set an attribute and tell the storage the instance changed."""
+        if name in self._fields:
+            super().__setattr__(name, value)
+            return
+        self.__overflow()[name] = value
+        models.storage.touch(self, name)
+
+    def __delattr__(self, name):
+        """Delete an attribute and tell the storage the instance changed."""
+        if name in self._fields:
+            object.__delattr__(self, name)
+        else:
+            extra = self._extra
+            if extra is None or name not in extra:
+                raise AttributeError(name)
+            del extra[name]
+        models.storage.touch(self, name)
+
+    def _restore(self, name, value):
+        """Set an attribute without telling the storage, when loading.
+
+        Epoch timestamps are converted at once, as slots have no room
+        to keep them unconverted until first read.
+        """
+        if type(value) is str and name.endswith("_id"):
+            value = sys.intern(value)
+        elif type(value) is int and name in TIMESTAMPS:
+            value = to_datetime(value)
+        if name in self._fields:
+            object.__setattr__(self, name, value)
+        else:
+            self.__overflow()[name] = value
+
+    def _attributes(self):
+        """Return a dictionary of the set slots and overflow attributes."""
+        attrs = {}
+        for name in self.__slots__:
+            if name.startswith("_"):
+                continue
+            try:
+                attrs[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        if self._extra:
+            attrs.update(self._extra)
+        return attrs
+
+    def __overflow(self):
+        """Return the overflow dict, making it on first use."""
+        extra = self._extra
+        if extra is None:
+            extra = {}
+            object.__setattr__(self, "_extra", extra)
+        return extra
+
+
+def slotted(cls):
+    """Return the slotted variant of a model class.
+
+    The variant subclasses cls and keeps its name, so instances are
+    still instances of cls and are stored under the same keys.
+
+    Args:
+        cls (type): A BaseModel subclass.
+    """
+    defaults = declared(cls)
+    fields = BASE_FIELDS + tuple(k for k in defaults if k not in BASE_FIELDS)
+    return type(cls.__name__, (SlottedModel, cls), {
+        "__slots__": fields + ("_extra",),
+        "__module__": cls.__module__,
+        "__doc__": cls.__doc__,
+        "_fields": frozenset(fields),
+        "_defaults": defaults
+    })
@@ -8,6 +8,7 @@ Attributes:
     name (str): The name of the state.
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -20,3 +21,8 @@ class State(BaseModel):
     """
 
     name = ""
+
+    @property
+    def cities(self):
+        """Return the stored cities of the state."""
+        return models.storage.find("City", "state_id", self.id)
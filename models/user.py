@@ -11,6 +11,7 @@ Attributes:
     last_name (str): The last name of the user.
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -29,3 +30,13 @@ class User(BaseModel):
     password = ""
     first_name = ""
     last_name = ""
+
+    @property
+    def places(self):
+        """Return the stored places the user owns."""
+        return models.storage.find("Place", "user_id", self.id)
+
+    @property
+    def reviews(self):
+        """Return the stored reviews the user wrote."""
+        return models.storage.find("Review", "user_id", self.id)
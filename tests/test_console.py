@@ -10,13 +10,20 @@ Unittest classes:
     TestHBNBCommand_all
     TestHBNBCommand_destroy
     TestHBNBCommand_update
+    TestHBNBCommand_geo
+    TestHBNBCommand_search_text
+    TestHBNBCommand_all_stream
+    TestHBNBCommand_batch
+    TestHBNBCommand_import_export
 """
+import json
 import os
 import sys
 import unittest
 from models import storage
 from models.engine.file_storage import FileStorage
-from console import HBNBCommand
+from console import HBNBCommand, main
+from test_models.test_engine import FileStorageMixin
 from io import StringIO
 from unittest.mock import patch
 
@@ -999,5 +1006,275 @@ class TestHBNBCommand_count(unittest.TestCase):
                 self.assertEqual("1", output.getvalue().strip())
 
 
+class TestHBNBCommand_geo(unittest.TestCase):
+    """Unittests for testing the geo command of the HBNB interpreter."""
+
+    def setUp(self):
+        from models.place import Place
+        self.place = Place()
+        self.place.latitude = 48.8566
+        self.place.longitude = 2.3522
+
+    def tearDown(self):
+        storage.delete(self.place)
+
+    def test_geo_errors(self):
+        for line, error in (("geo", "** search mode missing **"),
+                            ("geo around 1 2", "** unknown search mode **"),
+                            ("geo near 1 2",
+                             "** wrong number of arguments **"),
+                            ("geo box 1 2 3 x",
+                             "** arguments must be numbers **")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual(error, output.getvalue().strip())
+
+    def test_geo_near(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("geo near 48.85 2.35 5"))
+            self.assertIn(self.place.id, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("geo box 48 2 49 3"))
+            self.assertIn(self.place.id, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("geo near -40 -40 5"))
+            self.assertNotIn(self.place.id, output.getvalue())
+
+
+class TestHBNBCommand_search_text(unittest.TestCase):
+    """Unittests for testing the full-text search of the HBNB interpreter."""
+
+    def setUp(self):
+        from models.place import Place
+        self.place = Place()
+        self.place.name = "Cozy loft"
+
+    def tearDown(self):
+        storage.delete(self.place)
+
+    def test_search_text_missing_words(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search text"))
+            self.assertEqual("** search words missing **",
+                             output.getvalue().strip())
+
+    def test_search_text(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search text cozy lo"))
+            self.assertIn(self.place.id, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search text castle"))
+            self.assertNotIn(self.place.id, output.getvalue())
+
+
+class TestHBNBCommand_all_stream(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the paging and formats of the all command."""
+
+    def setUp(self):
+        super().setUp()
+        from models.base_model import BaseModel
+        self.objects = [BaseModel() for i in range(5)]
+
+    def run_all(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+            return output.getvalue()
+
+    def test_list_format(self):
+        self.assertEqual(str([str(obj) for obj in self.objects]),
+                         self.run_all("all BaseModel").strip())
+        self.assertEqual("[]", self.run_all("all User").strip())
+
+    def test_offset_limit(self):
+        self.assertEqual(str([str(obj) for obj in self.objects[1:3]]),
+                         self.run_all("all --offset 1 --limit 2").strip())
+        self.assertEqual(str([str(self.objects[4])]),
+                         self.run_all("all BaseModel --offset 4").strip())
+        self.assertEqual("[]", self.run_all("all --limit 0").strip())
+
+    def test_ndjson(self):
+        lines = self.run_all("all BaseModel --format ndjson --limit 3")
+        lines = lines.splitlines()
+        self.assertEqual([obj.to_dict() for obj in self.objects[:3]],
+                         [json.loads(line) for line in lines])
+
+    def test_small_buffer(self):
+        with patch.object(HBNBCommand, "buffer_size", 10), \
+                patch.object(HBNBCommand, "page_size", 2):
+            self.assertEqual(str([str(obj) for obj in self.objects]),
+                             self.run_all("all").strip())
+
+    def test_errors(self):
+        for line, error in (("all --limit", "** option value missing **"),
+                            ("all --limit x", "** limit must be a number **"),
+                            ("all --offset -1",
+                             "** offset must be a number **"),
+                            ("all --top 3", "** unknown option **"),
+                            ("all --format xml", "** unknown format **"),
+                            ("all MyModel --limit 1",
+                             "** class doesn't exist **")):
+            self.assertEqual(error, self.run_all(line).strip())
+
+
+class TestHBNBCommand_batch(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the batch runner of the HBNB interpreter."""
+
+    def setUp(self):
+        super().setUp()
+        self.commands = os.path.join(self.tmpdir, "commands.txt")
+        with open(self.commands, "w") as f:
+            f.write("# nightly load\ncreate BaseModel\ncreate User\n\n"
+                    "create BaseModel\ncount BaseModel\n")
+
+    def test_one_write(self):
+        write = FileStorage._FileStorage__write
+        with patch.object(FileStorage, "_FileStorage__write", autospec=True,
+                          side_effect=write) as spy, \
+                patch("sys.stdout", new=StringIO()) as output, \
+                open(self.commands) as f:
+            self.assertEqual(4, HBNBCommand().run_batch(f))
+            self.assertEqual(1, spy.call_count)
+        self.assertEqual("2", output.getvalue().splitlines()[-1])
+        with open(FileStorage._FileStorage__file_path) as f:
+            self.assertEqual(3, len(json.load(f)))
+
+    def test_progress(self):
+        progress = StringIO()
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().run_batch(["create User"] * 5, progress, 2)
+        self.assertEqual(["** 2 commands run **", "** 4 commands run **",
+                          "** 5 commands run, saved **"],
+                         progress.getvalue().splitlines())
+
+    def test_stops_at_quit(self):
+        with patch("sys.stdout", new=StringIO()):
+            self.assertEqual(2, HBNBCommand().run_batch(
+                ["create User", "quit", "create User"]))
+        self.assertEqual(1, storage.count("User"))
+
+    def test_main(self):
+        with patch("sys.stdout", new=StringIO()) as output, \
+                patch("sys.stderr", new=StringIO()) as errors:
+            self.assertEqual(0, main(["--batch", self.commands,
+                                      "--progress", "3"]))
+            self.assertIn("** 3 commands run **", errors.getvalue())
+        self.assertEqual(2, storage.count("BaseModel"))
+        with patch("sys.stdin", new=StringIO("create User\n")), \
+                patch("sys.stdout", new=StringIO()), \
+                patch("sys.stderr", new=StringIO()):
+            self.assertEqual(0, main(["--batch", "-"]))
+        self.assertEqual(2, storage.count("User"))
+        with patch("sys.stderr", new=StringIO()) as errors:
+            self.assertEqual(2, main(["--batch"]))
+            self.assertIn("Usage", errors.getvalue())
+
+
+class TestHBNBCommand_import_export(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the import and export commands."""
+
+    def path(self, name, text=None):
+        path = os.path.join(self.tmpdir, name)
+        if text is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return path
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+            return output.getvalue().strip()
+
+    def test_import_ndjson(self):
+        path = self.path("places.ndjson",
+                         '{"id": "p1", "name": "Loft", "max_guest": 2}\n\n'
+                         '{"name": "Cabin", "amenity_ids": ["a1"]}\n')
+        write = FileStorage._FileStorage__write
+        with patch.object(FileStorage, "_FileStorage__write", autospec=True,
+                          side_effect=write) as spy:
+            self.assertEqual("2", self.run_cmd("import Place " + path))
+            self.assertEqual(1, spy.call_count)
+        place = storage.get("Place", "p1")
+        self.assertEqual(("Loft", 2), (place.name, place.max_guest))
+        cabin = storage.find("Place", "name", "Cabin")[0]
+        self.assertEqual(["a1"], cabin.amenity_ids)
+
+    def test_csv_round_trip(self):
+        from models.place import Place
+        place = Place()
+        place.name = "Loft, with a view"
+        place.max_guest = 3
+        place.latitude = 48.5
+        place.amenity_ids = ["a1", "a2"]
+        place.wifi = "yes"
+        path = self.path("places.csv")
+        self.assertEqual("1", self.run_cmd("export Place " + path))
+        storage.delete(place)
+        self.assertEqual("1", self.run_cmd("import Place " + path))
+        copy = storage.get("Place", place.id)
+        self.assertEqual(place.to_dict(), copy.to_dict())
+        self.assertIsInstance(copy.max_guest, int)
+
+    def test_export_ndjson(self):
+        from models.user import User
+        users = [User(), User()]
+        path = self.path("users.ndjson")
+        self.assertEqual("2", self.run_cmd("export User " + path))
+        with open(path) as f:
+            self.assertEqual([user.to_dict() for user in users],
+                             [json.loads(line) for line in f])
+
+    def test_invalid_record(self):
+        path = self.path("bad.ndjson", '{"name": "a"}\n[1]\n{"name": "b"}\n')
+        self.assertEqual("** invalid record on line 2 **",
+                         self.run_cmd("import Place " + path))
+        self.assertEqual(1, storage.count("Place"))
+        with open(FileStorage._FileStorage__file_path) as f:
+            self.assertEqual(["Place"], [rec["__class__"]
+                                         for rec in json.load(f).values()])
+        path = self.path("bad.csv", "name,max_guest\nLoft,many\n")
+        self.assertEqual("** invalid record on line 2 **",
+                         self.run_cmd("import Place " + path))
+        for date in ("null", "12.5", '"2017-13-01T00:00:00"'):
+            path = self.path("dates.ndjson",
+                             '{"name": "a"}\n{"created_at": %s}\n' % date)
+            self.assertEqual("** invalid record on line 2 **",
+                             self.run_cmd("import Place " + path))
+
+    def test_imported_class_commands(self):
+        path = self.path("cities.ndjson", '{"id": "c1", "name": "Paris"}\n')
+        self.assertEqual("1", self.run_cmd("import City " + path))
+        self.assertIn("Paris", self.run_cmd("show City c1"))
+        self.assertEqual("1", self.run_cmd("count City"))
+        self.run_cmd('update City c1 name "Lyon"')
+        self.assertIn("Lyon", self.run_cmd("all City"))
+        self.run_cmd("destroy City c1")
+        self.assertEqual("0", self.run_cmd("count City"))
+
+    def test_export_unbuilt(self):
+        from models.user import User
+        users = [User(), User()]
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.configure(lazy=True)
+        storage.reload()
+        path = self.path("users.csv")
+        self.assertEqual("2", self.run_cmd("export User " + path))
+        self.assertEqual(2, len(FileStorage._FileStorage__raw["User"]))
+        with open(path) as f:
+            ids = [line.split(",")[0] for line in f]
+        self.assertEqual(["id"] + sorted(u.id for u in users),
+                         ids[:1] + sorted(ids[1:]))
+
+    def test_errors(self):
+        for line, error in (("import", "** class name missing **"),
+                            ("export MyModel x", "** class doesn't exist **"),
+                            ("import Place", "** file name missing **"),
+                            ("import Place " + self.path("none.ndjson"),
+                             "** file doesn't exist **"),
+                            ("export Place " + self.path("no/such.csv"),
+                             "** file can't be written **")):
+            self.assertEqual(error, self.run_cmd(line))
+
+
 if __name__ == "__main__":
     unittest.main()
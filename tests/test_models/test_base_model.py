@@ -5,13 +5,16 @@ Unittest classes:
     TestBaseModel_instantiation
     TestBaseModel_save
     TestBaseModel_to_dict
+    TestBaseModel_timestamps
+    TestBaseModel_from_dict
 """
 import os
 import models
 import unittest
 from datetime import datetime
 from time import sleep
-from models.base_model import BaseModel
+from unittest.mock import patch
+from models.base_model import BaseModel, to_datetime, to_epoch
 
 
 class TestBaseModel_instantiation(unittest.TestCase):
@@ -193,5 +196,74 @@ class TestBaseModelToDict(unittest.TestCase):
             base_model.to_dict(None)
 
 
+class TestBaseModel_timestamps(unittest.TestCase):
+    """Unittests for testing the timestamp parsing of the BaseModel class."""
+
+    def test_to_datetime(self):
+        dt = datetime(2024, 5, 17, 10, 30, 1, 250)
+        self.assertIs(dt, to_datetime(dt))
+        self.assertEqual(dt, to_datetime(dt.isoformat()))
+        self.assertEqual(dt, to_datetime(to_epoch(dt)))
+        self.assertEqual(datetime(2024, 5, 17),
+                         to_datetime("2024-05-17T00:00:00"))
+        self.assertEqual(0, to_epoch(datetime(1970, 1, 1)))
+        self.assertEqual(to_epoch(dt), to_epoch(dt.isoformat()))
+        with self.assertRaises(ValueError):
+            to_datetime("17/05/2024")
+
+    def test_epoch_kwargs_are_lazy(self):
+        dt = datetime(2024, 5, 17, 10, 30, 1, 250)
+        bm = BaseModel(id="345", created_at=to_epoch(dt),
+                       updated_at=dt.isoformat())
+        self.assertEqual(to_epoch(dt), bm.__dict__["created_at"])
+        self.assertEqual(dt, bm.updated_at)
+        self.assertEqual(dt, bm.created_at)
+        self.assertIs(bm.created_at, bm.__dict__["created_at"])
+
+    def test_epoch_kwargs_str_and_to_dict(self):
+        dt = datetime(2024, 5, 17, 10, 30, 1, 250)
+        bm = BaseModel(id="345", created_at=to_epoch(dt),
+                       updated_at=to_epoch(dt))
+        self.assertIn(repr(dt), str(bm))
+        self.assertEqual(dt.isoformat(), bm.to_dict()["updated_at"])
+
+
+class TestBaseModel_from_dict(unittest.TestCase):
+    """Unittests for testing the from_dict class method of BaseModel."""
+
+    def test_round_trip(self):
+        bm = BaseModel()
+        bm.name = "My First Model"
+        copy = BaseModel.from_dict(bm.to_dict())
+        self.assertIsNot(bm, copy)
+        self.assertEqual(bm.to_dict(), copy.to_dict())
+        self.assertNotIn("__class__", copy.__dict__)
+
+    def test_not_added_to_storage(self):
+        with patch.object(models.storage, "new") as new, \
+                patch.object(models.storage, "touch") as touch:
+            BaseModel.from_dict({"id": "345", "created_at": 0,
+                                 "updated_at": "2024-05-17T10:30:01"})
+            new.assert_not_called()
+            touch.assert_not_called()
+
+    def test_no_defaults_made(self):
+        with patch("models.base_model.uuid4") as uuid4:
+            bm = BaseModel.from_dict({"id": "345", "created_at": 0,
+                                      "updated_at": 0})
+            uuid4.assert_not_called()
+        self.assertEqual(datetime(1970, 1, 1), bm.created_at)
+
+    def test_missing_defaults(self):
+        bm = BaseModel.from_dict({"name": "x"})
+        self.assertIsInstance(bm.id, str)
+        self.assertIsInstance(bm.created_at, datetime)
+        self.assertEqual("x", bm.name)
+
+    def test_invalid_date(self):
+        with self.assertRaises(TypeError):
+            BaseModel.from_dict({"id": "345", "created_at": None})
+
+
 if __name__ == "__main__":
     unittest.main()
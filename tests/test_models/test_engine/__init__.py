@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Defines the fixture shared by the unittests of the storage engines.
+
+Classes:
+    FileStorageMixin
+"""
+import os
+import shutil
+import tempfile
+from collections.abc import Mapping
+from models.engine.file_storage import FileStorage
+
+
+PREFIX = "_FileStorage__"
+KEPT = ("lock", "write_lock", "wakeup", "writer")
+
+
+def fresh(value):
+    """Return the empty counterpart of a FileStorage class attribute."""
+    if isinstance(value, Mapping):
+        return {}
+    if isinstance(value, (set, list, bool, int)):
+        return type(value)()
+    return None
+
+
+class FileStorageMixin:
+    """Runs each test on a FileStorage with no state but its options.
+
+    setUp saves every class attribute of FileStorage but its locks and
+    writer thread, and empties them; the options are copied with
+    persist on, as the tests read back what they save even when the
+    suite runs with HBNB_STORAGE=memory, and the snapshot goes to a
+    scratch directory. tearDown puts them all back, so no state leaks
+    from one test to the next.
+
+    Attributes:
+        tmpdir (str): the scratch directory of the test.
+        file_path (str): the snapshot file, in tmpdir.
+    """
+
+    def setUp(self):
+        """Empty the FileStorage state, saving it first."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmpdir, "file.json")
+        self.saved_state = {k: v for k, v in vars(FileStorage).items()
+                            if k.startswith(PREFIX) and not callable(v) and
+                            k[len(PREFIX):] not in KEPT}
+        for k, v in self.saved_state.items():
+            setattr(FileStorage, k, fresh(v))
+        FileStorage._FileStorage__file_path = self.file_path
+        FileStorage._FileStorage__options = dict(
+            self.saved_state[PREFIX + "options"], persist=True)
+        super().setUp()
+
+    def tearDown(self):
+        """Put the saved FileStorage state back."""
+        super().tearDown()
+        for k, v in self.saved_state.items():
+            setattr(FileStorage, k, v)
+        shutil.rmtree(self.tmpdir)
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/atomic_file.py.
+
+Unittest classes:
+    TestAtomicWrite
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from models.engine.atomic_file import atomic_write
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """Unittests for testing crash-safe file replacement."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "file.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_write_new_file(self):
+        with atomic_write(self.path) as f:
+            f.write("{}")
+        self.assertEqual("{}", self.read(self.path))
+        self.assertEqual(["file.json"], os.listdir(self.tmpdir))
+
+    def test_binary_mode(self):
+        with atomic_write(self.path, "wb", fsync=False) as f:
+            f.write(b"\x00\x01")
+        with open(self.path, "rb") as f:
+            self.assertEqual(b"\x00\x01", f.read())
+
+    def test_failed_write_keeps_old_content(self):
+        with atomic_write(self.path) as f:
+            f.write("old")
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path) as f:
+                f.write("half")
+                raise RuntimeError
+        self.assertEqual("old", self.read(self.path))
+        self.assertEqual(["file.json"], os.listdir(self.tmpdir))
+
+    def test_generations(self):
+        for text in ("a", "b", "c", "d"):
+            with atomic_write(self.path, generations=2) as f:
+                f.write(text)
+        self.assertEqual("d", self.read(self.path))
+        self.assertEqual("c", self.read(self.path + ".1"))
+        self.assertEqual("b", self.read(self.path + ".2"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+
+    def test_keeps_file_mode(self):
+        with atomic_write(self.path) as f:
+            f.write("a")
+        os.chmod(self.path, 0o600)
+        with atomic_write(self.path) as f:
+            f.write("b")
+        self.assertEqual(0o600, os.stat(self.path).st_mode & 0o777)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/columns.py.
+
+Unittest classes:
+    TestColumnStore
+    TestColumnar
+    TestColumnar_storage
+"""
+import gc
+import unittest
+import models
+from models.engine.columns import ColumnStore, columnar
+from models.engine.file_storage import FileStorage, columnar_classes
+from models.place import Place
+from test_models.test_engine import FileStorageMixin
+
+
+class Row:
+    """An object a ColumnStore row can point to."""
+
+
+class TestColumnStore(unittest.TestCase):
+    """Unittests for testing the ColumnStore class."""
+
+    def setUp(self):
+        self.store = ColumnStore({"rooms": 0, "price": 0.0})
+        self.objs = [Row() for i in range(5)]
+        self.rows = [self.store.allocate(o) for o in self.objs]
+        for i, row in enumerate(self.rows):
+            self.store.set(row, "rooms", i)
+            self.store.set(row, "price", 10.0 * i)
+
+    def test_get_converts_to_python(self):
+        self.assertIs(int, type(self.store.get(self.rows[2], "rooms")))
+        self.assertIs(float, type(self.store.get(self.rows[2], "price")))
+        self.assertEqual(2, self.store.get(self.rows[2], "rooms"))
+
+    def test_set_converts_strings(self):
+        self.store.set(self.rows[0], "rooms", "7")
+        self.assertEqual(7, self.store.get(self.rows[0], "rooms"))
+        with self.assertRaises(ValueError):
+            self.store.set(self.rows[0], "rooms", "seven")
+        with self.assertRaises(ValueError):
+            self.store.set(self.rows[0], "rooms", 2.5)
+
+    def test_rows_range(self):
+        self.assertEqual(self.rows[1:4],
+                         self.store.rows(rooms=(1, 3)))
+        self.assertEqual(self.rows[3:],
+                         self.store.rows(price=(25.0, None)))
+        self.assertEqual([self.rows[2]],
+                         self.store.rows(rooms=(None, 3), price=20.0))
+
+    def test_release_and_reuse(self):
+        self.store.release(self.rows[1])
+        self.assertNotIn(self.rows[1], self.store.rows())
+        obj = Row()
+        self.assertEqual(self.rows[1], self.store.allocate(obj))
+        self.assertFalse(self.store.is_set(self.rows[1], "rooms"))
+        self.assertEqual([obj], self.store.select(rooms=0)[1:])
+
+    def test_many_rows(self):
+        objs = [Row() for i in range(100)]
+        for o in objs:
+            self.store.set(self.store.allocate(o), "rooms", 50)
+        self.assertEqual(objs, self.store.select(rooms=50))
+
+
+class TestColumnar(unittest.TestCase):
+    """Unittests for testing the row proxy classes."""
+
+    def setUp(self):
+        self.Proxy = columnar(Place)
+
+    def test_same_name_and_base(self):
+        self.assertEqual("Place", self.Proxy.__name__)
+        self.assertTrue(issubclass(self.Proxy, Place))
+        self.assertEqual(0, self.Proxy.max_guest)
+
+    def test_values_live_in_columns(self):
+        place = self.Proxy(id="1", name="Loft", max_guest="4", latitude=1.5)
+        self.assertNotIn("max_guest", vars(place))
+        self.assertEqual(4, place.max_guest)
+        self.assertEqual(1.5, place.latitude)
+        self.assertEqual(0, place.number_rooms)
+        self.assertEqual("Loft", place.name)
+
+    def test_to_dict_matches_plain(self):
+        kwargs = {"id": "7", "created_at": "2024-01-01T00:00:00.000001",
+                  "updated_at": "2024-01-02T00:00:00.000001",
+                  "city_id": "c", "max_guest": 4, "longitude": 2.5,
+                  "wifi": "yes"}
+        self.assertEqual(Place(**kwargs).to_dict(),
+                         self.Proxy(**kwargs).to_dict())
+
+    def test_delete_attribute(self):
+        place = self.Proxy(id="1", max_guest=4)
+        del place.max_guest
+        self.assertEqual(0, place.max_guest)
+        self.assertNotIn("max_guest", place.to_dict())
+
+    def test_value_not_a_number(self):
+        place = self.Proxy(id="1", max_guest="4.5")
+        self.assertEqual("4.5", place.max_guest)
+        self.assertFalse(self.Proxy._columns.is_set(place._row, "max_guest"))
+        self.assertEqual("4.5", place.to_dict()["max_guest"])
+        place.max_guest = 3
+        self.assertEqual(3, place.max_guest)
+        self.assertNotIn("max_guest", place._extra)
+        place.price_by_night = "cheap"
+        del place.price_by_night
+        self.assertEqual(0, place.price_by_night)
+
+    def test_row_freed_with_instance(self):
+        place = self.Proxy(id="1", max_guest=4)
+        row = place._row
+        del place
+        gc.collect()
+        self.assertEqual([row], self.Proxy._columns.free)
+
+
+class TestColumnar_storage(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the columnar option of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        for price, guests in ((50, 2), (80, 4), (120, 6)):
+            place = Place()
+            place.price_by_night = price
+            place.max_guest = guests
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.configure(columnar=True)
+        models.storage.reload()
+
+    def prices(self, objs):
+        return sorted(o.price_by_night for o in objs)
+
+    def test_reload_builds_proxies(self):
+        for obj in models.storage.all_of("Place").values():
+            self.assertIs(columnar_classes["Place"], type(obj))
+
+    def test_filter(self):
+        self.assertEqual([80, 120], self.prices(models.storage.filter(
+            "Place", price_by_night=(60, None))))
+        self.assertEqual([80], self.prices(models.storage.filter(
+            "Place", price_by_night=(None, 100), max_guest=(3, None))))
+        self.assertEqual([50], self.prices(models.storage.filter(
+            "Place", max_guest=2)))
+
+    def test_filter_new_and_deleted(self):
+        place = Place()
+        place.price_by_night = 90
+        gone = models.storage.filter("Place", price_by_night=120)[0]
+        models.storage.delete(gone)
+        self.assertEqual([80, 90], self.prices(models.storage.filter(
+            "Place", price_by_night=(60, None))))
+
+    def test_filter_other_attributes(self):
+        self.assertEqual(3, len(models.storage.filter("Place", name="")))
+
+    def test_reload_value_not_a_number(self):
+        place = Place()
+        place.price_by_night = "cheap"
+        place.max_guest = "4.5"
+        models.storage.configure(columnar=False)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.configure(columnar=True)
+        models.storage.reload()
+        place = models.storage.get("Place", place.id)
+        self.assertIs(columnar_classes["Place"], type(place))
+        self.assertEqual("cheap", place.price_by_night)
+        self.assertEqual("4.5", place.max_guest)
+        self.assertEqual([80, 120], self.prices(models.storage.filter(
+            "Place", price_by_night=(None, 150), max_guest=(3, None))))
+        self.assertEqual([place], models.storage.filter(
+            "Place", max_guest="4.5"))
+
+    def test_filter_without_columns(self):
+        models.storage.configure(columnar=False)
+        self.assertEqual([80, 120], self.prices(models.storage.filter(
+            "Place", price_by_night=(60, None))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/db_storage.py.
+
+Unittest classes:
+    TestDBStorage
+"""
+import gc
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.db_storage import DBStorage
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+class TestDBStorage(unittest.TestCase):
+    """Unittests for testing the SQLite storage engine."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "hbnb.db")
+        self.saved_options = dict(DBStorage._DBStorage__options)
+        self.storage = DBStorage()
+        self.storage.configure(db_path=self.db_path)
+        self.storage.reload()
+        self.patcher = patch.object(models, "storage", self.storage)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.close()
+        DBStorage._DBStorage__pending.clear()
+        DBStorage._DBStorage__options = self.saved_options
+        shutil.rmtree(self.tmpdir)
+
+    def reopen(self):
+        """Drop every cached instance and reconnect to the database."""
+        self.storage.close()
+        gc.collect()
+        self.storage.reload()
+
+    def test_tables_and_indexes(self):
+        db = sqlite3.connect(self.db_path)
+        names = {row[0] for row in db.execute(
+            "SELECT name FROM sqlite_master")}
+        db.close()
+        for table in ("BaseModel", "User", "State", "City", "Place",
+                      "Amenity", "Review", "City_state_id", "Place_city_id",
+                      "Review_place_id", "User_email"):
+            self.assertIn(table, names)
+
+    def test_save_and_reload(self):
+        place = Place()
+        place.name = "Loft"
+        place.number_rooms = 3
+        place.amenity_ids = ["a1", "a2"]
+        place.ad_hoc = True
+        place.save()
+        place_id, created_at = place.id, place.created_at
+        del place
+        self.reopen()
+        place = self.storage.get("Place", place_id)
+        self.assertEqual("Loft", place.name)
+        self.assertEqual(3, place.number_rooms)
+        self.assertEqual(["a1", "a2"], place.amenity_ids)
+        self.assertIs(True, place.ad_hoc)
+        self.assertEqual(created_at, place.created_at)
+        self.assertEqual(0.0, place.latitude)
+
+    def test_same_row_same_instance(self):
+        user = User()
+        user.save()
+        self.assertIs(user, self.storage.get("User", user.id))
+        self.assertIs(user, self.storage.all()["User." + user.id])
+
+    def test_attribute_update_is_upserted(self):
+        user = User()
+        user.save()
+        user_id = user.id
+        user.email = "a@b.c"
+        user.save()
+        del user
+        self.reopen()
+        self.assertEqual("a@b.c", self.storage.get("User", user_id).email)
+        self.assertEqual(1, self.storage.count("User"))
+
+    def test_count_and_find_see_unsaved_objects(self):
+        city = City()
+        city.state_id = "s1"
+        City()
+        self.assertEqual(2, self.storage.count("City"))
+        self.assertEqual([city], self.storage.find("City", "state_id",
+                                                   "s1"))
+
+    def test_delete(self):
+        review = Review()
+        review.save()
+        self.storage.delete(review)
+        self.storage.save()
+        self.assertIsNone(self.storage.get("Review", review.id))
+        self.assertEqual(0, self.storage.count("Review"))
+
+    def test_batch_commits_once(self):
+        with patch.object(DBStorage, "_DBStorage__flush") as flush:
+            with self.storage.batch():
+                User().save()
+                User().save()
+                self.assertEqual(0, flush.call_count)
+            self.assertEqual(1, flush.call_count)
+
+    def test_import_records(self):
+        self.storage.configure(flush_every=2)
+        records = ({"name": "Place {}".format(i), "price_by_night": i}
+                   for i in range(5))
+        with patch.object(DBStorage, "_DBStorage__flush",
+                          wraps=self.storage._DBStorage__flush) as flush:
+            self.assertEqual(5, self.storage.import_records("Place",
+                                                            records))
+            self.assertEqual(3, flush.call_count)
+        self.storage.close()
+        self.storage.reload()
+        self.assertEqual(5, self.storage.count("Place"))
+        self.assertEqual(["Place 3"], [p.name for p in self.storage.find(
+            "Place", "price_by_night", 3)])
+
+    def test_import_records_failing(self):
+        records = [{"name": "Loft"}, {"created_at": None}]
+        with self.assertRaises(TypeError):
+            self.storage.import_records("Place", records)
+        db = sqlite3.connect(self.db_path)
+        self.assertEqual([("Loft",)],
+                         db.execute('SELECT name FROM "Place"').fetchall())
+        db.close()
+
+    def test_records(self):
+        place = Place()
+        place.name = "Loft"
+        place.tags = ["quiet"]
+        expected = place.to_dict()
+        del place
+        gc.collect()
+        with patch.object(Place, "from_dict") as from_dict:
+            self.assertEqual([expected], list(self.storage.records("Place")))
+            from_dict.assert_not_called()
+        self.assertEqual([], list(self.storage.records("MyModel")))
+
+    def test_unknown_class(self):
+        self.assertEqual({}, self.storage.all_of("MyModel"))
+        self.assertEqual(0, self.storage.count("MyModel"))
+        self.assertIsNone(self.storage.get("MyModel", "1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,12 +4,21 @@
 Unittest classes:
     TestFileStorage_instantiation
     TestFileStorage_methods
+    TestFileStorage_journal
+    TestFileStorage_indexes
+    TestFileStorage_lazy
+    TestFileStorage_dirty
+    TestFileStorage_batch
+    TestFileStorage_async
+    TestFileStorage_formats
 """
 import os
 import json
 import models
 import unittest
 from datetime import datetime
+from time import sleep
+from unittest.mock import patch
 from models.base_model import BaseModel
 from models.engine.file_storage import FileStorage
 from models.user import User
@@ -18,6 +27,7 @@ from models.place import Place
 from models.city import City
 from models.amenity import Amenity
 from models.review import Review
+from test_models.test_engine import FileStorageMixin
 
 
 class TestFileStorage_instantiation(unittest.TestCase):
@@ -178,5 +188,386 @@ class TestFileStorage_methods(unittest.TestCase):
             models.storage.reload(None)
 
 
+class TestFileStorage_journal(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the journal mode of the FileStorage class."""
+
+    def setUp(self):
+        super().setUp()
+        self.journal_path = self.file_path + ".log"
+        models.storage.configure(journal=True,
+                                 journal_path=self.journal_path,
+                                 compact_every=1000)
+        models.storage.compact()
+
+    def journal_records(self):
+        with open(self.journal_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_save_appends_only_changed_objects(self):
+        user = User()
+        place = Place()
+        models.storage.save()
+        place.name = "Loft"
+        place.save()
+        records = self.journal_records()
+        self.assertEqual(3, len(records))
+        self.assertEqual("Place." + place.id, records[-1]["key"])
+        self.assertEqual("Loft", records[-1]["obj"]["name"])
+
+    def test_delete_appends_del_record(self):
+        city = City()
+        city.save()
+        models.storage.delete(city)
+        models.storage.save()
+        self.assertEqual({"op": "del", "key": "City." + city.id},
+                         self.journal_records()[-1])
+
+    def test_reload_replays_journal(self):
+        state = State()
+        state.save()
+        review = Review()
+        review.text = "Great"
+        review.save()
+        models.storage.delete(state)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objects = models.storage.all()
+        self.assertNotIn("State." + state.id, objects)
+        self.assertEqual("Great", objects["Review." + review.id].text)
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        models.storage.configure(compact_every=3)
+        amenities = [Amenity() for i in range(3)]
+        models.storage.save()
+        self.assertFalse(os.path.exists(self.journal_path))
+        with open(self.file_path) as f:
+            snapshot = json.load(f)
+        for amenity in amenities:
+            self.assertIn("Amenity." + amenity.id, snapshot)
+
+    def test_attribute_change_replayed(self):
+        user = User()
+        models.storage.save()
+        user.email = "a@b.c"
+        models.storage.save()
+        self.assertEqual("a@b.c", self.journal_records()[-1]["obj"]["email"])
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("a@b.c",
+                         models.storage.get("User", user.id).email)
+
+    def test_compaction_follows_snapshot_size(self):
+        models.storage.configure(compact_every=3)
+        amenities = [Amenity() for i in range(5)]
+        models.storage.save()
+        self.assertFalse(os.path.exists(self.journal_path))
+        for amenity in amenities[:4]:
+            amenity.name = "Wifi"
+        models.storage.save()
+        self.assertEqual(4, len(self.journal_records()))
+        amenities[4].name = "Pool"
+        models.storage.save()
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_reload_stops_at_torn_record(self):
+        user = User()
+        models.storage.save()
+        with open(self.journal_path, "a") as f:
+            f.write('{"op": "set", "key": "User.x", "ob')
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("User." + user.id, models.storage.all())
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_configure_unknown_option(self):
+        with self.assertRaises(TypeError):
+            models.storage.configure(no_such_option=True)
+
+
+class TestFileStorage_indexes(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the class and attribute indexes."""
+
+    def test_all_of_and_count(self):
+        users = [User() for i in range(3)]
+        City()
+        self.assertEqual(3, models.storage.count("User"))
+        self.assertEqual(1, models.storage.count("City"))
+        self.assertEqual(0, models.storage.count("Review"))
+        self.assertEqual({"User." + u.id for u in users},
+                         set(models.storage.all_of("User")))
+
+    def test_count_after_delete(self):
+        user = User()
+        models.storage.delete(user)
+        self.assertEqual(0, models.storage.count("User"))
+
+    def test_find_uses_attribute_index(self):
+        city = City()
+        city.state_id = "s1"
+        city.save()
+        City().save()
+        self.assertEqual([city], models.storage.find("City", "state_id",
+                                                     "s1"))
+        self.assertIn(("City", "state_id"),
+                      FileStorage._FileStorage__attr_index)
+
+    def test_find_after_attribute_update(self):
+        user = User()
+        user.email = "a@b.c"
+        user.save()
+        user.email = "x@y.z"
+        user.save()
+        self.assertEqual([], models.storage.find("User", "email", "a@b.c"))
+        self.assertEqual([user], models.storage.find("User", "email",
+                                                     "x@y.z"))
+
+    def test_find_without_index(self):
+        state = State()
+        state.name = "Texas"
+        self.assertEqual([state], models.storage.find("State", "name",
+                                                      "Texas"))
+
+    def test_indexes_follow_replaced_objects(self):
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count("User"))
+
+
+class TestFileStorage_lazy(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the lazy and stream reload modes."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User()
+        self.place = Place()
+        self.place.name = "Cabin"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.configure(lazy=True)
+        models.storage.reload()
+
+    def test_reload_builds_no_instances(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(1, models.storage.count("Place"))
+
+    def test_get_builds_one_instance(self):
+        place = models.storage.get("Place", self.place.id)
+        self.assertEqual("Cabin", place.name)
+        self.assertEqual(["Place." + self.place.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIs(place, models.storage.get("Place", self.place.id))
+
+    def test_get_missing(self):
+        self.assertIsNone(models.storage.get("Place", "nope"))
+
+    def test_all_builds_every_instance(self):
+        objects = models.storage.all()
+        self.assertIn("User." + self.user.id, objects)
+        self.assertEqual(Place, type(objects["Place." + self.place.id]))
+
+    def test_stream_reload(self):
+        FileStorage._FileStorage__raw = {}
+        models.storage.configure(lazy=False, stream=True)
+        models.storage.reload()
+        objects = FileStorage._FileStorage__objects
+        self.assertEqual("Cabin", objects["Place." + self.place.id].name)
+        self.assertEqual(User, type(objects["User." + self.user.id]))
+
+    def test_save_keeps_unbuilt_records(self):
+        models.storage.get("User", self.user.id).save()
+        with open(self.file_path) as f:
+            snapshot = json.load(f)
+        self.assertEqual("Cabin", snapshot["Place." + self.place.id]["name"])
+        self.assertIn("User." + self.user.id, snapshot)
+
+
+class TestFileStorage_dirty(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing that save() only serializes changed objects."""
+
+    def setUp(self):
+        super().setUp()
+        self.users = [User() for i in range(5)]
+        models.storage.save()
+
+    def saved_snapshot(self):
+        with patch.object(BaseModel, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            models.storage.save()
+        with open(FileStorage._FileStorage__file_path) as f:
+            return to_dict.call_count, json.load(f)
+
+    def test_unchanged_objects_are_not_serialized(self):
+        calls, snapshot = self.saved_snapshot()
+        self.assertEqual(0, calls)
+        self.assertEqual(5, len(snapshot))
+
+    def test_only_changed_object_is_serialized(self):
+        self.users[2].first_name = "Betty"
+        calls, snapshot = self.saved_snapshot()
+        self.assertEqual(1, calls)
+        self.assertEqual("Betty",
+                         snapshot["User." + self.users[2].id]["first_name"])
+
+    def test_deleted_object_leaves_snapshot(self):
+        models.storage.delete(self.users[0])
+        calls, snapshot = self.saved_snapshot()
+        self.assertEqual(0, calls)
+        self.assertNotIn("User." + self.users[0].id, snapshot)
+
+    def test_failed_save_keeps_snapshot(self):
+        self.users[0].first_name = "Ann"
+        with patch.object(BaseModel, "to_dict", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                models.storage.save()
+        with open(FileStorage._FileStorage__file_path) as f:
+            self.assertEqual(5, len(json.load(f)))
+        self.assertEqual(["file.json"], os.listdir(self.tmpdir))
+
+    def test_setattr_refreshes_attribute_index(self):
+        self.users[1].email = "b@b.b"
+        self.assertEqual([self.users[1]],
+                         models.storage.find("User", "email", "b@b.b"))
+
+
+class TestFileStorage_batch(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing batched writes of the FileStorage class."""
+
+    def setUp(self):
+        super().setUp()
+        self.writer = patch.object(FileStorage,
+                                   "_FileStorage__write_snapshot")
+        self.write = self.writer.start()
+
+    def tearDown(self):
+        self.writer.stop()
+        super().tearDown()
+
+    def test_batch_writes_once(self):
+        with models.storage.batch():
+            for i in range(50):
+                Place().save()
+            self.assertEqual(0, self.write.call_count)
+        self.assertEqual(1, self.write.call_count)
+        self.assertEqual(50, models.storage.count("Place"))
+
+    def test_nested_batches_write_once(self):
+        with models.storage.batch():
+            with models.storage.batch():
+                User().save()
+            self.assertEqual(0, self.write.call_count)
+            User().save()
+        self.assertEqual(1, self.write.call_count)
+
+    def test_batch_without_save_does_not_write(self):
+        with models.storage.batch():
+            User()
+        self.assertEqual(0, self.write.call_count)
+
+    def test_batch_writes_on_exception(self):
+        with self.assertRaises(KeyError):
+            with models.storage.batch():
+                User().save()
+                raise KeyError
+        self.assertEqual(1, self.write.call_count)
+
+
+class TestFileStorage_async(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the background writer of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.writer = patch.object(FileStorage,
+                                   "_FileStorage__write_snapshot")
+        self.write = self.writer.start()
+        models.storage.configure(async_flush=True, flush_delay=0.05)
+
+    def tearDown(self):
+        models.storage.flush()
+        self.writer.stop()
+        super().tearDown()
+
+    def test_save_does_not_write(self):
+        User().save()
+        self.assertEqual(0, self.write.call_count)
+
+    def test_writer_coalesces_saves(self):
+        for i in range(20):
+            Place().save()
+        sleep(0.3)
+        self.assertEqual(1, self.write.call_count)
+
+    def test_flush_writes_owed_save(self):
+        User().save()
+        models.storage.flush()
+        self.assertEqual(1, self.write.call_count)
+        models.storage.flush()
+        self.assertEqual(1, self.write.call_count)
+
+    def test_flush_raises_writer_error(self):
+        self.write.side_effect = OSError("disk full")
+        User().save()
+        sleep(0.3)
+        with self.assertRaises(OSError):
+            models.storage.flush()
+
+
+class TestFileStorage_formats(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the snapshot formats of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.review = Review()
+        self.review.text = "Spotless"
+
+    def reloaded(self):
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        return models.storage.all()["Review." + self.review.id]
+
+    def test_binary_formats_round_trip(self):
+        for name in ("msgpack", "pickle"):
+            models.storage.configure(format=name)
+            models.storage.save()
+            review = self.reloaded()
+            self.assertEqual("Spotless", review.text)
+            self.assertEqual(self.review.created_at, review.created_at)
+
+    def test_reload_detects_format(self):
+        models.storage.configure(format="msgpack")
+        models.storage.save()
+        models.storage.configure(format="json")
+        self.assertEqual("Spotless", self.reloaded().text)
+        models.storage.save()
+        with open(FileStorage._FileStorage__file_path) as f:
+            self.assertIn("Spotless", json.load(f)["Review." +
+                                                   self.review.id]["text"])
+
+    def test_unknown_format(self):
+        with self.assertRaises(TypeError):
+            models.storage.configure(format="xml")
+
+    def test_epoch_times(self):
+        models.storage.configure(epoch_times=True)
+        models.storage.save()
+        with open(FileStorage._FileStorage__file_path) as f:
+            rec = json.load(f)["Review." + self.review.id]
+        self.assertIsInstance(rec["created_at"], int)
+        review = self.reloaded()
+        self.assertIsInstance(review.__dict__["updated_at"], int)
+        self.assertEqual(self.review.updated_at, review.updated_at)
+        self.assertEqual(self.review.to_dict(), review.to_dict())
+
+    def test_epoch_times_slots_and_pickle(self):
+        models.storage.configure(epoch_times=True, format="pickle",
+                                 slots=True)
+        models.storage.save()
+        review = self.reloaded()
+        self.assertEqual(self.review.created_at, review.created_at)
+        models.storage.configure(epoch_times=False, format="json")
+        models.storage.save()
+        self.assertEqual(self.review.created_at, self.reloaded().created_at)
+
+
 if __name__ == "__main__":
     unittest.main()
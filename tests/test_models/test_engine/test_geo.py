@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/geo.py.
+
+Unittest classes:
+    TestGridIndex
+    TestGeo_storage
+    TestGeo_db
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.geo import GridIndex, haversine, scan_nearest, \
+    scan_radius
+from models.place import Place
+from test_models.test_engine import FileStorageMixin
+
+
+class Point:
+    """An object with coordinates."""
+
+    def __init__(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+
+
+class TestGridIndex(unittest.TestCase):
+    """Unittests for testing the GridIndex class."""
+
+    def setUp(self):
+        rand = random.Random(7)
+        self.points = [Point(rand.uniform(-90, 90), rand.uniform(-180, 180))
+                       for i in range(300)]
+        self.points += [Point(rand.uniform(48.7, 49.0),
+                              rand.uniform(2.2, 2.5)) for i in range(300)]
+        self.points += [Point(rand.uniform(-30, 30), rand.choice(
+            [rand.uniform(178, 180), rand.uniform(-180, -178)]))
+            for i in range(100)]
+        self.points += [Point(89.99, 10), Point(89.95, -170)]
+        self.index = GridIndex(0.5)
+        for i, p in enumerate(self.points):
+            self.index.add(i, p)
+
+    def test_haversine(self):
+        self.assertAlmostEqual(343.5, haversine(48.8566, 2.3522,
+                                                51.5074, -0.1278), 0)
+        self.assertEqual(0, haversine(10, 20, 10, 20))
+
+    def test_radius_matches_scan(self):
+        for lat, lon, km in ((48.85, 2.35, 5), (0, 179.9, 300),
+                             (89.9, 0, 50), (-45, -60, 2000), (10, 10, 0)):
+            self.assertEqual(scan_radius(self.points, lat, lon, km),
+                             self.index.radius(lat, lon, km))
+
+    def test_nearest_matches_scan(self):
+        for lat, lon, k in ((48.85, 2.35, 5), (0, -179.95, 10),
+                            (89.9, 100, 2), (-80, 0, 3), (20, 20, 50)):
+            self.assertEqual(scan_nearest(self.points, lat, lon, k),
+                             self.index.nearest(lat, lon, k))
+
+    def test_nearest_more_than_indexed(self):
+        self.assertEqual(len(self.points),
+                         len(self.index.nearest(0, 0, 10000)))
+        self.assertEqual([], GridIndex().nearest(0, 0, 3))
+
+    def test_bbox(self):
+        def scan(south, west, north, east):
+            return [p for p in self.points
+                    if south <= p.latitude <= north and (
+                        west <= p.longitude <= east if west <= east else
+                        p.longitude >= west or p.longitude <= east)]
+        for box in ((48.8, 2.3, 48.9, 2.4), (-30, 179, 30, -179),
+                    (-90, -180, 90, 180), (0, 0, 0, 0)):
+            self.assertEqual(sorted(map(id, scan(*box))),
+                             sorted(map(id, self.index.bbox(*box))))
+
+    def test_add_and_remove(self):
+        index = GridIndex()
+        p = Point(10, 10)
+        index.add("a", p)
+        p.latitude = 20
+        index.add("a", p)
+        self.assertEqual(1, len(index))
+        self.assertEqual([p], index.radius(20, 10, 1))
+        index.remove("a")
+        index.remove("a")
+        self.assertEqual([], index.radius(20, 10, 1))
+
+    def test_invalid_coordinates(self):
+        index = GridIndex()
+        index.add("a", Point("north", 10))
+        index.add("b", Point(95, 10))
+        index.add("c", Point("12.5", "7"))
+        self.assertEqual(1, len(index))
+
+
+class TestGeo_storage(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the spatial queries of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.paris = Place()
+        self.paris.latitude = 48.8566
+        self.paris.longitude = 2.3522
+        self.london = Place()
+        self.london.latitude = 51.5074
+        self.london.longitude = -0.1278
+        self.tokyo = Place()
+        self.tokyo.latitude = 35.6762
+        self.tokyo.longitude = 139.6503
+
+    def test_near(self):
+        self.assertEqual([self.paris, self.london],
+                         models.storage.near("Place", 49, 2, 400))
+        self.assertEqual([self.paris], Place.near(49, 2, 100))
+
+    def test_in_box(self):
+        self.assertEqual([self.paris], Place.in_box(45, 0, 50, 5))
+        self.assertEqual([], models.storage.in_box("City", 45, 0, 50, 5))
+
+    def test_nearest(self):
+        self.assertEqual([self.tokyo, self.london],
+                         Place.nearest(30, 120, 2))
+        self.assertEqual([self.paris], Place.nearest(48, 3))
+
+    def test_follows_updates(self):
+        self.tokyo.latitude = 48.86
+        self.tokyo.longitude = 2.35
+        self.assertEqual(2, len(Place.near(48.85, 2.35, 5)))
+        models.storage.delete(self.paris)
+        self.assertEqual([self.tokyo], Place.near(48.85, 2.35, 5))
+
+    def test_after_reload(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.configure(lazy=True, columnar=True)
+        models.storage.reload()
+        found = Place.near(49, 2, 400)
+        self.assertEqual([self.paris.id, self.london.id],
+                         [p.id for p in found])
+
+
+class TestGeo_db(unittest.TestCase):
+    """Unittests for testing the spatial queries of DBStorage."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.saved_options = dict(DBStorage._DBStorage__options)
+        self.storage = DBStorage()
+        self.storage.configure(db_path=os.path.join(self.tmpdir, "hbnb.db"))
+        self.storage.reload()
+        self.patcher = patch.object(models, "storage", self.storage)
+        self.patcher.start()
+        self.places = []
+        for lat, lon in ((48.8566, 2.3522), (51.5074, -0.1278),
+                         (-17.7, 178.0), (-18.1, -178.5)):
+            place = Place()
+            place.latitude = lat
+            place.longitude = lon
+            self.places.append(place)
+        self.storage.save()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.close()
+        DBStorage._DBStorage__pending.clear()
+        DBStorage._DBStorage__options = self.saved_options
+        shutil.rmtree(self.tmpdir)
+
+    def test_queries(self):
+        paris, london, fiji, tonga = self.places
+        self.assertEqual([paris, london], Place.near(49, 2, 400))
+        self.assertEqual([paris], Place.in_box(45, 0, 50, 5))
+        self.assertEqual({fiji, tonga}, set(Place.in_box(-20, 170, -15,
+                                                         -170)))
+        self.assertEqual([london], Place.nearest(52, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
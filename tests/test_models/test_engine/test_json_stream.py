@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/json_stream.py.
+
+Unittest classes:
+    TestIterItems
+"""
+import json
+import unittest
+from io import StringIO
+from models.engine.json_stream import iter_items
+
+
+class TestIterItems(unittest.TestCase):
+    """Unittests for testing the incremental JSON object reader."""
+
+    def items(self, text, chunk_size=4):
+        return list(iter_items(StringIO(text), chunk_size))
+
+    def test_empty_object(self):
+        self.assertEqual([], self.items("{}"))
+        self.assertEqual([], self.items("  {\n }  "))
+
+    def test_matches_json_load(self):
+        doc = {
+            "User.1": {"id": "1", "email": "a@b.c", "__class__": "User"},
+            "Place.2": {"id": "2", "amenity_ids": ["x", "y"],
+                        "latitude": 37.77, "name": "Sp{ce}, \"q\""},
+            "n": 12345678
+        }
+        for indent in (None, 4):
+            text = json.dumps(doc, indent=indent)
+            for chunk_size in (1, 3, 7, 1 << 16):
+                self.assertEqual(list(doc.items()),
+                                 self.items(text, chunk_size))
+
+    def test_number_split_across_chunks(self):
+        self.assertEqual([("a", 123456789)],
+                         self.items('{"a": 123456789}', 2))
+
+    def test_yields_before_reading_everything(self):
+        f = StringIO('{"a": 1, "b": 2, ' + '"c": 3' * 1000)
+        it = iter_items(f, 8)
+        self.assertEqual(("a", 1), next(it))
+        self.assertLess(f.tell(), 100)
+
+    def test_invalid_documents(self):
+        for text in ("", "[1, 2]", '{"a" 1}', '{"a": 1', '{"a": 1 "b": 2}',
+                     '{1: 2}', '{"a": tru}'):
+            with self.assertRaises(ValueError):
+                self.items(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
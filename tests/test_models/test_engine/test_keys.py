@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/keys.py.
+
+Unittest classes:
+    TestObjectMap
+    TestObjectMap_storage
+"""
+import json
+import unittest
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.keys import ObjectMap, split_key
+from models.place import Place
+from models.user import User
+from test_models.test_engine import FileStorageMixin
+
+
+class Obj:
+    """An object with an id."""
+
+    def __init__(self, oid):
+        self.id = oid
+
+
+class TestObjectMap(unittest.TestCase):
+    """Unittests for testing the ObjectMap class."""
+
+    def setUp(self):
+        self.a = Obj("".join(["1", "23"]))
+        self.b = Obj("456")
+        self.omap = ObjectMap({"Place.123": self.a, "User.456": self.b})
+
+    def test_split_key(self):
+        self.assertEqual(("Place", "1.2"), split_key("Place.1.2"))
+        self.assertEqual(("Place", ""), split_key("Place"))
+
+    def test_reads_like_a_dict(self):
+        self.assertEqual({"Place.123": self.a, "User.456": self.b},
+                         dict(self.omap))
+        self.assertEqual(2, len(self.omap))
+        self.assertIs(self.a, self.omap["Place.123"])
+        self.assertIn("User.456", self.omap)
+        self.assertNotIn("Place.456", self.omap)
+        self.assertNotIn(456, self.omap)
+        self.assertIsNone(self.omap.get("City.1"))
+        self.assertEqual([self.a, self.b], list(self.omap.values()))
+        self.assertEqual([("Place.123", self.a), ("User.456", self.b)],
+                         list(self.omap.items()))
+        with self.assertRaises(KeyError):
+            self.omap["Place.999"]
+
+    def test_keyed_by_held_id(self):
+        inner = self.omap.classes["Place"]
+        self.assertIs(self.a.id, next(iter(inner)))
+        self.omap["Place.789"] = self.b
+        self.assertIn("789", inner)
+
+    def test_writes(self):
+        self.omap["Place.123"] = self.b
+        self.assertEqual(2, len(self.omap))
+        self.assertIs(self.b, self.omap.pop("Place.123"))
+        self.assertIsNone(self.omap.pop("Place.123", None))
+        with self.assertRaises(KeyError):
+            self.omap.pop("Place.123")
+        del self.omap["User.456"]
+        with self.assertRaises(KeyError):
+            del self.omap["User.456"]
+        self.assertEqual({}, dict(self.omap))
+        self.assertEqual(0, len(self.omap))
+
+    def test_put_class(self):
+        values = {"1": self.a, "2": self.b}
+        self.omap.put_class("Place", values)
+        self.assertEqual(3, len(self.omap))
+        self.assertIs(values, self.omap.classes["Place"])
+        self.omap.put_class("City", {})
+        self.assertEqual(3, len(self.omap))
+        self.assertEqual({"User.456": self.b, "Place.1": self.a,
+                          "Place.2": self.b}, dict(self.omap))
+
+    def test_of_class(self):
+        view = self.omap.of_class("Place")
+        self.assertEqual({"Place.123": self.a}, view)
+        self.omap["Place.789"] = self.b
+        self.assertEqual(2, len(view))
+        self.assertEqual([self.a, self.b], list(view.values()))
+        with self.assertRaises(KeyError):
+            view["User.456"]
+        self.assertEqual({}, self.omap.of_class("City"))
+
+
+class TestObjectMap_storage(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing FileStorage with the compact_keys option."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User()
+        self.place = Place()
+        self.place.user_id = self.user.id
+        self.place.latitude = 48.85
+        self.place.longitude = 2.35
+        models.storage.configure(compact_keys=True)
+
+    def test_objects_converted(self):
+        objects = models.storage.all()
+        self.assertIsInstance(objects, ObjectMap)
+        self.assertIs(self.place, objects["Place." + self.place.id])
+        self.assertEqual(2, len(objects))
+        models.storage.configure(compact_keys=False)
+        self.assertEqual(dict, type(models.storage.all()))
+        self.assertIn("User." + self.user.id, models.storage.all())
+
+    def test_lookups(self):
+        self.assertIs(self.place, models.storage.get("Place", self.place.id))
+        self.assertEqual({"Place." + self.place.id: self.place},
+                         models.storage.all_of("Place"))
+        self.assertEqual(1, models.storage.count("User"))
+        self.assertEqual([self.place], self.user.places)
+        self.assertEqual([self.place], Place.near(48.85, 2.35, 1))
+        place = Place()
+        place.user_id = self.user.id
+        self.assertEqual(2, len(self.user.places))
+        models.storage.delete(self.place)
+        self.assertEqual([place], self.user.places)
+        self.assertEqual([], Place.near(48.85, 2.35, 1))
+        self.assertEqual(1, models.storage.count("Place"))
+
+    def test_save_and_reload(self):
+        models.storage.save()
+        with open(FileStorage._FileStorage__file_path) as f:
+            self.assertIn("Place." + self.place.id, json.load(f))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objects = models.storage.all()
+        self.assertIsInstance(objects, ObjectMap)
+        place = objects["Place." + self.place.id]
+        self.assertEqual(self.user.id, place.user_id)
+        place.name = "Loft"
+        models.storage.save()
+        with open(FileStorage._FileStorage__file_path) as f:
+            snapshot = json.load(f)
+        self.assertEqual("Loft", snapshot["Place." + self.place.id]["name"])
+        self.assertIn("User." + self.user.id, snapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/query.py.
+
+Unittest classes:
+    TestQuery
+    TestQuery_db
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query
+from models.place import Place
+from test_models.test_engine import FileStorageMixin
+
+
+class TestQuery(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing queries over FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.storage = models.storage
+        self.places = []
+        for i, (city, price) in enumerate((("a", 50), ("b", 80), ("a", 120),
+                                           ("c", 200), ("a", 90))):
+            place = Place()
+            place.name = "p{}".format(i)
+            place.city_id = city
+            place.price_by_night = price
+            self.places.append(place)
+
+    def names(self, query):
+        return [p.name for p in query]
+
+    def test_query_is_lazy(self):
+        query = self.storage.query("Place")
+        self.assertIsInstance(query, Query)
+        with patch.object(self.storage, "all_of") as all_of:
+            query.where(name="p1").limit(2)
+            all_of.assert_not_called()
+
+    def test_where_equal(self):
+        self.assertEqual(["p0", "p2", "p4"], sorted(self.names(
+            self.storage.query("Place").where(city_id="a"))))
+        self.assertEqual(["p3"], self.names(
+            self.storage.query("Place").where(name="p3")))
+
+    def test_where_range(self):
+        self.assertEqual(["p1", "p4"], sorted(self.names(
+            self.storage.query("Place").where(price_by_night=(60, 100)))))
+
+    def test_where_in(self):
+        self.assertEqual(["p1", "p3"], sorted(self.names(
+            self.storage.query("Place").where(city_id={"b", "c"}))))
+        self.assertEqual(["p0", "p3"], sorted(self.names(
+            self.storage.query("Place").where(name={"p0", "p3"}))))
+
+    def test_where_combined(self):
+        self.assertEqual(["p2", "p4"], sorted(self.names(
+            self.storage.query("Place").where(city_id="a").where(
+                price_by_night=(85, None)))))
+
+    def test_index_used(self):
+        with patch.object(self.storage, "all_of") as all_of:
+            self.assertEqual(3, self.storage.query("Place").where(
+                city_id="a").count())
+            all_of.assert_not_called()
+
+    def test_order_by(self):
+        query = self.storage.query("Place")
+        self.assertEqual(["p0", "p1", "p4", "p2", "p3"], self.names(
+            query.order_by("price_by_night")))
+        self.assertEqual(["p3", "p2", "p4", "p1", "p0"], self.names(
+            query.order_by("-price_by_night")))
+        self.assertEqual(["p2", "p4", "p0", "p1", "p3"], self.names(
+            query.order_by("city_id", "-price_by_night")))
+
+    def test_order_by_missing_last(self):
+        self.places[2].rating = 3
+        self.places[0].rating = 5
+        self.assertEqual(["p2", "p0"], self.names(
+            self.storage.query("Place").order_by("rating").limit(2)))
+        self.assertEqual(["p0", "p2"], self.names(
+            self.storage.query("Place").order_by("-rating").limit(2)))
+
+    def test_order_by_mixed_types(self):
+        self.places[1].rating = "good"
+        self.places[2].rating = 3.5
+        self.places[0].rating = 5
+        self.assertEqual(["p2", "p0", "p1", "p3", "p4"], self.names(
+            self.storage.query("Place").order_by("rating")))
+        self.assertEqual(["p1", "p0", "p2"], self.names(
+            self.storage.query("Place").order_by("-rating").limit(3)))
+
+    def test_limit_offset(self):
+        query = self.storage.query("Place").order_by("price_by_night")
+        self.assertEqual(["p0", "p1"], self.names(query.limit(2)))
+        self.assertEqual(["p4", "p2"], self.names(query.offset(2).limit(2)))
+        self.assertEqual(["p4"], self.names(query.limit(3).offset(2)))
+        self.assertEqual("p3", query.offset(4).first().name)
+        self.assertIsNone(query.offset(5).first())
+
+    def test_pages(self):
+        pages = list(self.storage.query("Place").order_by("name").pages(2))
+        self.assertEqual([["p0", "p1"], ["p2", "p3"], ["p4"]],
+                         [[p.name for p in page] for page in pages])
+
+    def test_columnar_filter(self):
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.configure(columnar=True)
+        self.storage.reload()
+        self.assertEqual(["p3", "p2"], self.names(
+            self.storage.query("Place").where(price_by_night=(100, None))
+            .order_by("-price_by_night")))
+
+
+class TestQuery_db(unittest.TestCase):
+    """Unittests for testing queries over DBStorage."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.saved_options = dict(DBStorage._DBStorage__options)
+        self.storage = DBStorage()
+        self.storage.configure(db_path=os.path.join(self.tmpdir, "hbnb.db"))
+        self.storage.reload()
+        self.patcher = patch.object(models, "storage", self.storage)
+        self.patcher.start()
+        for i, (city, price) in enumerate((("a", 50), ("b", 80), ("a", 120))):
+            place = Place()
+            place.name = "p{}".format(i)
+            place.city_id = city
+            place.price_by_night = price
+        self.storage.save()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.close()
+        DBStorage._DBStorage__pending.clear()
+        DBStorage._DBStorage__options = self.saved_options
+        shutil.rmtree(self.tmpdir)
+
+    def test_filter(self):
+        self.assertEqual(["p1", "p2"], sorted(
+            p.name for p in self.storage.filter(
+                "Place", price_by_night=(60, None))))
+
+    def test_query(self):
+        query = self.storage.query("Place").where(
+            city_id="a", price_by_night=(None, 100))
+        self.assertEqual(["p0"], [p.name for p in query])
+        self.assertEqual(["p2", "p1"], [p.name for p in self.storage.query(
+            "Place").order_by("-price_by_night").limit(2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/registry.py.
+
+Unittest classes:
+    TestRegistry
+"""
+import json
+import os
+import unittest
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.registry import create_storage, parse
+from models.user import User
+from test_models.test_engine import FileStorageMixin
+
+
+class TestRegistry(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the storage engine selection."""
+
+    def setUp(self):
+        super().setUp()
+        self.saved_db = dict(DBStorage._DBStorage__options)
+
+    def tearDown(self):
+        DBStorage._DBStorage__options = self.saved_db
+        super().tearDown()
+
+    def test_default_engine(self):
+        storage = create_storage({})
+        self.assertEqual(FileStorage, type(storage))
+        self.assertFalse(storage.options()["journal"])
+        self.assertTrue(storage.options()["persist"])
+
+    def test_engine_names(self):
+        self.assertTrue(create_storage(
+            {"HBNB_STORAGE": "journal"}).options()["journal"])
+        self.assertEqual(DBStorage, type(create_storage(
+            {"HBNB_STORAGE": "sqlite"})))
+        self.assertFalse(create_storage(
+            {"HBNB_STORAGE": "memory"}).options()["persist"])
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            create_storage({"HBNB_STORAGE": "mongo"})
+
+    def test_unknown_option(self):
+        with self.assertRaises(TypeError):
+            create_storage({"HBNB_STORAGE_NO_SUCH_KNOB": "1"})
+
+    def test_env_options_are_typed(self):
+        options = create_storage({
+            "HBNB_STORAGE_LAZY": "yes",
+            "HBNB_STORAGE_COMPACT_EVERY": "50",
+            "HBNB_STORAGE_FLUSH_DELAY": "0.25",
+            "HBNB_STORAGE_FORMAT": "pickle",
+            "HBNB_STORAGE_FILE_PATH": "data.bin"
+        }).options()
+        self.assertIs(True, options["lazy"])
+        self.assertEqual(50, options["compact_every"])
+        self.assertEqual(0.25, options["flush_delay"])
+        self.assertEqual("pickle", options["format"])
+        self.assertEqual("data.bin", options["file_path"])
+
+    def test_config_file_then_env(self):
+        config = os.path.join(self.tmpdir, "storage.json")
+        with open(config, "w") as f:
+            json.dump({"engine": "sqlite", "db_path": "a.db"}, f)
+        storage = create_storage({"HBNB_STORAGE_CONFIG": config})
+        self.assertEqual("a.db", storage.options()["db_path"])
+        storage = create_storage({"HBNB_STORAGE_CONFIG": config,
+                                  "HBNB_STORAGE_DB_PATH": "b.db"})
+        self.assertEqual("b.db", storage.options()["db_path"])
+
+    def test_memory_engine_skips_disk(self):
+        path = os.path.join(self.tmpdir, "file.json")
+        storage = create_storage({"HBNB_STORAGE": "memory",
+                                  "HBNB_STORAGE_FILE_PATH": path})
+        User()
+        storage.save()
+        storage.reload()
+        self.assertEqual([], os.listdir(self.tmpdir))
+
+    def test_parse(self):
+        self.assertIs(False, parse("off", True))
+        self.assertEqual({"User": ["email"]}, parse('{"User": ["email"]}',
+                                                    {}))
+        with self.assertRaises(ValueError):
+            parse("maybe", True)
+        with self.assertRaises(ValueError):
+            parse("ten", 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/serializers.py.
+
+Unittest classes:
+    TestMsgpack
+    TestSerializers
+"""
+import unittest
+from datetime import datetime, timezone
+from io import BytesIO, StringIO
+from models.engine.serializers import detect, packb, serializers, unpackb
+from models.place import Place
+
+
+class TestMsgpack(unittest.TestCase):
+    """Unittests for testing the MessagePack codec."""
+
+    def test_round_trip(self):
+        values = [None, True, False, 0, 127, 128, 65536, 2 ** 40, 2 ** 64 - 1,
+                  -1, -32, -33, -40000, -2 ** 40, 1.5, "", "a" * 31,
+                  "é" * 200, "x" * 70000, b"\x00" * 300, [], list(range(20)),
+                  {}, {"k{}".format(i): i for i in range(20)},
+                  {"nested": [{"a": [1, 2.5, None]}]},
+                  datetime(2023, 12, 10, 12, 5, 50, 643324), datetime.min]
+        for value in values:
+            self.assertEqual(value, unpackb(packb(value)))
+
+    def test_known_encodings(self):
+        self.assertEqual(b"\x93\x01\xa1a\xc0", packb([1, "a", None]))
+        self.assertEqual(b"\x81\xa1k\xff", packb({"k": -1}))
+
+    def test_datetime_is_native(self):
+        dt = datetime(2024, 2, 29, 23, 59, 59, 999999)
+        decoded = unpackb(packb({"created_at": dt}))["created_at"]
+        self.assertEqual(datetime, type(decoded))
+        self.assertEqual(dt, decoded)
+
+    def test_unsupported_values(self):
+        for value in (object(), 2 ** 64, datetime.now(timezone.utc)):
+            with self.assertRaises((TypeError, OverflowError)):
+                packb(value)
+
+    def test_invalid_data(self):
+        for data in (b"\x92\x01", b"\xc1", b"\x01\x02"):
+            with self.assertRaises(ValueError):
+                unpackb(data)
+
+
+class TestSerializers(unittest.TestCase):
+    """Unittests for testing the snapshot formats."""
+
+    def setUp(self):
+        self.place = Place()
+        self.place.name = "Loft"
+        self.place.amenity_ids = ["a1", "a2"]
+
+    def snapshot(self, serializer):
+        key = "Place." + self.place.id
+        rec = serializer.record(self.place)
+        f = StringIO() if not serializer.binary else BytesIO()
+        serializer.write(f, [serializer.encode(key, rec)] * 2)
+        f.seek(0)
+        return f
+
+    def test_round_trip(self):
+        for name, serializer in serializers.items():
+            items = list(serializer.load(self.snapshot(serializer)))
+            self.assertEqual(1 if name == "json" else 2, len(items))
+            key, rec = items[0]
+            self.assertEqual("Place." + self.place.id, key)
+            self.assertEqual("Loft", rec["name"])
+            self.assertEqual("Place", rec["__class__"])
+            self.assertEqual(Place(**rec).to_dict(), self.place.to_dict())
+
+    def test_binary_formats_keep_datetimes(self):
+        for name in ("msgpack", "pickle"):
+            serializer = serializers[name]
+            key, rec = next(serializer.load(self.snapshot(serializer)))
+            self.assertEqual(self.place.created_at, rec["created_at"])
+
+    def test_json_encodes_native_records(self):
+        serializer = serializers["json"]
+        fragment = serializer.encode("k", {"at": datetime(2020, 1, 2)})
+        self.assertEqual('"k": {"at": "2020-01-02T00:00:00"}', fragment)
+
+    def test_detect(self):
+        for serializer in serializers.values():
+            f = self.snapshot(serializer)
+            if not serializer.binary:
+                f = BytesIO(f.getvalue().encode())
+            self.assertIs(serializer, detect(f))
+            self.assertEqual(0, f.tell())
+
+    def test_truncated_frame(self):
+        serializer = serializers["msgpack"]
+        data = self.snapshot(serializer).getvalue()
+        with self.assertRaises(ValueError):
+            list(serializer.load(BytesIO(data[:-3])))
+
+
+if __name__ == "__main__":
+    unittest.main()
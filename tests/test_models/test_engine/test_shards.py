@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/shards.py.
+
+Unittest classes:
+    TestShards
+    TestShards_storage
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import models
+from models.engine import shards
+from models.engine.atomic_file import atomic_write
+from models.engine.file_storage import FileStorage
+from models.engine.shards import group, list_shards, read_shard, read_shards, \
+    shard_dir, shard_name, shard_of, shard_path
+from models.place import Place
+from models.state import State
+from models.user import User
+from test_models.test_engine import FileStorageMixin
+
+
+ROOT = os.path.dirname(os.path.dirname(models.__file__))
+IMPORT = """
+import sys
+forks = []
+
+
+def audit(event, args):
+    if event == "os.fork":
+        forks.append(args)
+
+
+sys.addaudithook(audit)
+import models
+print(len(models.storage.all()), len(forks))
+"""
+
+
+class TestShards(unittest.TestCase):
+    """Unittests for testing the shard helpers."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmpdir, "file.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_shard_of(self):
+        self.assertEqual("User", shard_of("User.1234", "class"))
+        bucket = shard_of("User.1234", 8)
+        self.assertIn(bucket, ["{}-of-8".format(i) for i in range(8)])
+        self.assertEqual(bucket, shard_of("User.1234", "8"))
+        self.assertEqual("User",
+                         shard_name(shard_path(self.file_path, "User")))
+
+    def test_group(self):
+        pairs = [("User.1", 1), ("City.2", 2), ("User.3", 3)]
+        self.assertEqual({"User": {"User.1": 1, "User.3": 3},
+                          "City": {"City.2": 2}}, group(pairs, "class"))
+        for shard, values in group(pairs, 4).items():
+            for key in values:
+                self.assertEqual(shard, shard_of(key, 4))
+
+    def test_list_shards(self):
+        self.assertIsNone(list_shards(self.file_path))
+        os.makedirs(shard_dir(self.file_path))
+        self.assertEqual([], list_shards(self.file_path))
+        for name in ("User", "City"):
+            with open(shard_path(self.file_path, name), "w") as f:
+                f.write("{}")
+        with open(os.path.join(shard_dir(self.file_path), "User.shard.tmp"),
+                  "w") as f:
+            f.write("{}")
+        self.assertEqual([shard_path(self.file_path, "City"),
+                          shard_path(self.file_path, "User")],
+                         list_shards(self.file_path))
+
+    def test_read_shard(self):
+        path = shard_path(self.file_path, "User")
+        os.makedirs(shard_dir(self.file_path))
+        with open(path, "w") as f:
+            f.write('{"User.1": {"__class__": "User", "id": "1", '
+                    '"created_at": "2017-09-28T21:05:54.119427"}}')
+        pairs = read_shard(path)
+        self.assertEqual([("User.1", {
+            "__class__": "User", "id": "1",
+            "created_at": datetime(2017, 9, 28, 21, 5, 54, 119427)})],
+            pairs)
+        self.assertEqual(pairs, list(read_shards([path, path], 1))[:1])
+        self.assertEqual(pairs * 3, list(read_shards([path] * 3, 2)))
+        with self.assertRaises(FileNotFoundError):
+            list(read_shards([path, path + ".gone"], 2))
+
+
+class TestShards_storage(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the sharded snapshots of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        models.storage.configure(
+            shards="class",
+            text_index_path=os.path.join(self.tmpdir, "file.json.idx"))
+        self.write = patch("models.engine.file_storage.atomic_write",
+                           wraps=atomic_write).start()
+        self.addCleanup(patch.stopall)
+        self.user = User()
+        self.user.email = "a@b.c"
+        self.state = State()
+        self.places = [Place() for i in range(3)]
+
+    def written(self):
+        names = sorted(os.path.basename(call.args[0])
+                       for call in self.write.call_args_list)
+        self.write.reset_mock()
+        return names
+
+    def reloaded(self):
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        return models.storage.all()
+
+    def test_bad_layout(self):
+        with self.assertRaises(TypeError):
+            models.storage.configure(shards="city")
+        with self.assertRaises(TypeError):
+            models.storage.configure(shards=0.5)
+
+    def test_save_per_class(self):
+        models.storage.save()
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual([shard_path(self.file_path, name)
+                          for name in ("Place", "State", "User")],
+                         list_shards(self.file_path))
+
+    def test_reload(self):
+        models.storage.save()
+        objects = self.reloaded()
+        self.assertEqual(5, len(objects))
+        user = objects["User." + self.user.id]
+        self.assertEqual("a@b.c", user.email)
+        self.assertEqual(self.user.created_at, user.created_at)
+
+    def test_reload_workers(self):
+        models.storage.configure(reload_workers=2)
+        models.storage.save()
+        with patch.object(shards, "read_forked",
+                          wraps=shards.read_forked) as forked:
+            objects = self.reloaded()
+            forked.assert_called_once()
+            self.assertEqual(2, forked.call_args.args[1])
+        self.assertEqual(5, len(objects))
+        self.assertEqual(self.state.to_dict(),
+                         objects["State." + self.state.id].to_dict())
+
+    def test_import_with_workers(self):
+        models.storage.save()
+        env = dict(os.environ,
+                   HBNB_STORAGE="file",
+                   HBNB_STORAGE_FILE_PATH=self.file_path,
+                   HBNB_STORAGE_TEXT_INDEX_PATH=self.file_path + ".idx",
+                   HBNB_STORAGE_SHARDS="class",
+                   HBNB_STORAGE_RELOAD_WORKERS="2")
+        done = subprocess.run([sys.executable, "-c", IMPORT], env=env,
+                              cwd=ROOT, capture_output=True, text=True,
+                              timeout=60)
+        self.assertEqual("5 2\n", done.stdout, done.stderr)
+
+    def test_hash_buckets(self):
+        models.storage.configure(shards=4)
+        models.storage.save()
+        self.assertLessEqual(len(list_shards(self.file_path)), 4)
+        self.assertEqual(sorted(models.storage.all()),
+                         sorted(self.reloaded()))
+
+    def test_removed_class(self):
+        models.storage.save()
+        models.storage.delete(self.state)
+        models.storage.save()
+        self.assertFalse(os.path.exists(shard_path(self.file_path, "State")))
+        self.assertEqual(4, len(self.reloaded()))
+
+    def test_hash_bucket_count(self):
+        models.storage.configure(shards=4)
+        models.storage.save()
+        models.storage.configure(shards=2)
+        models.storage.save()
+        names = [shard_name(path) for path in list_shards(self.file_path)]
+        self.assertTrue(all(name.endswith("-of-2") for name in names))
+        self.assertEqual(5, len(self.reloaded()))
+
+    def test_dirty_shards_only(self):
+        models.storage.save()
+        self.written()
+        self.places[0].name = "Loft"
+        User().save()
+        self.assertEqual(["Place.shard", "User.shard"], self.written())
+        models.storage.save()
+        self.assertEqual([], self.written())
+        models.storage.delete(self.state)
+        models.storage.save()
+        self.assertEqual([], self.written())
+        self.assertFalse(os.path.exists(shard_path(self.file_path, "State")))
+        objects = self.reloaded()
+        self.assertEqual(5, len(objects))
+        self.assertEqual("Loft",
+                         objects["Place." + self.places[0].id].name)
+
+    def test_dirty_after_reload(self):
+        models.storage.save()
+        objects = self.reloaded()
+        self.written()
+        objects["State." + self.state.id].name = "California"
+        models.storage.save()
+        self.assertEqual(["State.shard"], self.written())
+        objects = self.reloaded()
+        self.assertEqual("California",
+                         objects["State." + self.state.id].name)
+        self.assertEqual(5, len(objects))
+
+    def test_dirty_hash_buckets(self):
+        models.storage.configure(shards=4)
+        models.storage.save()
+        self.written()
+        self.user.email = "d@e.f"
+        models.storage.save()
+        self.assertEqual([shard_of("User." + self.user.id, 4) + ".shard"],
+                         self.written())
+        self.assertEqual("d@e.f",
+                         self.reloaded()["User." + self.user.id].email)
+
+    def test_lazy_class_reads(self):
+        models.storage.save()
+        models.storage.configure(lazy=True)
+        FileStorage._FileStorage__objects = {}
+        with patch("models.engine.file_storage.read_shard",
+                   wraps=read_shard) as read:
+            models.storage.reload()
+            read.assert_not_called()
+            user = models.storage.get("User", self.user.id)
+            self.assertEqual("a@b.c", user.email)
+            self.assertEqual(3, models.storage.count("Place"))
+            self.assertEqual([shard_path(self.file_path, "User"),
+                              shard_path(self.file_path, "Place")],
+                             [call.args[0] for call in read.call_args_list])
+
+    def test_lazy_save_unread(self):
+        models.storage.save()
+        models.storage.configure(lazy=True)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        place = Place()
+        models.storage.delete(models.storage.get("User", self.user.id))
+        models.storage.save()
+        self.assertEqual([shard_path(self.file_path, name)
+                          for name in ("Place", "State")],
+                         list_shards(self.file_path))
+        objects = self.reloaded()
+        self.assertEqual(5, len(objects))
+        self.assertIn("Place." + place.id, objects)
+
+    def test_migrate(self):
+        models.storage.configure(shards="")
+        models.storage.save()
+        models.storage.configure(shards="class")
+        self.assertEqual(5, len(self.reloaded()))
+        models.storage.save()
+        self.assertEqual(3, len(list_shards(self.file_path)))
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual(5, len(self.reloaded()))
+        models.storage.configure(shards="")
+        models.storage.save()
+        self.assertIsNone(list_shards(self.file_path))
+        self.assertEqual(5, len(self.reloaded()))
+
+    def test_text_index(self):
+        self.places[0].name = "Cozy loft"
+        models.storage.search("loft")
+        models.storage.save()
+        self.reloaded()
+        with patch("models.engine.file_storage.TextIndex.add") as add:
+            self.assertEqual([self.places[0].id],
+                             [p.id for p in models.storage.search("loft")])
+            add.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/text_index.py.
+
+Unittest classes:
+    TestTextIndex
+    TestTextIndex_storage
+    TestTextIndex_db
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.db_storage import DBStorage
+from models.engine.atomic_file import atomic_write
+from models.engine.file_storage import FileStorage
+from models.engine.text_index import TextIndex, tokenize
+from models.place import Place
+from models.review import Review
+from test_models.test_engine import FileStorageMixin
+
+
+class TestTextIndex(unittest.TestCase):
+    """Unittests for testing the TextIndex class."""
+
+    def setUp(self):
+        self.index = TextIndex()
+        self.index.add("a", ["Cozy loft", "A cozy loft near the river"])
+        self.index.add("b", ["Beach house", "Sunny house by the beach"])
+        self.index.add("c", ["Loft", "Industrial loft, downtown"])
+
+    def keys(self, query, prefix=True):
+        return [key for score, key in self.index.search(query, prefix)]
+
+    def test_tokenize(self):
+        self.assertEqual(["cafe", "creme", "42"],
+                         tokenize("Café Crème, 42!"))
+        self.assertEqual([], tokenize(None))
+        self.assertEqual([], tokenize(12))
+
+    def test_ranking(self):
+        self.assertEqual(["c", "a"], self.keys("loft"))
+        self.assertEqual(["a"], self.keys("cozy LOFT"))
+
+    def test_and_semantics(self):
+        self.assertEqual([], self.keys("loft beach"))
+        self.assertEqual([], self.keys("castle"))
+        self.assertEqual([], self.keys("   "))
+
+    def test_prefix(self):
+        self.assertEqual(["b"], self.keys("bea"))
+        self.assertEqual([], self.keys("bea", prefix=False))
+        self.index.add("d", ["Bea's bed"])
+        self.assertEqual(["d", "b"], self.keys("bea"))
+
+    def test_add_replaces_and_remove(self):
+        self.index.add("b", ["Mountain cabin"])
+        self.assertEqual([], self.keys("beach"))
+        self.assertEqual(["b"], self.keys("cabin"))
+        self.index.remove("b")
+        self.index.remove("b")
+        self.assertEqual([], self.keys("cabin"))
+        self.assertEqual(2, len(self.index))
+        self.assertNotIn("cabin", self.index.postings)
+
+    def test_records(self):
+        copy = TextIndex.from_records(
+            json.loads(json.dumps(self.index.records())))
+        self.assertEqual(self.index.search("loft"), copy.search("loft"))
+        self.assertEqual(self.index.total, copy.total)
+
+
+class TestTextIndex_storage(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the full-text search of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.idx = os.path.join(self.tmpdir, "file.json.idx")
+        models.storage.configure(text_index_path=self.idx)
+        self.loft = Place()
+        self.loft.name = "Cozy loft"
+        self.loft.description = "Quiet loft near the river"
+        self.house = Place()
+        self.house.name = "Beach house"
+        self.review = Review()
+        self.review.text = "Great loft, great host"
+
+    def test_search(self):
+        self.assertEqual([self.loft, self.review],
+                         models.storage.search("loft"))
+        self.assertEqual([self.loft], models.storage.search("loft", "Place"))
+        self.assertEqual([self.loft], models.storage.search("loft", limit=1))
+        self.assertEqual([self.house], models.storage.search("bea"))
+        self.assertEqual([], models.storage.search("bea", prefix=False))
+
+    def test_follows_updates(self):
+        models.storage.search("loft")
+        self.house.description = "A loft by the sea"
+        self.assertIn(self.house, models.storage.search("loft"))
+        models.storage.delete(self.loft)
+        self.assertNotIn(self.loft, models.storage.search("loft"))
+        place = Place()
+        place.name = "Sea view"
+        self.assertEqual([place], models.storage.search("view"))
+
+    def test_saved_with_snapshot(self):
+        models.storage.search("loft")
+        models.storage.save()
+        self.assertTrue(os.path.exists(self.idx))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with patch.object(TextIndex, "add") as add:
+            found = models.storage.search("loft")
+            add.assert_not_called()
+        self.assertEqual([self.loft.id, self.review.id],
+                         [obj.id for obj in found])
+
+    def test_written_when_changed(self):
+        models.storage.search("loft")
+        models.storage.save()
+        with patch("models.engine.file_storage.atomic_write",
+                   wraps=atomic_write) as write:
+            self.house.price_by_night = 120
+            models.storage.save()
+            self.assertEqual([self.idx + ".stamp"],
+                             [call.args[0] for call in write.call_args_list
+                              if call.args[0].startswith(self.idx)])
+            write.reset_mock()
+            self.house.name = "Beach loft"
+            models.storage.save()
+            self.assertEqual([self.idx, self.idx + ".stamp"],
+                             [call.args[0] for call in write.call_args_list
+                              if call.args[0].startswith(self.idx)])
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with patch.object(TextIndex, "add") as add:
+            found = models.storage.search("loft")
+            add.assert_not_called()
+        self.assertEqual(3, len(found))
+
+    def test_default_path(self):
+        models.storage.configure(text_index_path="")
+        models.storage.search("loft")
+        models.storage.save()
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir,
+                                                    "file.json.idx")))
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir,
+                                                    "file.json.idx.stamp")))
+
+    def test_stale_index_ignored(self):
+        models.storage.search("loft")
+        models.storage.save()
+        with open(self.idx + ".stamp") as f:
+            data = json.load(f)
+        data["stamp"][1] += 1
+        with open(self.idx + ".stamp", "w") as f:
+            json.dump(data, f)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual([self.loft.id, self.review.id],
+                         [obj.id for obj in models.storage.search("loft")])
+
+    def test_lazy_reload(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.configure(lazy=True, slots=True)
+        models.storage.reload()
+        self.assertEqual([self.house.id],
+                         [obj.id for obj in models.storage.search("beach")])
+
+
+class TestTextIndex_db(unittest.TestCase):
+    """Unittests for testing the full-text search of DBStorage."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.saved_options = dict(DBStorage._DBStorage__options)
+        self.storage = DBStorage()
+        self.storage.configure(db_path=os.path.join(self.tmpdir, "hbnb.db"))
+        self.storage.reload()
+        self.patcher = patch.object(models, "storage", self.storage)
+        self.patcher.start()
+        self.loft = Place()
+        self.loft.name = "Cozy loft"
+        self.review = Review()
+        self.review.text = "Loft with a view"
+        self.storage.save()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.close()
+        DBStorage._DBStorage__pending.clear()
+        DBStorage._DBStorage__options = self.saved_options
+        shutil.rmtree(self.tmpdir)
+
+    def test_search(self):
+        self.assertEqual({self.loft, self.review},
+                         set(self.storage.search("loft")))
+        self.assertEqual([self.review], self.storage.search("vie", "Review"))
+
+    def test_index_kept(self):
+        self.storage.search("loft")
+        with patch.object(self.storage, "all_of") as all_of:
+            place = Place()
+            place.name = "Loft by the sea"
+            self.assertIn(place, self.storage.search("loft"))
+            self.review.text = "Quiet"
+            self.assertEqual({self.loft, place},
+                             set(self.storage.search("loft")))
+            self.storage.delete(self.loft)
+            self.assertEqual([place], self.storage.search("loft"))
+            all_of.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""Defines unittests for the relationship accessors of the models.
+
+Unittest classes:
+    TestRelationships
+    TestRelationships_db
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from test_models.test_engine import FileStorageMixin
+
+
+def build_graph(test):
+    """Create two states, three cities, places, reviews and amenities."""
+    test.state, test.other = State(), State()
+    test.city1, test.city2, test.city3 = City(), City(), City()
+    test.city1.state_id = test.state.id
+    test.city2.state_id = test.state.id
+    test.city3.state_id = test.other.id
+    test.user = User()
+    test.wifi, test.pool = Amenity(), Amenity()
+    test.place1, test.place2 = Place(), Place()
+    for place in (test.place1, test.place2):
+        place.city_id = test.city1.id
+        place.user_id = test.user.id
+    test.place1.amenity_ids = [test.wifi.id, "gone", test.pool.id]
+    test.review = Review()
+    test.review.place_id = test.place1.id
+    test.review.user_id = test.user.id
+
+
+def ids(objs):
+    """Return the sorted ids of some objects."""
+    return sorted(obj.id for obj in objs)
+
+
+class TestRelationships(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the relationship accessors on FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        build_graph(self)
+
+    def test_accessors(self):
+        self.assertEqual(ids([self.city1, self.city2]), ids(self.state.cities))
+        self.assertEqual(ids([self.city3]), ids(self.other.cities))
+        self.assertEqual(ids([self.place1, self.place2]),
+                         ids(self.city1.places))
+        self.assertEqual([], self.city2.places)
+        self.assertEqual([self.review], self.place1.reviews)
+        self.assertEqual(ids([self.place1, self.place2]),
+                         ids(self.user.places))
+        self.assertEqual([self.review], self.user.reviews)
+        self.assertEqual([self.wifi, self.pool], self.place1.amenities)
+        self.assertEqual([], self.place2.amenities)
+
+    def test_accessors_not_attributes(self):
+        self.assertNotIn("cities", self.state.to_dict())
+        self.assertNotIn("reviews", self.place1.to_dict())
+
+    def test_follow_updates(self):
+        self.place2.city_id = self.city2.id
+        self.assertEqual([self.place1], self.city1.places)
+        self.assertEqual([self.place2], self.city2.places)
+        models.storage.delete(self.review)
+        self.assertEqual([], self.place1.reviews)
+        models.storage.delete(self.wifi)
+        self.assertEqual([self.pool], self.place1.amenities)
+
+    def test_index_used(self):
+        with patch.object(models.storage, "all_of") as all_of:
+            self.assertEqual(2, len(self.state.cities))
+            self.assertEqual(1, len(self.user.reviews))
+            all_of.assert_not_called()
+
+    def test_lazy_reload(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.configure(lazy=True, slots=True)
+        models.storage.reload()
+        state = models.storage.get("State", self.state.id)
+        self.assertEqual(ids([self.city1, self.city2]), ids(state.cities))
+        city = models.storage.get("City", self.city1.id)
+        self.assertEqual(2, len(city.places))
+        place = models.storage.get("Place", self.place1.id)
+        self.assertEqual([self.review.id], [r.id for r in place.reviews])
+        self.assertEqual([self.wifi.id, self.pool.id],
+                         [a.id for a in place.amenities])
+
+
+class TestRelationships_db(unittest.TestCase):
+    """Unittests for testing the relationship accessors on DBStorage."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.saved_options = dict(DBStorage._DBStorage__options)
+        self.storage = DBStorage()
+        self.storage.configure(db_path=os.path.join(self.tmpdir, "hbnb.db"))
+        self.storage.reload()
+        self.patcher = patch.object(models, "storage", self.storage)
+        self.patcher.start()
+        build_graph(self)
+        self.storage.save()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.close()
+        DBStorage._DBStorage__pending.clear()
+        DBStorage._DBStorage__options = self.saved_options
+        shutil.rmtree(self.tmpdir)
+
+    def test_accessors(self):
+        self.assertEqual(ids([self.city1, self.city2]), ids(self.state.cities))
+        self.assertEqual(ids([self.place1, self.place2]),
+                         ids(self.user.places))
+        self.assertEqual([self.review], self.place1.reviews)
+        self.assertEqual([self.wifi, self.pool], self.place1.amenities)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""Defines unittests for models/slotted.py.
+
+Unittest classes:
+    TestSlotted
+    TestSlotted_storage
+"""
+import unittest
+from datetime import datetime
+import models
+from models.engine.file_storage import FileStorage, slotted_classes
+from models.place import Place
+from models.review import Review
+from test_models.test_engine import FileStorageMixin
+
+
+SlottedPlace = slotted_classes["Place"]
+
+
+class TestSlotted(unittest.TestCase):
+    """Unittests for testing the slotted model variants."""
+
+    def test_same_name_and_base(self):
+        self.assertEqual("Place", SlottedPlace.__name__)
+        self.assertTrue(issubclass(SlottedPlace, Place))
+        self.assertIsNot(SlottedPlace, Place)
+
+    def test_no_instance_dict_until_needed(self):
+        place = SlottedPlace(id="1", name="Loft", city_id="c")
+        self.assertNotIn("name", vars(place))
+        self.assertEqual("Loft", place.name)
+        self.assertEqual("c", place.city_id)
+
+    def test_class_defaults(self):
+        place = SlottedPlace(id="1")
+        self.assertEqual(0, place.number_rooms)
+        self.assertEqual([], place.amenity_ids)
+        self.assertNotIn("number_rooms", place.to_dict())
+
+    def test_overflow_attributes(self):
+        place = SlottedPlace(id="1", wifi="yes")
+        self.assertEqual("yes", place.wifi)
+        place.pool = True
+        self.assertTrue(place.pool)
+        self.assertEqual({"wifi": "yes", "pool": True}, place._extra)
+        del place.pool
+        with self.assertRaises(AttributeError):
+            place.pool
+
+    def test_missing_attribute(self):
+        with self.assertRaises(AttributeError):
+            SlottedPlace(id="1").nope
+
+    def test_to_dict_matches_plain(self):
+        dt = datetime.today()
+        kwargs = {"id": "7", "created_at": dt.isoformat(),
+                  "updated_at": dt.isoformat(), "name": "Loft",
+                  "max_guest": 4, "wifi": "yes"}
+        self.assertEqual(Place(**kwargs).to_dict(),
+                         SlottedPlace(**kwargs).to_dict())
+
+    def test_from_dict(self):
+        place = Place()
+        place.name = "Loft"
+        place.wifi = "yes"
+        copy = SlottedPlace.from_dict(place.to_dict())
+        self.assertIs(SlottedPlace, type(copy))
+        self.assertEqual(place.to_dict(), copy.to_dict())
+        models.storage.delete(place)
+
+    def test_str(self):
+        place = SlottedPlace(id="7", name="Loft")
+        self.assertIn("[Place] (7)", str(place))
+        self.assertIn("'name': 'Loft'", str(place))
+
+    def test_foreign_keys_interned(self):
+        a = SlottedPlace(id="1", city_id="".join(["ci", "ty"]))
+        b = SlottedPlace(id="2", city_id="".join(["ci", "ty"]))
+        self.assertIs(a.city_id, b.city_id)
+
+
+class TestSlotted_storage(FileStorageMixin, unittest.TestCase):
+    """Unittests for testing the slots option of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        models.storage.configure(slots=True)
+
+    def test_reload_builds_slotted(self):
+        review = Review()
+        review.place_id = "p1"
+        review.stars = 5
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        loaded = models.storage.get("Review", review.id)
+        self.assertIs(slotted_classes["Review"], type(loaded))
+        self.assertEqual(review.to_dict(), loaded.to_dict())
+        self.assertEqual([loaded], models.storage.find("Review", "place_id",
+                                                       "p1"))
+
+    def test_changes_are_saved(self):
+        review = Review()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        loaded = models.storage.get("Review", review.id)
+        loaded.text = "great"
+        loaded.stars = 4
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        loaded = models.storage.get("Review", review.id)
+        self.assertEqual("great", loaded.text)
+        self.assertEqual(4, loaded.stars)
+
+
+if __name__ == "__main__":
+    unittest.main()